@@ -1,34 +1,110 @@
+import time
+_START_TIME = time.perf_counter()  # Reference point for the cold-start probe
+
 import ttkbootstrap as tk
-from ttkbootstrap import ttk, Style
-from tkinter import filedialog, messagebox
+from ttkbootstrap import ttk
+from tkinter import filedialog, messagebox, simpledialog
 import json
 import os
 import threading
-import shutil
 import configparser
 from tkinter import font  # Keep this for now, might be needed for text height calculation
-import re
-import atexit
 import sys
-import subprocess
 import traceback
+import getpass
+from concurrent.futures import ThreadPoolExecutor
+
+from bdat_core import instrument
+from bdat_core import (GAME_SHORT_NAMES, apply_edited_text, check_line_length, escape_text, export_files,
+                       file_status_key, format_file_lines, iter_bdat_folders, iter_project_files, list_json_files,
+                       parse_paste_sections, read_json, resolve_original_path, row_text, unescape_text,
+                       line_limit, strip_tags, StatusStore, check_project_widths, find_glyph_table,
+                       load_glyph_table, check_project_tags, compare_tags, format_tag_issues, carry_forward,
+                       load_review_list, review_key, save_review_list, build_changed_files, build_nav_index,
+                       scan_file, scan_rows, load_document, save_document, save_row_texts,
+                       ProjectionCache, StallWatchdog, StatusRollup, RowIndex, text_field, set_row_text,
+                       SORT_KEY_INDEX, row_view_keys, view_order)
+from bdat_core import detect_game_version as core_detect_game_version
+from bdat_core.instrument import count, span, timed
+from bdat_core.client import DEFAULT_PORT as DEFAULT_SERVER_PORT, ProjectClient, ServerError
 
 # --- New Global Variables ---
 BASE_DIR = None
 SECOND_BASE_DIR = None  # For translated files
+REFERENCE_DIRS = []  # Further original-language directories, each shown as an extra column
+REFERENCE_WORKERS = 4  # Threads loading the original and reference files of a table
+BUILD_DIR = None  # Output directory of the mod build
+MT_ENDPOINT = "http://127.0.0.1:8765/"  # Local machine-translation server used by the pre-fill
+SERVER_ADDRESS = f"127.0.0.1:{DEFAULT_SERVER_PORT}"  # Project server to host or connect to, as host:port
+PROJECT_SERVER = None  # ServerThread while this instance hosts the project server
+SERVER_CLIENT = None  # ProjectClient while connected; tables then come from the server and edits go to it
+SERVER_POLL_INTERVAL = 100  # ms between applying the changes pushed by the server
 CURRENT_JSON_PATH = None
 CURRENT_ORIGINAL_JSON_PATH = None  # Path to original language file
 FOLDER_STATUS = {}  # Dictionary to store folder status (color)
+STATUS_ROLLUP = None  # StatusRollup derived from the navigation index, None until it is built
+FILE_LIST_ITEMS = {}  # normalized path -> file_list item of the shown folders and files
+STATUS_STORE = None  # StatusStore of BASE_DIR
+STATUS_FLUSH_DELAY = 500  # ms to batch status changes before they are written
+status_flush_job = None
 CURRENT_JSON_DATA = None
-CURRENT_ORIGINAL_JSON_DATA = None  # Original language data
+CURRENT_DOC_STATE = None  # DocumentState of CURRENT_JSON_PATH: what the file looked like when loaded or saved
+CURRENT_ORIGINAL_JSON_DATA = None  # OriginalProjection of the original language file
+CURRENT_REFERENCES = []  # OriginalProjection (or None) of the open file in each of REFERENCE_DIRS
+# Original files are kept as compact projections; XB_ORIGINAL_CACHE_MB sets the cache budget
+# Heartbeat of the stall watchdog; XB_STALL_MS sets how late a beat must be to count as a stall, 0 disables it
+HEARTBEAT_INTERVAL = 100  # ms
+STALL_THRESHOLD_MS = int(os.environ.get("XB_STALL_MS", "250"))
+WATCHDOG = None
+ORIGINAL_CACHE = ProjectionCache(int(os.environ.get("XB_ORIGINAL_CACHE_MB", "64")) * 1024 * 1024)
 TREE = None  # global tree variable
+ROW_ITEMS = []  # Treeview item of each row of CURRENT_JSON_DATA, in row order
+ROW_POSITIONS = {}  # Treeview item -> row index in CURRENT_JSON_DATA
+ROW_VIEW_KEYS = []  # Precomputed sort and filter keys of each row, see row_view_keys()
+HIDDEN_ITEMS = set()  # Rows detached from the table by the row filter
+TABLE_VIEW = {"sort": None, "descending": False, "filter": "all"}  # Sort column and row filter of the table
+ROW_INDEX = None  # RowIndex of CURRENT_JSON_DATA for the jump box
+JUMP_STATE = {"query": None, "matches": [], "position": -1}  # Matches of the last jump box search
+FOLDER_VIEW = None  # FolderView while a whole BDAT folder is shown in the table
+TABLE_COLUMNS = ("ID", "LABEL", "ORIGINAL TEXT", "TRANSLATED TEXT", "FILE")  # Order of the Treeview values
 UNSAVED_CHANGES = False
 GAME_VERSION = None  # 'Xenoblade2' or 'Xenoblade3'
 context_menu_event = None # For treeview context menu
+STARTUP_SCAN = None  # Future of the project scan started before the window is built
+REVIEW_LIST = {}  # Rows to review after an original update: {file key: [row ids]}
+CURRENT_REVIEW_IDS = set()  # Row ids to review in the current file, as strings
+NAV_INDEX = None  # NavIndex of the project, None while it is being built
+nav_index_generation = 0  # Incremented for every rebuild so that stale builds are dropped
+GLYPH_TABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "glyph_tables")
+
+# Widgets, created by build_gui()
+root = None
+file_list = None
+search_var = None
+font_size_var = None
+profiling_var = None
+pixel_validation_var = None
+base_dir_label = None
+second_base_dir_label = None
+paned_window = None
+status_bar = None
+jump_var = None
+jump_entry = None
+jump_status_label = None
+row_filter_var = None
+filter_status_label = None
+context_menu = None
+folder_export_menu = None
+tree_context_menu = None
+
+# Set XB_STARTUP_PROBE=1 to print cold-start timings and exit once the file list is shown
+STARTUP_PROBE = os.environ.get("XB_STARTUP_PROBE", "") not in ("", "0")
+STARTUP_TIMINGS = {"imports": time.perf_counter() - _START_TIME}
 
 # --- Helper Functions ---
 def open_path(path):
     """Opens a file or directory in a cross-platform way."""
+    import subprocess  # Only needed when a directory is opened
     try:
         if sys.platform == "win32":
             os.startfile(os.path.normpath(path))
@@ -43,97 +119,320 @@ def open_path(path):
 def load_json(filepath):
     """Loads JSON data from a file."""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return read_json(filepath)
     except Exception as e:
         messagebox.showerror("Error Loading JSON", str(e))
         return None
 
-def save_json(filepath, data):
-    """Saves JSON data to a file, replacing the appropriate field with 'edited_text'."""
+def load_originals(json_path):
+    """Loads the original and the reference files of a table at the same time.
+
+    The files are resolved like the original file and loaded on a thread pool.
+    Returns (original path, original, [reference, ...], errors) with None for
+    missing or unreadable files; references follow the order of REFERENCE_DIRS.
+    """
+    original_path = resolve_original_path(json_path, BASE_DIR, SECOND_BASE_DIR, GAME_VERSION)
+    reference_paths = [resolve_original_path(json_path, BASE_DIR, reference_dir, GAME_VERSION)
+                       for reference_dir in REFERENCE_DIRS]
+    loaded = ORIGINAL_CACHE.get_many([path for path in [original_path] + reference_paths if path], REFERENCE_WORKERS)
+    errors = [f"{os.path.basename(path)}: {result}" for path, result in loaded.items() if isinstance(result, Exception)]
+
+    def projection(path):
+        result = loaded.get(path) if path else None
+        return None if isinstance(result, Exception) else result
+
+    return original_path, projection(original_path), [projection(path) for path in reference_paths], errors
+
+def reference_columns():
+    """Returns the Treeview columns of the reference directories, after the TABLE_COLUMNS values."""
+    return tuple(f"REF {number}" for number in range(1, len(REFERENCE_DIRS) + 1))
+
+def table_display_columns():
+    """Returns the shown columns: FILE first in the folder view, the references last."""
+    columns = ("FILE",) + TABLE_COLUMNS[:4] if FOLDER_VIEW else TABLE_COLUMNS[:4]
+    return columns + reference_columns()
+
+def reference_texts(references, row_id):
+    """Returns the escaped text of a row in each reference, aligned by $id."""
+    return tuple(escape_text(reference.get(row_id, "")) for reference in references)
+
+def configure_table_columns():
+    """Sets up the table columns, one per reference directory after the fixed ones."""
+    TREE.configure(columns=TABLE_COLUMNS + reference_columns(), displaycolumns=table_display_columns())
+    TREE.heading("ID", text="ID", command=lambda: sort_table("ID"))
+    TREE.heading("LABEL", text="LABEL", command=lambda: sort_table("LABEL"))
+    TREE.heading("ORIGINAL TEXT", text="ORIGINAL TEXT", command=lambda: sort_table("ORIGINAL TEXT"))
+    TREE.heading("TRANSLATED TEXT", text="TRANSLATED TEXT", command=lambda: sort_table("TRANSLATED TEXT"))
+    TREE.heading("FILE", text="FILE")
+
+    # Set column widths with stretch for text columns
+    TREE.column("ID", width=50, stretch=False)
+    TREE.column("LABEL", width=150, stretch=False)
+    TREE.column("ORIGINAL TEXT", width=200, stretch=True, anchor=tk.W)
+    TREE.column("TRANSLATED TEXT", width=200, stretch=True, anchor=tk.W)
+    TREE.column("FILE", width=150, stretch=False)
+    for column, reference_dir in zip(reference_columns(), REFERENCE_DIRS):
+        TREE.heading(column, text=os.path.basename(reference_dir).upper())
+        TREE.column(column, width=200, stretch=True, anchor=tk.W)
+    update_sort_headings()
+
+def fetch_document(filepath):
+    """Loads a table from disk, or from the project server when connected. Returns (data, DocumentState or None)."""
+    if SERVER_CLIENT:
+        return SERVER_CLIENT.request("open", path=server_rel_path(filepath))["data"], None
+    return load_document(filepath)
+
+def load_document_data(filepath):
+    """Loads a table together with its DocumentState. Returns (None, None) on errors."""
     try:
-        # First, create a copy of the data to avoid modifying the original
-        data_copy = json.loads(json.dumps(data))
-
-        for row in data_copy['rows']:
-            if 'edited_text' in row:
-                if GAME_VERSION == "Xenoblade2":
-                    # For X2, save to 'name' field
-                    row['name'] = row['edited_text']
-                else:
-                    if GAME_VERSION == "XenobladeX":
-                        # For X, save to 'name' field
-                        row['name'] = row['edited_text']
-                    elif '<DBAF43F0>' in row:
-                        # For X3, save to DBAF43F0 field
-                        row['<DBAF43F0>'] = row['edited_text']
-                    else:
-                        # Fallback to last field
-                        last_field = list(row.keys())[-1]
-                        if last_field != 'edited_text':  # Skip if last field is edited_text itself
-                            row[last_field] = row['edited_text']
-                del row['edited_text']  # Remove the 'edited_text' field after saving
-
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data_copy, f, ensure_ascii=False, indent=2)
-        messagebox.showinfo("Success", "JSON saved successfully!")
-        return True
+        return fetch_document(filepath)
+    except Exception as e:
+        messagebox.showerror("Error Loading JSON", str(e))
+        return None, None
+
+def resolve_conflicts_dialog(filepath, conflicts):
+    """Lets the user pick the disk or the edited text for rows changed on both sides.
+
+    Returns {row id: text}, or None when the save is cancelled.
+    """
+    dialog = tk.Toplevel(root)
+    dialog.title(f"Merge Conflicts - {os.path.basename(filepath)}")
+    dialog.geometry("900x400")
+    dialog.transient(root)
+    ttk.Label(dialog, text=f"{os.path.basename(filepath)} was changed by another program. "
+                           f"{len(conflicts)} row(s) were changed on both sides.\n"
+                           "Double-click a row to switch between the text on disk and your text.").pack(anchor=tk.W, padx=5, pady=5)
+
+    columns = ("ID", "USE", "ON DISK", "YOURS", "BEFORE")
+    conflict_tree = ttk.Treeview(dialog, columns=columns, show="headings")
+    for column in columns:
+        conflict_tree.heading(column, text=column)
+    conflict_tree.column("ID", width=50, stretch=False)
+    conflict_tree.column("USE", width=60, stretch=False)
+    conflict_tree.pack(fill=tk.BOTH, expand=True, padx=5)
+
+    choices = {}  # item -> [row id, disk text, edited text, use edited text]
+    for row_id, base, disk, mine in conflicts:
+        item = conflict_tree.insert("", "end", values=(row_id, "yours", escape_text(disk), escape_text(mine),
+                                                       escape_text(base)))
+        choices[item] = [row_id, disk, mine, True]
+
+    def set_choice(item, use_mine):
+        choices[item][3] = use_mine
+        values = list(conflict_tree.item(item, 'values'))
+        values[1] = "yours" if use_mine else "disk"
+        conflict_tree.item(item, values=values)
+
+    def toggle(event):
+        item = conflict_tree.identify_row(event.y)
+        if item:
+            set_choice(item, not choices[item][3])
+
+    result = {}
+
+    def finish(save):
+        if save:
+            result['texts'] = {row_id: mine if use_mine else disk for row_id, disk, mine, use_mine in choices.values()}
+        dialog.destroy()
+
+    def choose_all(use_mine):
+        for item in choices:
+            set_choice(item, use_mine)
+
+    conflict_tree.bind("<Double-1>", toggle)
+    buttons = ttk.Frame(dialog)
+    buttons.pack(fill=tk.X, padx=5, pady=5)
+    ttk.Button(buttons, text="Use All Yours", command=lambda: choose_all(True)).pack(side=tk.LEFT)
+    ttk.Button(buttons, text="Use All On Disk", command=lambda: choose_all(False)).pack(side=tk.LEFT, padx=5)
+    ttk.Button(buttons, text="Cancel", command=lambda: finish(False)).pack(side=tk.RIGHT)
+    ttk.Button(buttons, text="Save Merge", command=lambda: finish(True)).pack(side=tk.RIGHT, padx=5)
+    dialog.protocol("WM_DELETE_WINDOW", lambda: finish(False))
+
+    dialog.grab_set()
+    dialog.wait_window()
+    return result.get('texts')
+
+def save_json(filepath, data, state):
+    """Saves JSON data to a file, replacing the appropriate field with 'edited_text'.
+
+    Nothing is written when the content is unchanged, and changes made to the file by
+    another program since it was loaded are merged. Returns (status, saved data, new state),
+    or None on errors.
+    """
+    try:
+        result = save_document(state, apply_edited_text(data),
+                               lambda conflicts: resolve_conflicts_dialog(filepath, conflicts))
     except Exception as e:
         messagebox.showerror("Error Saving JSON", str(e))
-        return False
-
-def show_character_counts(text_widget):
-    """Show character counts for each line in a tooltip."""
-    # Get the text and split by newlines
-    text = text_widget.get("1.0", "end-1c")
-    lines = text.split('\\n')
-
-    # Create a tooltip window
-    tooltip = tk.Toplevel(text_widget)
-    tooltip.wm_overrideredirect(True)
-    tooltip.wm_geometry("+%d+%d" % (text_widget.winfo_rootx(), text_widget.winfo_rooty() - 70))
-
-    # Create labels for each line count
-    for i, line in enumerate(lines):
-        count = len(line)
-        label = ttk.Label(tooltip, text=f"Line {i+1}: {count} chars", background="#FFFFE0")  # Light yellow background
-        label.pack()
-
-    # Update position when text widget moves
-    def update_position():
-        tooltip.wm_geometry("+%d+%d" % (text_widget.winfo_rootx(), text_widget.winfo_rooty() - 70))
-        tooltip.after(100, update_position)
-
-    update_position()
-
-    # Destroy tooltip when text widget loses focus
-    def destroy_tooltip(event=None):
-        tooltip.destroy()
-
-    text_widget.bind('<FocusOut>', destroy_tooltip)
-    return tooltip
-
-def check_line_length(filename, text):
-    """Checks if any line in the text exceeds the character limit based on the filename.
-    Ignores characters within square brackets."""
-    if not text:
-        return False
+        return None
 
-    if filename.startswith("bf"):
-        limit = 54
-    elif filename.startswith("campfev") or filename.startswith("fev") or filename.startswith("kizuna") or filename.startswith("qst") or filename.startswith("tlk"):
-        limit = 39
-    else:
-        return False  # No limit defined for this filename
+    status = result[0]
+    if status == "written":
+        messagebox.showinfo("Success", "JSON saved successfully!")
+    elif status == "unchanged":
+        messagebox.showinfo("Info", "No changes to save.")
+    elif status == "merged":
+        messagebox.showinfo("Success", "The file was changed by another program; the changes were merged and saved.")
+    return result
+
+class LineMetricsPanel:
+    """Shows the length of each line of the cell editor against the file's line limit.
+
+    Lines are separated by \\n sequences or real newlines. Counts ignore control tags
+    in square brackets, like check_line_length. Typing only recomputes the editor
+    line under the cursor and only relabels the lines whose count changed. When the
+    original text is given, a last line reports tags missing from the translation.
+    """
+    POSITION_INTERVAL = 100  # ms between position updates
+
+    def __init__(self, text_widget, filename, glyph_table=None, original_text=None):
+        self.text_widget = text_widget
+        self.limit = line_limit(filename) if filename else None
+        # Pixel widths are only shown when pixel-width validation is active for this file
+        self.glyph_table = glyph_table
+        self.budget = glyph_table.budget_for(filename) if glyph_table and filename else None
+        self.line_metrics = []  # per editor line: [(chars, chars without tags, pixels), ...] per \n segment
+        self.labels = []
+        self.position_job = None
+
+        self.window = tk.Toplevel(text_widget)
+        self.window.wm_overrideredirect(True)
+        self.original_text = original_text
+        self.tag_label = None
+        if original_text is not None:
+            self.tag_label = ttk.Label(self.window, background="#FFFFE0")
+            self.tag_label.pack(side=tk.BOTTOM, anchor=tk.W)
+        self.refresh()
+        self.track_position()
+
+    def measure_line(self, text):
+        metrics = []
+        for segment in text.split('\\n'):
+            visible = strip_tags(segment)
+            pixels = self.glyph_table.line_width(visible) if self.budget is not None else None
+            metrics.append((len(segment), len(visible), pixels))
+        return metrics
+
+    def refresh(self, event=None):
+        """Recomputes the metrics of every line."""
+        text = self.text_widget.get("1.0", "end-1c")
+        self.line_metrics = [self.measure_line(line) for line in text.split('\n')]
+        self.render(0)
+        self.update_tags(text)
+
+    def update_tags(self, text=None):
+        """Compares the tags of the edited text with the original row."""
+        if self.tag_label is None:
+            return
+        if text is None:
+            text = self.text_widget.get("1.0", "end-1c")
+        issues = compare_tags(self.original_text, text)
+        if issues:
+            self.tag_label.config(text=f"Tags: {format_tag_issues(issues)}", foreground="red")
+        else:
+            self.tag_label.config(text="Tags: OK", foreground="")
+
+    def on_key(self, event=None):
+        """Updates the metrics of the editor line under the cursor."""
+        line_count = int(self.text_widget.index("end-1c").split('.')[0])
+        if line_count != len(self.line_metrics):
+            # Lines were added or removed (Ctrl+Enter, paste, deleting a newline)
+            self.refresh()
+            return
 
-    lines = text.split('\\n')
-    for line in lines:
-        # Remove content within square brackets
-        line = re.sub(r'\[.*?\]', '', line)
-        if len(line) > limit:
-            return True
-    return False
+        # Tags can change without changing any line length
+        self.update_tags()
+        line_index = int(self.text_widget.index(tk.INSERT).split('.')[0]) - 1
+        metrics = self.measure_line(self.text_widget.get(f"{line_index + 1}.0", f"{line_index + 1}.end"))
+        if metrics == self.line_metrics[line_index]:
+            return
 
+        # Labels before this editor line are unaffected
+        first = sum(len(line) for line in self.line_metrics[:line_index])
+        segment_count_changed = len(metrics) != len(self.line_metrics[line_index])
+        self.line_metrics[line_index] = metrics
+        if segment_count_changed:
+            # Numbering of all following lines shifts
+            self.render(first)
+        else:
+            self.render(first, first + len(metrics))
+
+    def render(self, start, stop=None):
+        """Updates the labels of the logical lines start..stop, creating or removing labels as needed."""
+        segments = [segment for line in self.line_metrics for segment in line]
+        stop = len(segments) if stop is None else stop
+
+        while len(self.labels) < len(segments):
+            label = ttk.Label(self.window, background="#FFFFE0")  # Light yellow background
+            label.pack(anchor=tk.W)
+            self.labels.append(label)
+        while len(self.labels) > len(segments):
+            self.labels.pop().destroy()
+
+        for i in range(start, stop):
+            chars, visible_chars, pixels = segments[i]
+            text = f"Line {i+1}: {visible_chars}"
+            text += f"/{self.limit} chars" if self.limit else " chars"
+            if pixels is not None:
+                text += f", {pixels}/{self.budget} px"
+            if chars != visible_chars:
+                text += f" ({chars} with tags)"
+            if pixels is not None:
+                over_limit = pixels > self.budget
+            else:
+                over_limit = self.limit is not None and visible_chars > self.limit
+            self.labels[i].config(text=text, foreground="red" if over_limit else "")
+
+    def track_position(self):
+        """Keeps the panel above the editor; a single callback that stops when the panel is destroyed."""
+        if not self.text_widget.winfo_exists():
+            self.position_job = None
+            self.window.destroy()
+            return
+        self.window.wm_geometry("+%d+%d" % (self.text_widget.winfo_rootx(),
+                                            self.text_widget.winfo_rooty() - self.window.winfo_reqheight() - 5))
+        self.position_job = self.window.after(self.POSITION_INTERVAL, self.track_position)
+
+    def destroy(self):
+        if self.position_job is not None:
+            self.window.after_cancel(self.position_job)
+            self.position_job = None
+        if self.window.winfo_exists():
+            self.window.destroy()
+
+def active_glyph_table():
+    """Returns the glyph table used for validation, or None when pixel-width validation is off."""
+    if not pixel_validation_var or not pixel_validation_var.get() or not GAME_VERSION:
+        return None
+    path = find_glyph_table(GAME_VERSION, [BASE_DIR, GLYPH_TABLE_DIR])
+    return load_glyph_table(path) if path else None
+
+def is_over_limit(filename, text, glyph_table=None):
+    """Checks a row against its pixel budget when a glyph table is given, otherwise against the character limit."""
+    if glyph_table is not None and glyph_table.budget_for(filename) is not None:
+        return glyph_table.check_line_width(filename, text)
+    return check_line_length(filename, text)
+
+def row_tags(filename, text, row_id, glyph_table=None, review_ids=None):
+    """Returns the Treeview tags of a row: "red" when it is too long, "review" when it needs a look."""
+    tags = ()
+    if filename and is_over_limit(filename, text, glyph_table):
+        tags += ("red",)
+    if str(row_id) in (CURRENT_REVIEW_IDS if review_ids is None else review_ids):
+        tags += ("review",)
+    return tags
+
+def item_file_path(item):
+    """Returns the JSON file a table row belongs to."""
+    if FOLDER_VIEW:
+        return FOLDER_VIEW.item_rows[item][0]
+    return CURRENT_JSON_PATH
+
+def value_index(column):
+    """Returns the index in the row values of a Treeview column given as "#n" (displayed position)."""
+    return TABLE_COLUMNS.index(TREE.column(column, 'id'))
+
+@timed("text_height")
 def calculate_text_height(text, font, width):
     """Calculates the height of the text based on the font and width."""
     text_widget = tk.Text(root, font=font, width=width)
@@ -156,8 +455,12 @@ def calculate_text_height(text, font, width):
     text_widget.destroy()
     return height + 10  # Add extra padding
 
-def populate_table(tree, original_data, translated_data):
-    """Populates the Treeview table with JSON data from both original and translated files."""
+@timed("populate")
+def populate_table(tree, original_data, translated_data, references=None):
+    """Populates the Treeview table with the translated rows and the OriginalProjection of the original file.
+
+    references are the projections of the file in the reference directories (None when missing).
+    """
     # Clear existing data
     if tree is None:
         print("Error: Tree is None in populate_table")
@@ -165,48 +468,57 @@ def populate_table(tree, original_data, translated_data):
 
     for item in tree.get_children():
         tree.delete(item)
-
-    def format_text(text):
-        if not text:
-            return ""
-        # Convert to string to avoid errors with non-string types (e.g., numbers)
-        text = str(text)
-        # Replace special characters with visible representations
-        text = text.replace('\n', '\\n').replace('\t', '\\t').replace('\r', '\\r')
-        return text
+    # Rows hidden by the filter are detached, not children of the root
+    for item in HIDDEN_ITEMS:
+        if tree.exists(item):
+            tree.delete(item)
+    ROW_ITEMS.clear()
+    ROW_POSITIONS.clear()
+    ROW_VIEW_KEYS.clear()
+    HIDDEN_ITEMS.clear()
+    tree.configure(displaycolumns=table_display_columns())
+    # {row id: text} of every reference column; the FILE value is empty in the single file view
+    reference_maps = [reference.texts_by_id() if reference else {} for reference in references or []]
+    original_texts = original_data.texts_by_id() if original_data else {}
 
     # Use the configured DataTable.Treeview style
     TREE.configure(style='DataTable.Treeview')
 
-    # Use translated data if available, otherwise use original
-    data = translated_data if translated_data else original_data
+    data = translated_data
+    glyph_table = active_glyph_table()
+    filename = os.path.basename(CURRENT_JSON_PATH) if CURRENT_JSON_PATH else None
 
     if data and 'rows' in data:
+        field = text_field(data)
         for idx, row in enumerate(data['rows']):
-            # Get original text if available - always use last field in row
-            original_text = ""
-            if original_data and 'rows' in original_data and len(original_data['rows']) > idx:
-                original_row = original_data['rows'][idx]
-                original_text = list(original_row.values())[-1] if original_row else ''
-
-            # Get translated text - always use last field in row
-            translated_text = list(row.values())[-1] if row else ''
-
-            item_id = tree.insert("", "end", values=(
-                row.get('$id', ''),
-                row.get('label', ''),
-                format_text(original_text),
-                format_text(translated_text)
-            ))
+            # Matched by $id, like the references, so rows added or removed in one version don't shift the rest
+            original_text = original_texts.get(row.get('$id'), "")
+
+            translated_text = row_text(row, field)
+
+            with span("tree.insert"):
+                values = (
+                    row.get('$id', ''),
+                    row.get('label', ''),
+                    escape_text(original_text),
+                    escape_text(translated_text)
+                )
+                if reference_maps:
+                    values += ("",) + reference_texts(reference_maps, row.get('$id'))
+                item_id = tree.insert("", "end", values=values)
+            ROW_ITEMS.append(item_id)
+            ROW_POSITIONS[item_id] = idx
+            count("rows_inserted")
 
             # Check line length and apply tag
-            if CURRENT_JSON_PATH:
-                filename = os.path.basename(CURRENT_JSON_PATH)
-                if check_line_length(filename, format_text(translated_text)):
-                    tree.item(item_id, tags=("red",))
+            tags = row_tags(filename, escape_text(translated_text), row.get('$id', ''), glyph_table)
+            if tags:
+                tree.item(item_id, tags=tags)
+            ROW_VIEW_KEYS.append(row_view_keys(row.get('$id', ''), row.get('label', ''),
+                                               original_text, translated_text, tags))
 
             # Calculate text height for the "EDITED TEXT" column
-            text = row.get('name', '')
+            text = translated_text  # The table's own text field, not always 'name'
             font_size = font_size_var.get()
             width = 200 // 7
             if root.winfo_exists():  # Only calculate height if root window exists
@@ -215,14 +527,284 @@ def populate_table(tree, original_data, translated_data):
                 s = ttk.Style()
                 s.configure('Treeview', rowheight=int(height + 15))
 
+    if TABLE_VIEW["sort"] or TABLE_VIEW["filter"] != "all":
+        apply_table_view()
+
+FILTER_LABELS = {"All rows": "all", "Over limit": "over_limit", "Untranslated": "untranslated", "To review": "review"}
+
+def update_row_view_keys(item):
+    """Refreshes the keys of a row after its text or tags changed. The row keeps its place until the view is reapplied."""
+    index = ROW_POSITIONS.get(item)
+    if index is None:
+        return
+    values = TREE.item(item, 'values')
+    keys = row_view_keys(None, None, str(values[2]), str(values[3]), TREE.item(item, 'tags'))
+    ROW_VIEW_KEYS[index] = ROW_VIEW_KEYS[index][:2] + keys[2:]
+
+def apply_table_view():
+    """Reorders and hides the existing rows of the table for the current sort column and row filter."""
+    if FOLDER_VIEW or not ROW_ITEMS:
+        return
+    with span("table.view", rows=len(ROW_ITEMS)):
+        visible = [ROW_ITEMS[i] for i in view_order(ROW_VIEW_KEYS, TABLE_VIEW["sort"], TABLE_VIEW["descending"],
+                                                    TABLE_VIEW["filter"])]
+        # One call moves the visible rows into place and detaches the others
+        TREE.set_children("", *visible)
+        HIDDEN_ITEMS.clear()
+        if len(visible) < len(ROW_ITEMS):
+            HIDDEN_ITEMS.update(set(ROW_ITEMS).difference(visible))
+    update_sort_headings()
+    if filter_status_label is not None:
+        filter_status_label.config(text=f"{len(visible)} of {len(ROW_ITEMS)} rows" if HIDDEN_ITEMS else "")
+
+def update_sort_headings():
+    for column in SORT_KEY_INDEX:
+        arrow = ""
+        if TABLE_VIEW["sort"] == column:
+            arrow = " ▼" if TABLE_VIEW["descending"] else " ▲"
+        TREE.heading(column, text=column + arrow)
+
+def sort_table(column):
+    """Sorts by a column: ascending, then descending, then back to the file order."""
+    if FOLDER_VIEW:
+        messagebox.showinfo("Info", "Sorting and filtering are only available when a single file is open.")
+        return
+    if TABLE_VIEW["sort"] != column:
+        TABLE_VIEW.update(sort=column, descending=False)
+    elif not TABLE_VIEW["descending"]:
+        TABLE_VIEW["descending"] = True
+    else:
+        TABLE_VIEW.update(sort=None, descending=False)
+    if TABLE_VIEW["sort"] is None and TABLE_VIEW["filter"] == "all":
+        TREE.set_children("", *ROW_ITEMS)  # Back to the file order
+        HIDDEN_ITEMS.clear()
+        update_sort_headings()
+    else:
+        apply_table_view()
+
+def set_row_filter(event=None):
+    """Shows only the rows of the kind picked in the filter box."""
+    TABLE_VIEW["filter"] = FILTER_LABELS.get(row_filter_var.get(), "all")
+    if FOLDER_VIEW:
+        if TABLE_VIEW["filter"] != "all":
+            messagebox.showinfo("Info", "Sorting and filtering are only available when a single file is open.")
+        return
+    apply_table_view()
+
+def select_table_item(item):
+    """Selects a table row and scrolls it into view, clearing the row filter if it hides the row."""
+    if item in HIDDEN_ITEMS:
+        row_filter_var.set("All rows")
+        TABLE_VIEW["filter"] = "all"
+        apply_table_view()
+    TREE.selection_set(item)
+    TREE.focus(item)
+    TREE.see(item)
+
+class FolderView:
+    """Shows every JSON file of a BDAT folder as one table with a FILE column.
+
+    Rows are inserted a page at a time when the table is scrolled near its end.
+    Each table item maps to its (file, row index), so edits are written back to
+    the file they came from; only touched files are saved.
+    """
+    PAGE_SIZE = 200  # Rows inserted per page
+    PRELOAD_AT = 0.9  # Load the next page when the bottom of the view passes this fraction
+
+    def __init__(self, folder_path):
+        self.folder_path = folder_path
+        self.files = [json_path for _, json_path in folder_files(folder_path)]
+        self.docs = {}  # path -> translated data
+        self.states = {}  # path -> DocumentState, None for tables of the project server
+        self.fields = {}  # path -> text column, see text_field
+        self.reload_needed = False  # A merge changed the rows of a file
+        self.originals = {}  # path -> OriginalProjection or None
+        self.references = {}  # path -> [{row id: text} of each reference directory]
+        self.review_ids = {}  # path -> row ids to review, as strings
+        self.item_rows = {}  # Treeview item -> (path, row index)
+        self.row_items = {}  # (path, row index) -> Treeview item
+        self.touched = set()  # Paths with edited rows
+        self.row_indexes = {}  # path -> RowIndex, built by the first jump box search
+        self.file_index = 0  # Next row to insert: self.files[file_index]['rows'][row_index]
+        self.row_index = 0
+        self.errors = []
+
+    @property
+    def complete(self):
+        return self.file_index >= len(self.files)
+
+    def load_file(self, path):
+        with span("folder.load_file", file=path):
+            try:
+                self.docs[path], self.states[path] = fetch_document(path)
+                self.fields[path] = text_field(self.docs[path])
+            except Exception as e:
+                self.docs[path] = None
+                self.errors.append(f"{os.path.basename(path)}: {e}")
+                return
+            _, self.originals[path], references, errors = load_originals(path)
+            self.references[path] = [reference.texts_by_id() if reference else {} for reference in references]
+            self.errors.extend(errors)
+            key = review_key(path, BASE_DIR) if BASE_DIR else None
+            self.review_ids[path] = {str(row_id) for row_id in REVIEW_LIST.get(key, [])}
+
+    def row_tags(self, item, text, glyph_table):
+        path, row_index = self.item_rows[item]
+        row_id = self.docs[path]['rows'][row_index].get('$id', '')
+        return row_tags(os.path.basename(path), text, row_id, glyph_table, self.review_ids[path])
+
+    @timed("folder.page")
+    def load_next_page(self):
+        """Inserts the next PAGE_SIZE rows. Returns the number of rows inserted."""
+        glyph_table = active_glyph_table()
+        inserted = 0
+        while inserted < self.PAGE_SIZE and not self.complete:
+            path = self.files[self.file_index]
+            if path not in self.docs:
+                self.load_file(path)
+            data = self.docs[path]
+            rows = data.get('rows', []) if data else []
+            original = self.originals.get(path)
+            original_texts = original.texts_by_id() if original else {}
+            field = self.fields.get(path)
+            filename = os.path.basename(path)
+
+            stop = min(len(rows), self.row_index + self.PAGE_SIZE - inserted)
+            for row_index in range(self.row_index, stop):
+                row = rows[row_index]
+                original_text = original_texts.get(row.get('$id'), "")  # By $id, like in the single file view
+                translated_text = escape_text(row_text(row, field))
+                with span("tree.insert"):
+                    values = (
+                        row.get('$id', ''),
+                        row.get('label', ''),
+                        escape_text(original_text),
+                        translated_text,
+                        filename
+                    )
+                    values += reference_texts(self.references[path], row.get('$id'))
+                    tags = row_tags(filename, translated_text, row.get('$id', ''), glyph_table, self.review_ids[path])
+                    item = TREE.insert("", "end", values=values, tags=tags)
+                self.item_rows[item] = (path, row_index)
+                self.row_items[(path, row_index)] = item
+            inserted += stop - self.row_index
+
+            if stop >= len(rows):
+                self.file_index += 1
+                self.row_index = 0
+            else:
+                self.row_index = stop
+        count("rows_inserted", inserted)
+        return inserted
+
+    def find_rows(self, query):
+        """Returns [(path, row index)] of the rows matching a query in every file, loading files as needed."""
+        matches = []
+        for path in self.files:
+            if path not in self.docs:
+                self.load_file(path)
+            data = self.docs[path]
+            if not data:
+                continue
+            if path not in self.row_indexes:
+                self.row_indexes[path] = RowIndex(data.get('rows', []))
+            matches.extend((path, row_index) for row_index in self.row_indexes[path].find(query))
+        return matches
+
+    def ensure_row(self, path, row_index):
+        """Loads pages until a row is in the table. Returns its item, or None if the row doesn't exist."""
+        while (path, row_index) not in self.row_items and not self.complete:
+            self.load_next_page()
+        return self.row_items.get((path, row_index))
+
+    def save(self):
+        """Writes the touched files. Returns a list of errors."""
+        items_by_path = {}
+        for item, (path, row_index) in self.item_rows.items():
+            if path in self.touched:
+                items_by_path.setdefault(path, []).append((item, row_index))
+
+        errors = []
+        with span("folder.save", files=len(items_by_path)):
+            for path, items in items_by_path.items():
+                data = self.docs[path]
+                for item, row_index in items:
+                    data['rows'][row_index]['edited_text'] = unescape_text(str(TREE.item(item, 'values')[3]))
+                try:
+                    status, saved, self.states[path] = save_document(
+                        self.states[path], apply_edited_text(data),
+                        lambda conflicts: resolve_conflicts_dialog(path, conflicts))
+                except Exception as e:
+                    errors.append(f"{os.path.basename(path)}: {e}")
+                    continue
+                if status == "cancelled":
+                    errors.append(f"{os.path.basename(path)}: merge cancelled")
+                    continue
+                if status == "merged":
+                    self.reload_needed = True  # Show the rows that came from disk
+                self.docs[path] = saved
+                self.row_indexes.pop(path, None)
+                self.touched.discard(path)
+                update_nav_index(path, saved, self.originals.get(path))
+        return errors
+
+def open_folder_view(folder_path):
+    """Shows all JSON files of a BDAT folder in the table."""
+    global FOLDER_VIEW, CURRENT_JSON_PATH, CURRENT_JSON_DATA, CURRENT_ORIGINAL_JSON_DATA
+    for item in TREE.get_children():
+        TREE.delete(item)
+    for item in HIDDEN_ITEMS:
+        if TREE.exists(item):
+            TREE.delete(item)
+    ROW_ITEMS.clear()
+    ROW_POSITIONS.clear()
+    ROW_VIEW_KEYS.clear()
+    HIDDEN_ITEMS.clear()
+    if filter_status_label is not None:
+        filter_status_label.config(text="")
+    CURRENT_JSON_PATH = None
+    CURRENT_JSON_DATA = None
+    CURRENT_ORIGINAL_JSON_DATA = None
+    CURRENT_REVIEW_IDS.clear()
+    rebuild_row_index()
+
+    FOLDER_VIEW = FolderView(folder_path)
+    TREE.configure(displaycolumns=table_display_columns())
+    FOLDER_VIEW.load_next_page()
+    if FOLDER_VIEW.errors:
+        messagebox.showerror("Error", "Could not load:\n" + "\n".join(FOLDER_VIEW.errors))
+        FOLDER_VIEW.errors.clear()
+
+def close_folder_view():
+    global FOLDER_VIEW
+    FOLDER_VIEW = None
+
+def on_tree_scroll(scrollbar, first, last):
+    """Updates the scrollbar and loads the next page of the folder view when the end comes into view."""
+    scrollbar.set(first, last)
+    if FOLDER_VIEW and not FOLDER_VIEW.complete and float(last) >= FolderView.PRELOAD_AT:
+        # Insert outside of the scroll callback
+        root.after_idle(load_folder_page)
+
+def load_folder_page():
+    if FOLDER_VIEW and not FOLDER_VIEW.complete:
+        FOLDER_VIEW.load_next_page()
+        if FOLDER_VIEW.errors:
+            messagebox.showerror("Error", "Could not load:\n" + "\n".join(FOLDER_VIEW.errors))
+            FOLDER_VIEW.errors.clear()
+
 # --- GUI Functions ---
 
 def browse_base_dir():
     """Opens a directory dialog to select the base directory."""
     global BASE_DIR
-    BASE_DIR = filedialog.askdirectory()
+    base_dir = filedialog.askdirectory()
+    if base_dir:
+        disconnect_project_server(reload=False)  # The server serves the previous project
+    BASE_DIR = base_dir
     if BASE_DIR:
         base_dir_label.config(text=f"Base Directory: {BASE_DIR}")
+        load_config()
         populate_file_list()
         save_gui_state()  # Save the GUI state
 
@@ -233,12 +815,57 @@ def browse_second_base_dir():
     if SECOND_BASE_DIR:
         second_base_dir_label.config(text=f"Second Directory: {SECOND_BASE_DIR}")
         save_gui_state()  # Save the GUI state
+        rebuild_nav_index()  # Untranslated rows are found by comparing with the originals
 
 # Add this at the top with other global variables
-ORIGINAL_FILE_LIST = []
-
+ORIGINAL_FILE_LIST = []  # (folder text, folder path) of every BDAT folder
+FOLDER_FILES = {}  # folder path -> [(file name, file path)], listed when a folder is first needed
+PLACEHOLDER = "placeholder"  # Type of the empty child that makes a folder expandable before its files are listed
+
+def folder_files(folder_path):
+    """Returns the JSON files of a BDAT folder, listing them on first use."""
+    files = FOLDER_FILES.get(folder_path)
+    if files is None:
+        files = FOLDER_FILES[folder_path] = list_json_files(folder_path)
+    return files
+
+def file_status_keys(files):
+    """Returns {file path: status key} for the files of one BDAT folder, resolving the folder part once."""
+    if not files:
+        return {}
+    prefix = file_status_key(files[0][1], BASE_DIR)[:-len(files[0][0])]
+    return {path: prefix + name for name, path in files}
+
+def insert_folder_item(folder_text, folder_path, files=None):
+    """Inserts a BDAT folder with the given files, or with a placeholder that lists them when it is expanded."""
+    folder_id = insert_file_list_item("", folder_text, "folder", folder_path)
+    if files is None:
+        file_list.insert(folder_id, "end", text="", values=(PLACEHOLDER, ""))
+    else:
+        insert_file_items(folder_id, files)
+    return folder_id
+
+def insert_file_items(folder_id, files):
+    keys = file_status_keys(files)
+    for name, path in files:
+        insert_file_list_item(folder_id, name, "file", path, keys[path])
+
+def expand_folder(event=None):
+    """Replaces the placeholder of a folder that is opened for the first time with its files."""
+    folder_id = file_list.focus()
+    children = file_list.get_children(folder_id) if folder_id else ()
+    if len(children) == 1 and file_list.item(children[0], 'values')[0] == PLACEHOLDER:
+        with span("file_list.expand"):
+            file_list.delete(children[0])
+            insert_file_items(folder_id, folder_files(file_list.item(folder_id, 'values')[1]))
+
+@timed("filter")
 def filter_folders(event=None):
-    """Filters folders based on search text."""
+    """Filters folders based on search text.
+
+    Files are only listed when they are needed to match the search, and
+    folders matching by name stay collapsed until they are expanded.
+    """
     search_text = search_var.get().lower()
 
     if not ORIGINAL_FILE_LIST:
@@ -247,197 +874,187 @@ def filter_folders(event=None):
     # Clear the current view
     for item in file_list.get_children():
         file_list.delete(item)
+    FILE_LIST_ITEMS.clear()
 
     # Rebuild the tree from original list
-    for folder in ORIGINAL_FILE_LIST:
-        folder_name = folder['text'].lower()
-        folder_matches = not search_text or search_text in folder_name
-
-        # If folder matches or any child matches, show it
-        if folder_matches or any(search_text in child['text'].lower() for child in folder['children']):
-            # Check if folder has a color tag
-            folder_tags = ()
-            if folder['text'] in FOLDER_STATUS:
-                folder_tags = (FOLDER_STATUS[folder['text']],)
-
-            # Recreate the folder item
-            folder_id = file_list.insert("", "end",
-                text=folder['text'],
-                values=folder['values'],
-                tags=folder_tags
-            )
-
-            # Add matching children
-            for child in folder['children']:
-                if not search_text or search_text in child['text'].lower():
-                    # Check if child has a color tag
-                    child_tags = ()
-                    rel_path = child['values'][1].replace(BASE_DIR + '\\', '').replace('\\', '/')
-                    if rel_path in FOLDER_STATUS:
-                        child_tags = (FOLDER_STATUS[rel_path],)
-
-                    child_id = file_list.insert(folder_id, "end",
-                        text=child['text'],
-                        values=child['values'],
-                        tags=child_tags
-                    )
+    for folder_text, folder_path in ORIGINAL_FILE_LIST:
+        if not search_text or search_text in folder_text.lower():
+            insert_folder_item(folder_text, folder_path)
+            continue
+
+        # Show the folder if any of its files match, with only those files
+        matches = [(name, path) for name, path in folder_files(folder_path) if search_text in name.lower()]
+        if matches:
+            insert_folder_item(folder_text, folder_path, matches)
+
+def file_list_status(item_type, path, folder_text=None, key=None):
+    """Returns the status color of a file list item.
+
+    Files use their status set by hand, else the status derived from their rows.
+    Folders use their status set by hand, else they are rolled up from their
+    files once the project index is built.
+    """
+    if item_type == "file":
+        if STATUS_ROLLUP:
+            return STATUS_ROLLUP.get_file(path)
+        return FOLDER_STATUS.get(key or file_status_key(path, BASE_DIR))
+    if STATUS_ROLLUP:
+        return STATUS_ROLLUP.folder_status(path)
+    return folder_mark(folder_text, path)
+
+def folder_mark(folder_text, folder_path):
+    """Returns the status set by hand on a folder, stored under its name."""
+    return FOLDER_STATUS.get(folder_text) or FOLDER_STATUS.get(os.path.basename(folder_path))
+
+def insert_file_list_item(parent, text, item_type, path, key=None):
+    """Inserts a folder or file into the file list with its status color; key is a file's status key if known."""
+    status = file_list_status(item_type, path, text, key)
+    item = file_list.insert(parent, "end", text=text, values=(item_type, path), tags=(status,) if status else ())
+    FILE_LIST_ITEMS[os.path.normcase(os.path.normpath(path))] = item
+    return item
+
+def set_file_list_status(path, status):
+    """Updates the color of a shown folder or file."""
+    item = FILE_LIST_ITEMS.get(os.path.normcase(os.path.normpath(path)))
+    if item and file_list.exists(item):
+        file_list.item(item, tags=(status,) if status else ())
+
+def manual_file_status(json_path):
+    return FOLDER_STATUS.get(file_status_key(json_path, BASE_DIR))
+
+def rebuild_status_rollup():
+    """Derives every file and folder status from the navigation index and recolors the shown items."""
+    global STATUS_ROLLUP
+    if NAV_INDEX is None:
+        return
+    with span("status.rollup"):
+        STATUS_ROLLUP = StatusRollup.from_stats(NAV_INDEX.file_stats, manual_file_status)
+        for folder_text, folder_path in ORIGINAL_FILE_LIST:
+            STATUS_ROLLUP.set_folder_mark(folder_path, folder_mark(folder_text, folder_path))
+        # Files of folders that were never expanded get their color when they are inserted
+        for item in FILE_LIST_ITEMS.values():
+            if file_list.exists(item):
+                item_type, path = file_list.item(item, 'values')[:2]
+                status = file_list_status(item_type, path)
+                file_list.item(item, tags=(status,) if status else ())
+
+def update_file_status(json_path):
+    """Re-derives the status of one file and its folder after its rows or its mark changed."""
+    if NAV_INDEX is None or STATUS_ROLLUP is None:
+        return
+    stats = NAV_INDEX.stats(json_path)
+    if stats is None:
+        return
+    file_status, folder_status = STATUS_ROLLUP.set_file(json_path, stats, manual_file_status(json_path))
+    set_file_list_status(json_path, file_status)
+    set_file_list_status(os.path.dirname(os.path.dirname(json_path)), folder_status)
 
 def detect_game_version(base_dir):
-    """Detects whether this is Xenoblade 2, 3 or X based on folder structure and bschema files."""
-    # Check for Xenoblade 3 structure (has game/ and evt/ folders)
-    game_path = os.path.join(base_dir, "game")
-    evt_path = os.path.join(base_dir, "evt")
-
-    if os.path.exists(game_path) and os.path.exists(evt_path):
-        # Found Xenoblade 3 structure
-        root.title("BDAT Translation Tool [X3]")
-        return "Xenoblade3"
-
-    # Check for Xenoblade X structure (Modern schema but direct bdat folders)
-    for item in os.listdir(base_dir):
-        item_path = os.path.join(base_dir, item)
-        if os.path.isdir(item_path):
-            # Check for bschema file
-            bschema_path = os.path.join(item_path, f"{item}.bschema")
-            if os.path.exists(bschema_path):
-                try:
-                    with open(bschema_path, 'r') as f:
-                        bschema = json.load(f)
-                        if "version" in bschema and isinstance(bschema["version"], dict) and "Legacy" in bschema["version"]:
-                            root.title("BDAT Translation Tool [X2]")
-                            return "Xenoblade2"
-                        elif "version" in bschema and bschema["version"] == "Modern":
-                            # Check if this is X or 3 by looking for game/evt folders
-                            if not os.path.exists(game_path) and not os.path.exists(evt_path):
-                                root.title("BDAT Translation Tool [X]")
-                                return "XenobladeX"
-                            else:
-                                root.title("BDAT Translation Tool [X3]")
-                                return "Xenoblade3"
-                except:
-                    continue
-    root.title("BDAT Translation Tool [X2]")
-    return "Xenoblade2"  # Default to XB2 if unsure
-
-def populate_file_list():
-    """Populates the file list with BDAT folders and JSON files."""
-    global ORIGINAL_FILE_LIST, GAME_VERSION
+    """Detects the game version and shows it in the window title."""
+    game_version = core_detect_game_version(base_dir)
+    set_game_title(game_version)
+    return game_version
+
+def set_game_title(game_version):
+    root.title(f"BDAT Translation Tool [{GAME_SHORT_NAMES[game_version]}]")
+
+def scan_project(base_dir):
+    """Detects the game version and lists every BDAT folder. Their files are listed when needed.
+
+    Does not touch Tk, so it can run in a worker thread while the window is being built.
+    """
+    game_version = core_detect_game_version(base_dir)
+    return game_version, list(iter_bdat_folders(base_dir, game_version))
+
+@timed("file_list")
+def populate_file_list(scan=None):
+    """Populates the file list with the BDAT folders; their JSON files are inserted when a folder is expanded."""
+    global ORIGINAL_FILE_LIST, GAME_VERSION, REVIEW_LIST
     # Clear existing list
     for item in file_list.get_children():
         file_list.delete(item)
+    FILE_LIST_ITEMS.clear()
+    FOLDER_FILES.clear()
 
     if BASE_DIR and os.path.exists(BASE_DIR):
         ORIGINAL_FILE_LIST = []  # Reset the original list
         try:
-            GAME_VERSION = detect_game_version(BASE_DIR)
+            if scan is None:
+                scan = scan_project(BASE_DIR)
+            GAME_VERSION, folders = scan
+            set_game_title(GAME_VERSION)
+            REVIEW_LIST = load_review_list(BASE_DIR)
         except Exception as e:
             messagebox.showerror("Error", f"Could not detect game version: {str(e)}")
             return
 
-        if GAME_VERSION == "Xenoblade3":
-            # Xenoblade 3 has game/ and evt/ folders
-            for top_folder in ["game", "evt"]:
-                top_folder_path = os.path.join(BASE_DIR, top_folder)
-                if os.path.exists(top_folder_path):
-                    for bdat_folder in os.listdir(top_folder_path):
-                        bdat_folder_path = os.path.join(top_folder_path, bdat_folder)
-                        if os.path.isdir(bdat_folder_path):
-                            folder_id = file_list.insert("", "end", text=f"{top_folder}/{bdat_folder}", values=("folder", bdat_folder_path))
-                            ORIGINAL_FILE_LIST.append({
-                                'id': folder_id,
-                                'text': f"{top_folder}/{bdat_folder}",
-                                'values': ("folder", bdat_folder_path),
-                                'children': []
-                            })
-
-                            if bdat_folder in FOLDER_STATUS:
-                                file_list.item(folder_id, tags=(FOLDER_STATUS[bdat_folder],))
-
-                            inner_folder_path = os.path.join(bdat_folder_path, bdat_folder)
-                            if os.path.isdir(inner_folder_path):
-                                json_files = [f for f in os.listdir(inner_folder_path) if f.endswith(".json")]
-                                for json_file in json_files:
-                                    json_path = os.path.join(inner_folder_path, json_file)
-                                    child_id = file_list.insert(folder_id, "end", text=json_file, values=("file", json_path))
-                                    ORIGINAL_FILE_LIST[-1]['children'].append({
-                                        'id': child_id,
-                                        'text': json_file,
-                                        'values': ("file", json_path)
-                                    })
-        else:
-            # Xenoblade 2 has direct bdat folders
-            for bdat_folder in os.listdir(BASE_DIR):
-                bdat_folder_path = os.path.join(BASE_DIR, bdat_folder)
-                if os.path.isdir(bdat_folder_path):
-                    folder_id = file_list.insert("", "end", text=bdat_folder, values=("folder", bdat_folder_path))
-                    ORIGINAL_FILE_LIST.append({
-                        'id': folder_id,
-                        'text': bdat_folder,
-                        'values': ("folder", bdat_folder_path),
-                        'children': []
-                    })
-
-                    if bdat_folder in FOLDER_STATUS:
-                        file_list.item(folder_id, tags=(FOLDER_STATUS[bdat_folder],))
-
-                    inner_folder_path = os.path.join(bdat_folder_path, bdat_folder)
-                    if os.path.isdir(inner_folder_path):
-                        json_files = [f for f in os.listdir(inner_folder_path) if f.endswith(".json")]
-                        for json_file in json_files:
-                            json_path = os.path.join(inner_folder_path, json_file)
-                            child_id = file_list.insert(folder_id, "end", text=json_file, values=("file", json_path))
-                            ORIGINAL_FILE_LIST[-1]['children'].append({
-                                'id': child_id,
-                                'text': json_file,
-                                'values': ("file", json_path)
-                            })
+        # Xenoblade 3 has game/ and evt/ folders, the other games have direct bdat folders
+        for folder_text, bdat_folder_path, _ in folders:
+            insert_folder_item(folder_text, bdat_folder_path)
+            ORIGINAL_FILE_LIST.append((folder_text, bdat_folder_path))
 
+        rebuild_nav_index()
 
+
+@timed("load")
 def load_table_data(json_path):
     """Loads the selected JSON file into the table."""
     global CURRENT_JSON_PATH, CURRENT_JSON_DATA, CURRENT_ORIGINAL_JSON_PATH, CURRENT_ORIGINAL_JSON_DATA, GAME_VERSION, TREE
+    global CURRENT_DOC_STATE, CURRENT_REFERENCES
 
+    close_folder_view()
     CURRENT_JSON_PATH = json_path
-    CURRENT_JSON_DATA = load_json(CURRENT_JSON_PATH)
+    CURRENT_JSON_DATA, CURRENT_DOC_STATE = load_document_data(CURRENT_JSON_PATH)
+    rebuild_row_index()
+    CURRENT_REVIEW_IDS.clear()
+    if BASE_DIR:
+        CURRENT_REVIEW_IDS.update(str(row_id) for row_id in REVIEW_LIST.get(review_key(json_path, BASE_DIR), []))
 
-    # Find corresponding file in second base dir if it exists
-    CURRENT_ORIGINAL_JSON_DATA = None
-    if SECOND_BASE_DIR:
-        # Get relative path from first base dir
-        rel_path = os.path.relpath(json_path, BASE_DIR)
-        # Build path in second base dir
-        original_path = os.path.join(SECOND_BASE_DIR, rel_path)
-        if os.path.exists(original_path):
-            CURRENT_ORIGINAL_JSON_PATH = original_path
-            CURRENT_ORIGINAL_JSON_DATA = load_json(original_path)
-        elif GAME_VERSION in ["Xenoblade3", "XenobladeX"]:
-            # For XB3, also check if the file exists in the other top-level folder (game/evt)
-            parts = rel_path.split(os.sep)
-            if len(parts) > 1 and parts[0] in ["game", "evt"]:
-                # Try the opposite folder
-                opposite_folder = "evt" if parts[0] == "game" else "game"
-                opposite_path = os.path.join(SECOND_BASE_DIR, opposite_folder, *parts[1:])
-                if os.path.exists(opposite_path):
-                    CURRENT_ORIGINAL_JSON_PATH = opposite_path
-                    CURRENT_ORIGINAL_JSON_DATA = load_json(opposite_path)
+    # Find the corresponding files in the second base dir and the reference dirs
+    original_path, CURRENT_ORIGINAL_JSON_DATA, CURRENT_REFERENCES, errors = load_originals(json_path)
+    if original_path:
+        CURRENT_ORIGINAL_JSON_PATH = original_path
+    if errors:
+        messagebox.showerror("Error Loading JSON", "\n".join(errors))
 
     if CURRENT_JSON_DATA:
         if TREE:
-            populate_table(TREE, CURRENT_ORIGINAL_JSON_DATA, CURRENT_JSON_DATA)
+            populate_table(TREE, CURRENT_ORIGINAL_JSON_DATA, CURRENT_JSON_DATA, CURRENT_REFERENCES)
         else:
             print("TREE is not initialized yet.")
 
+def confirm_unsaved_changes():
+    """Offers to save unsaved changes. Returns False if the user cancelled."""
+    if UNSAVED_CHANGES and (CURRENT_JSON_PATH or FOLDER_VIEW):
+        response = messagebox.askyesnocancel("Warning", "You have unsaved changes. Do you want to save them?", icon='warning')
+        if response is True:  # Yes, save changes
+            save_table_data()
+        elif response is None:  # Cancel
+            return False  # Do nothing, stay on the current file
+    return True
+
+def open_file_at_row(json_path, row_id=None):
+    """Loads a file (unless it is already open) and selects the row with the given $id."""
+    global UNSAVED_CHANGES
+    if not CURRENT_JSON_PATH or os.path.normpath(CURRENT_JSON_PATH) != os.path.normpath(json_path):
+        if not confirm_unsaved_changes():
+            return
+        load_table_data(json_path)
+        UNSAVED_CHANGES = False
+
+    if row_id is not None and CURRENT_JSON_DATA:
+        for row, item in zip(CURRENT_JSON_DATA.get('rows', []), ROW_ITEMS):
+            if str(row.get('$id', '')) == str(row_id):
+                select_table_item(item)
+                break
+
 def file_list_select(event):
     """Handles selection in the file list."""
     global CURRENT_JSON_PATH, UNSAVED_CHANGES
 
     # Check for unsaved changes before proceeding
-    if UNSAVED_CHANGES and CURRENT_JSON_PATH:
-        response = messagebox.askyesnocancel("Warning", "You have unsaved changes. Do you want to save them?", icon='warning')
-        if response is True:  # Yes, save changes
-            save_table_data()
-        elif response is None:  # Cancel
-            return  # Do nothing, stay on the current file
+    if not confirm_unsaved_changes():
+        return
 
     selection = file_list.selection()
     if not selection:
@@ -451,26 +1068,43 @@ def file_list_select(event):
     if item_type == "file":
         load_table_data(item_path)
     elif item_type == "folder":
-        # Load the first JSON file in the folder
-        inner_folder_path = os.path.join(item_path, os.path.basename(item_path))
-        if os.path.isdir(inner_folder_path):
-            json_files = [f for f in os.listdir(inner_folder_path) if f.endswith(".json")]
-            if json_files:
-                first_json_path = os.path.join(inner_folder_path, json_files[0])
-                load_table_data(first_json_path)
+        # Show all JSON files of the folder as one table
+        open_folder_view(item_path)
 
     UNSAVED_CHANGES = False  # Reset the flag after loading new data
 
+@timed("save")
 def save_table_data():
     """Saves the edited data back to the JSON file."""
-    global CURRENT_JSON_PATH, CURRENT_JSON_DATA, UNSAVED_CHANGES
+    global CURRENT_JSON_PATH, CURRENT_JSON_DATA, CURRENT_DOC_STATE, UNSAVED_CHANGES
+
+    if SERVER_CLIENT:
+        # Edits already went to the server row by row; have it write them now
+        try:
+            SERVER_CLIENT.request("flush")
+        except (ServerError, ConnectionError) as e:
+            messagebox.showerror("Error", f"The project server could not save:\n{e}")
+            return
+        UNSAVED_CHANGES = False
+        return
+
+    if FOLDER_VIEW:
+        errors = FOLDER_VIEW.save()
+        if errors:
+            messagebox.showerror("Error", "Could not save:\n" + "\n".join(errors))
+        else:
+            UNSAVED_CHANGES = False
+        if FOLDER_VIEW.reload_needed:
+            open_folder_view(FOLDER_VIEW.folder_path)
+        return
 
     if not CURRENT_JSON_PATH or not CURRENT_JSON_DATA:
         messagebox.showerror("Error", "No JSON file loaded.")
         return
 
-    # Get data from the treeview
-    for index, item in enumerate(TREE.get_children()):
+    reviewed = []  # Rows to review that were edited
+    # Get data from the treeview; ROW_ITEMS is in row order whatever the sort and filter
+    for index, item in enumerate(ROW_ITEMS):
         try:
             edited_text = TREE.item(item)['values'][3]  # Get the value from the translated text column
             # Convert visible special characters back to actual characters
@@ -478,27 +1112,49 @@ def save_table_data():
                 if not isinstance(edited_text, str):
                     print(f"Problem in row {index}: Found non-string value (type={type(edited_text)}), converting to string. Content={repr(edited_text)}")  # Debug output
                     edited_text = str(edited_text)
-                edited_text = edited_text.replace('\\n', '\n').replace('\\t', '\t').replace('\\r', '\r')
+                edited_text = unescape_text(edited_text)
 
             if CURRENT_JSON_DATA and 'rows' in CURRENT_JSON_DATA and len(CURRENT_JSON_DATA['rows']) > index:
                 row = CURRENT_JSON_DATA['rows'][index]
+                if str(row.get('$id', '')) in CURRENT_REVIEW_IDS and edited_text != CURRENT_DOC_STATE.base_texts.get(row.get('$id')):
+                    reviewed.append(row.get('$id', ''))
                 row['edited_text'] = edited_text
         except Exception as e:
             print(f"Error in row {index}: {str(e)}. Value type={type(edited_text)}, Content={repr(edited_text)}")  # Debug output
             raise  # Re-raise the exception after logging it
 
-    save_json(CURRENT_JSON_PATH, CURRENT_JSON_DATA)
+    result = save_json(CURRENT_JSON_PATH, CURRENT_JSON_DATA, CURRENT_DOC_STATE)
+    if result is None or result[0] == "cancelled":
+        return
+    status, saved_data, CURRENT_DOC_STATE = result
     UNSAVED_CHANGES = False  # Reset the flag after saving
+    if status == "merged":
+        # Show the rows that came from disk
+        CURRENT_JSON_DATA = saved_data
+        rebuild_row_index()
+        populate_table(TREE, CURRENT_ORIGINAL_JSON_DATA, CURRENT_JSON_DATA, CURRENT_REFERENCES)
+    update_nav_index(CURRENT_JSON_PATH, saved_data, CURRENT_ORIGINAL_JSON_DATA)
+    if reviewed:
+        mark_rows_reviewed(reviewed)
 
 def undo_changes():
     """Reloads the original JSON data into the table, discarding changes."""
-    global CURRENT_JSON_PATH, CURRENT_JSON_DATA, CURRENT_ORIGINAL_JSON_DATA, UNSAVED_CHANGES
-    if CURRENT_JSON_PATH:
+    global CURRENT_JSON_PATH, CURRENT_JSON_DATA, CURRENT_ORIGINAL_JSON_DATA, CURRENT_DOC_STATE, UNSAVED_CHANGES
+    if SERVER_CLIENT:
+        reload_table()
+        messagebox.showinfo("Info", "Edits go to the project server as they are made and can't be undone. "
+                            "Table reloaded from the server.")
+    elif FOLDER_VIEW:
+        open_folder_view(FOLDER_VIEW.folder_path)
+        messagebox.showinfo("Info", "Changes undone. Table reloaded from files.")
+        UNSAVED_CHANGES = False
+    elif CURRENT_JSON_PATH:
         # Reload the JSON data
-        CURRENT_JSON_DATA = load_json(CURRENT_JSON_PATH)
+        CURRENT_JSON_DATA, CURRENT_DOC_STATE = load_document_data(CURRENT_JSON_PATH)
+        rebuild_row_index()
         if CURRENT_JSON_DATA:
             # Repopulate the table with original and translated data
-            populate_table(TREE, CURRENT_ORIGINAL_JSON_DATA, CURRENT_JSON_DATA)
+            populate_table(TREE, CURRENT_ORIGINAL_JSON_DATA, CURRENT_JSON_DATA, CURRENT_REFERENCES)
             messagebox.showinfo("Info", "Changes undone. Table reloaded from file.")
             UNSAVED_CHANGES = False  # Reset the flag after undo
     else:
@@ -507,18 +1163,22 @@ def undo_changes():
 def edit_cell(event):
     """Handles cell editing in the Treeview."""
     global UNSAVED_CHANGES
-    if not UNSAVED_CHANGES:
+    if not UNSAVED_CHANGES and not SERVER_CLIENT:
         UNSAVED_CHANGES = True  # Set flag on first edit
     for item in TREE.selection():
         # Identify column and row
         column = TREE.identify_column(event.x)
         row = TREE.identify_row(event.y)
 
-        # Get column id
-        column_id = int(column[1:]) - 1
+        # Get column id (the position in the values; the FILE column may be displayed first)
+        column_id = value_index(column)
 
         # Only allow editing of the "EDITED TEXT" column (column 4)
         if column_id == 3:
+            # Other clients of the project server can't edit the row until this edit ends
+            if SERVER_CLIENT and not lock_server_row(item):
+                return
+
             # Get bounding box of the cell
             x, y, width, height = TREE.bbox(item, column)
 
@@ -546,8 +1206,12 @@ def edit_cell(event):
             text_widget.place(x=x, y=y, width=max(width, 100), height=max(height*20, 80))  # Minimum reasonable sizes
             text_widget.focus()
 
-            # Show character counts
-            tooltip = show_character_counts(text_widget)
+            # Show live line metrics
+            original_value = TREE.item(item, 'values')[2]
+            item_path = item_file_path(item)
+            filename = os.path.basename(item_path) if item_path else None
+            tooltip = LineMetricsPanel(text_widget, filename, active_glyph_table(),
+                                       original_value if original_value else None)
 
             def save_value(event=None):
                 # Get the text and convert special characters back to visible format
@@ -559,14 +1223,16 @@ def edit_cell(event):
                 values[column_id] = formatted_value  # Store formatted version
                 TREE.item(item, values=values)
                 UNSAVED_CHANGES = True  # Set the flag when a change is made
+                if SERVER_CLIENT:
+                    send_server_edit(item_path, {str(values[0]): unescape_text(formatted_value)})
 
                 # Check line length and apply tag
-                if CURRENT_JSON_PATH:
-                    filename = os.path.basename(CURRENT_JSON_PATH)
-                    if check_line_length(filename, formatted_value):
-                        TREE.item(item, tags=("red",))
-                    else:
-                        TREE.item(item, tags=())  # Remove the tag if it exists
+                if FOLDER_VIEW:
+                    FOLDER_VIEW.touched.add(item_path)
+                    TREE.item(item, tags=FOLDER_VIEW.row_tags(item, formatted_value, active_glyph_table()))
+                elif CURRENT_JSON_PATH:
+                    TREE.item(item, tags=row_tags(filename, formatted_value, values[0], active_glyph_table()))
+                    update_row_view_keys(item)
 
                 # Update row height
                 font_size = font_size_var.get()
@@ -593,8 +1259,8 @@ def edit_cell(event):
                     # Insert the clipboard content at the current cursor position
                     text_widget.insert(tk.INSERT, clipboard_content)
 
-                    # Trigger the character count update
-                    update_counts()
+                    # Trigger the line metrics update
+                    tooltip.refresh()
 
                 except tk.TclError:
                     # This can happen if the clipboard is empty or contains non-text data.
@@ -616,46 +1282,21 @@ def edit_cell(event):
 
             # Bind escape key to cancel editing
             def cancel_edit(event):
+                if SERVER_CLIENT:
+                    unlock_server_row(item_path, TREE.item(item, 'values')[0])
                 text_widget.destroy()
                 tooltip.destroy()
             text_widget.bind('<Escape>', cancel_edit)
 
-            # Update character counts while typing
-            def update_counts(event=None):
-                try:
-                    # Update the tooltip with new counts
-                    text = text_widget.get("1.0", "end-1c")
-                    # Split by actual newlines (from pressing Enter) and properly escaped \n
-                    lines = []
-                    temp_lines = []
-                    # First split by actual newlines
-                    for part in text.split('\n'):
-                        # Then split by properly escaped \n (not just backslash)
-                        temp_lines.extend(part.split('\\n'))
-
-                    # Now properly handle the split parts
-                    for line in temp_lines:
-                        # Only add non-empty lines
-                        if line.strip():
-                            lines.append(line)
-
-                    # Clear existing labels and create new ones
-                    for child in tooltip.winfo_children():
-                        child.destroy()
-
-                    # Create new labels for each line
-                    for i, line in enumerate(lines):
-                        count = len(line)
-                        label = ttk.Label(tooltip, text=f"Line {i+1}: {count} chars", background="#FFFFE0")
-                        label.pack()
-                except:
-                    pass
-                return True
-
-            text_widget.bind('<KeyRelease>', update_counts)
+            # Update line metrics while typing
+            text_widget.bind('<KeyRelease>', tooltip.on_key)
 
 def mark_folder(status):
-    """Marks the selected folder or file with a background color."""
+    """Marks the selected file or folder with a background color.
+
+    A folder mark is stored for the folder alone: its files keep their own
+    statuses, and clearing the mark shows the color rolled up from them again.
+    """
     selection = file_list.selection()
     if not selection:
         messagebox.showinfo("Info", "Please select a folder or file.")
@@ -667,74 +1308,110 @@ def mark_folder(status):
     item_path = file_list.item(selected_item, 'values')[1]
     item_type = file_list.item(selected_item, 'values')[0]
 
-    if status == "green":
-        color = "green"
-    elif status == "orange":
-        color = "orange"
-    else:
-        color = ""  # Set color to empty string to clear the tag
-
-    # For files, store relative path from the BDAT folder
     if item_type == "file":
-        # Get the BDAT folder name (parent folder)
-        bdat_folder = os.path.basename(os.path.dirname(os.path.dirname(item_path)))
-        # Get relative path within BDAT folder
-        rel_path = os.path.relpath(item_path, os.path.join(BASE_DIR, bdat_folder))
-        # Convert to forward slashes for consistency
-        key = rel_path.replace('\\', '/')
+        apply_file_status(item_path, status)
+        if STATUS_STORE and not SERVER_CLIENT:
+            STATUS_STORE.set(file_status_key(item_path, BASE_DIR), status)
     else:
-        # For folders, just use the folder name
-        key = item_text
-
-    # Update the status in the dictionary
-    if key:
-        if status:
-            FOLDER_STATUS[key] = status  # Store the status
-        else:
-            FOLDER_STATUS.pop(key, None)  # Remove the item from the status if clearing
-
-        # Apply the tag to the selected item
-        file_list.item(selected_item, tags=(color,))
+        apply_folder_status(item_text, item_path, status)
+        if STATUS_STORE and not SERVER_CLIENT:
+            STATUS_STORE.set(item_text, status)
 
-        save_config()  # Save the configuration
+    if SERVER_CLIENT:
+        # The server stores the statuses and passes them on to the other clients
+        try:
+            if item_type == "file":
+                SERVER_CLIENT.send("set_status", files={server_rel_path(item_path): status}, folders={})
+            else:
+                SERVER_CLIENT.send("set_status", files={}, folders={item_text: status})
+        except ConnectionError as e:
+            messagebox.showerror("Project Server", str(e))
+    elif STATUS_STORE:
+        schedule_save_config()  # Save the configuration
+
+def apply_folder_status(folder_text, folder_path, status):
+    """Shows a status set by hand on a folder, or clears it."""
+    if status:
+        FOLDER_STATUS[folder_text] = status
+    else:
+        FOLDER_STATUS.pop(folder_text, None)
+        FOLDER_STATUS.pop(os.path.basename(folder_path), None)
+    if STATUS_ROLLUP:
+        STATUS_ROLLUP.set_folder_mark(folder_path, status)
+    set_file_list_status(folder_path, file_list_status("folder", folder_path, folder_text))
+
+def apply_file_status(json_path, status):
+    """Shows a status set by hand on a file, or clears it."""
+    # Files are stored by their path relative to the BDAT folder
+    key = file_status_key(json_path, BASE_DIR)
+    if status:
+        FOLDER_STATUS[key] = status
+    else:
+        FOLDER_STATUS.pop(key, None)  # Clearing goes back to the derived status
+    if STATUS_ROLLUP:
+        update_file_status(json_path)
+    else:
+        set_file_list_status(json_path, status)
 
 def load_config():
-    """Loads the folder and file status from the config file."""
-    global FOLDER_STATUS
-    config = configparser.ConfigParser()
-    config_path = os.path.join(BASE_DIR, "translation_config.ini")
+    """Loads the folder and file status from the project's status store."""
+    global FOLDER_STATUS, STATUS_STORE
+    close_status_store()
 
     try:
-        config.read(config_path)
-        if 'FOLDER_STATUS' in config:
-            FOLDER_STATUS = {k: v for k, v in config['FOLDER_STATUS'].items()}
+        # Imports translation_config.ini automatically the first time
+        STATUS_STORE = StatusStore.open(BASE_DIR)
+        FOLDER_STATUS = STATUS_STORE.load()
     except Exception as e:
+        FOLDER_STATUS = {}
         print(f"Error loading config: {e}")
 
-    # Apply colors to both folders and files based on loaded config
-    # Note: This loop might not work effectively if called before populate_file_list is fully done,
-    # but populate_file_list handles folder coloring directly.
-    # We will handle nested file coloring after population.
-    pass
-
 def save_config():
-    """Saves the folder status to the config file."""
-    config = configparser.ConfigParser()
-    config['FOLDER_STATUS'] = FOLDER_STATUS
-    config_path = os.path.join(BASE_DIR, "translation_config.ini")
+    """Writes the queued status changes to the status store."""
+    global status_flush_job
+    status_flush_job = None
+    if STATUS_STORE:
+        try:
+            STATUS_STORE.flush()
+        except Exception as e:
+            print(f"Error saving config: {e}")
+
+def schedule_save_config():
+    """Batches status changes made in quick succession into one write."""
+    global status_flush_job
+    if status_flush_job is None:
+        status_flush_job = root.after(STATUS_FLUSH_DELAY, save_config)
+
+def close_status_store():
+    """Flushes and closes the status store of the current project."""
+    global STATUS_STORE, status_flush_job
+    if status_flush_job is not None:
+        root.after_cancel(status_flush_job)
+        status_flush_job = None
+    if STATUS_STORE:
+        try:
+            STATUS_STORE.close()
+        except Exception as e:
+            print(f"Error saving config: {e}")
+        STATUS_STORE = None
 
-    try:
-        with open(config_path, 'w') as configfile:
-            config.write(configfile)
-    except Exception as e:
-        print(f"Error saving config: {e}")
+def on_close():
+    """Saves the state and closes the application."""
+    disconnect_project_server(reload=False)
+    close_status_store()
+    save_gui_state()
+    root.destroy()
 
 def save_gui_state():
     """Saves the GUI state (base directories) to the config file."""
     config = configparser.ConfigParser()
     config['GUI_STATE'] = {
         'base_dir': BASE_DIR if BASE_DIR else "",
-        'second_base_dir': SECOND_BASE_DIR if SECOND_BASE_DIR else ""
+        'second_base_dir': SECOND_BASE_DIR if SECOND_BASE_DIR else "",
+        'build_dir': BUILD_DIR if BUILD_DIR else "",
+        'mt_endpoint': MT_ENDPOINT,
+        'server_address': SERVER_ADDRESS,
+        'reference_dirs': os.pathsep.join(REFERENCE_DIRS)
     }
     # Add quotes around the values
     for key in config['GUI_STATE']:
@@ -750,8 +1427,8 @@ def save_gui_state():
         print(f"Error saving GUI state: {e}")
 
 def load_gui_state():
-    """Loads the GUI state (base directories) from the config file."""
-    global BASE_DIR, SECOND_BASE_DIR
+    """Loads the GUI state (base directories) from the config file. Runs before the window is built."""
+    global BASE_DIR, SECOND_BASE_DIR, BUILD_DIR, MT_ENDPOINT, REFERENCE_DIRS, SERVER_ADDRESS
     config = configparser.ConfigParser()
     script_dir = os.path.dirname(os.path.abspath(__file__))
     script_name = os.path.splitext(os.path.basename(__file__))[0]
@@ -762,12 +1439,18 @@ def load_gui_state():
         if 'GUI_STATE' in config:
             BASE_DIR = config['GUI_STATE'].get('base_dir', "").strip('"')
             SECOND_BASE_DIR = config['GUI_STATE'].get('second_base_dir', "").strip('"')
+            BUILD_DIR = config['GUI_STATE'].get('build_dir', "").strip('"')
+            BUILD_DIR = os.path.normpath(BUILD_DIR) if BUILD_DIR else None
+            MT_ENDPOINT = config['GUI_STATE'].get('mt_endpoint', "").strip('"') or MT_ENDPOINT
+            SERVER_ADDRESS = config['GUI_STATE'].get('server_address', "").strip('"') or SERVER_ADDRESS
+            reference_dirs = config['GUI_STATE'].get('reference_dirs', "").strip('"')
+            REFERENCE_DIRS = [os.path.normpath(path) for path in reference_dirs.split(os.pathsep)
+                              if path and os.path.isdir(path)]
 
             # Normalize paths and ensure they exist
             if BASE_DIR and os.path.exists(BASE_DIR):
                 BASE_DIR = os.path.normpath(BASE_DIR)
                 print(f"Loaded BASE_DIR: {BASE_DIR}")
-                base_dir_label.config(text=f"Base Directory: {BASE_DIR}")
             else:
                 BASE_DIR = None
                 print("BASE_DIR path does not exist or is invalid")
@@ -775,7 +1458,6 @@ def load_gui_state():
             if SECOND_BASE_DIR and os.path.exists(SECOND_BASE_DIR):
                 SECOND_BASE_DIR = os.path.normpath(SECOND_BASE_DIR)
                 print(f"Loaded SECOND_BASE_DIR: {SECOND_BASE_DIR}")
-                second_base_dir_label.config(text=f"Second Directory: {SECOND_BASE_DIR}")
             else:
                 SECOND_BASE_DIR = None
                 print("SECOND_BASE_DIR path does not exist or is invalid")
@@ -784,38 +1466,11 @@ def load_gui_state():
         print(f"Error loading GUI state: {e}")
     print(f"Config file path: {config_path}")
 
-# --- GUI Setup ---
-root = tk.Window(themename='flatly')
-root.title("BDAT Translation Tool")
-# Set default font size for the application
-default_font = ('Calibri', 12)
-root.option_add('*Font', default_font)
-root.option_add('*TCombobox*Font', default_font)
-root.option_add('*TEntry*Font', default_font)
-root.option_add('*TLabel*Font', default_font)
-
-# Call save_gui_state when the window is closed
-root.protocol("WM_DELETE_WINDOW", lambda: [save_gui_state(), root.destroy()])
-
-# Ensure we only have one window
-root.withdraw()
-root.deiconify()
-
-# --- Top Frame (Directory/File Navigation and Buttons) ---
-top_frame = ttk.Frame(root, padding=10)
-top_frame.pack(side=tk.TOP, fill=tk.X)
-
-# Search filter
-search_frame = ttk.Frame(top_frame)
-search_frame.pack(side=tk.LEFT, padx=5, pady=5)
-
-search_label = ttk.Label(search_frame, text="Search:")
-search_label.pack(side=tk.LEFT)
-
-search_var = tk.StringVar()
-search_entry = ttk.Entry(search_frame, textvariable=search_var, width=20)
-search_entry.pack(side=tk.LEFT, padx=5)
-search_entry.bind('<KeyRelease>', filter_folders)
+    # Environment overrides, used by the benchmark harness
+    if os.environ.get("XB_BASE_DIR"):
+        BASE_DIR = os.path.normpath(os.environ["XB_BASE_DIR"])
+    if os.environ.get("XB_SECOND_DIR"):
+        SECOND_BASE_DIR = os.path.normpath(os.environ["XB_SECOND_DIR"])
 
 def update_font_size(event=None):
     """Updates the font size and repopulates the table."""
@@ -838,44 +1493,75 @@ def update_font_size(event=None):
 
         # Repopulate table if data is loaded
         if CURRENT_JSON_PATH and CURRENT_ORIGINAL_JSON_DATA and CURRENT_JSON_DATA:
-            populate_table(TREE, CURRENT_ORIGINAL_JSON_DATA, CURRENT_JSON_DATA)
-
-
-
-base_dir_button = ttk.Button(top_frame, text="Select Base Dir", command=browse_base_dir)
-base_dir_button.pack(side=tk.LEFT, padx=5, pady=5)
-
-base_dir_label = ttk.Label(top_frame, text="Base Directory: None")
-base_dir_label.pack(side=tk.LEFT, padx=5, pady=5)
-
-second_base_dir_button = ttk.Button(top_frame, text="Select Second Dir", command=browse_second_base_dir)
-second_base_dir_button.pack(side=tk.LEFT, padx=5, pady=5)
-
-second_base_dir_label = ttk.Label(top_frame, text="Second Directory: None")
-second_base_dir_label.pack(side=tk.LEFT, padx=5, pady=5)
-
-# --- Panedwindow for Left/Right Sections ---
-paned_window = ttk.Panedwindow(root, orient=tk.HORIZONTAL)
-paned_window.pack(fill=tk.BOTH, expand=True)
-
-# --- Left Frame (File List) ---
-left_frame = ttk.Frame(paned_window, padding=10)
-paned_window.add(left_frame)
-
-# --- File List with Scrollbar ---
-file_list_frame = ttk.Frame(left_frame)
-file_list_frame.pack(fill=tk.BOTH, expand=True)
+            populate_table(TREE, CURRENT_ORIGINAL_JSON_DATA, CURRENT_JSON_DATA, CURRENT_REFERENCES)
+
+def update_status_bar():
+    """Shows the most recent timings in the status bar."""
+    if instrument.ENABLED:
+        status_bar.config(text=instrument.format_recent_timings())
+
+def on_span_finished(name, duration, children):
+    # Spans finished on worker threads must not touch Tk
+    if threading.current_thread() is threading.main_thread():
+        update_status_bar()
+
+def toggle_profiling():
+    """Switches the instrumentation on or off from the Tools menu."""
+    instrument.set_enabled(profiling_var.get())
+    if instrument.ENABLED:
+        status_bar.pack(side=tk.BOTTOM, fill=tk.X, before=paned_window)
+        status_bar.config(text="Profiling enabled")
+    else:
+        status_bar.pack_forget()
 
-file_list_scrollbar = ttk.Scrollbar(file_list_frame)
-file_list_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+def export_trace():
+    """Saves the recorded spans as a Chrome trace file."""
+    if not instrument.TRACE_EVENTS:
+        messagebox.showinfo("Info", "No timings recorded yet. Enable profiling first.")
+        return
+    path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("Chrome Trace", "*.json")])
+    if path:
+        try:
+            instrument.write_trace(path)
+            messagebox.showinfo("Success", f"Trace saved to {path}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not save trace: {e}")
 
-file_list = ttk.Treeview(file_list_frame, columns=("Type", "Path"), yscrollcommand=file_list_scrollbar.set, style='FileList.Treeview')
-file_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-file_list.heading("#0", text="Folders/Files", anchor=tk.W)
-file_list.heading("Type", text="Type")
-file_list.column("Type", width=50, stretch=False)
-file_list.column("Path", width=0, stretch=False)  # Hide the path column
-file_list.bind("<Double-1>", file_list_select)  # Double-click to load
+def start_watchdog():
+    """Starts the stall watchdog and its heartbeat on the Tk event loop."""
+    global WATCHDOG
+    if STALL_THRESHOLD_MS <= 0:
+        return
+    WATCHDOG = StallWatchdog(HEARTBEAT_INTERVAL / 1000, STALL_THRESHOLD_MS / 1000, app_files=[__file__])
+    WATCHDOG.start()
+    root.after(HEARTBEAT_INTERVAL, heartbeat)
+
+def heartbeat():
+    WATCHDOG.beat()  # Stalls are counted by the watchdog and listed in the stall log
+    root.after(HEARTBEAT_INTERVAL, heartbeat)
+
+def show_stall_log():
+    """Lists the recorded UI stalls, most recent first."""
+    if not WATCHDOG or not WATCHDOG.records:
+        messagebox.showinfo("Stall Log", "No UI stalls recorded." if WATCHDOG else "The stall watchdog is disabled (XB_STALL_MS=0).")
+        return
+    lines = [f"Stalls over {WATCHDOG.threshold * 1000:.0f} ms: {len(WATCHDOG.records)}", ""]
+    for stall in reversed(WATCHDOG.records):
+        lines.append(f"{stall['started']}  {stall['duration']:.2f} s  {stall['operation']}")
+    messagebox.showinfo("Stall Log", "\n".join(lines[:32]))
+
+def export_stall_log():
+    """Saves the recorded UI stalls with their stacks as JSON."""
+    if not WATCHDOG or not WATCHDOG.records:
+        messagebox.showinfo("Info", "No UI stalls recorded.")
+        return
+    path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON", "*.json")])
+    if path:
+        try:
+            WATCHDOG.export(path)
+            messagebox.showinfo("Success", f"Stall log saved to {path}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not save stall log: {e}")
 
 def open_translated_dir(event=None):
     selected_item = file_list.selection()
@@ -942,18 +1628,7 @@ def copy_file_content(mode="translated"):
             messagebox.showerror("Error", "Second Base Directory not set.")
             return
 
-        rel_path = os.path.relpath(item_path, BASE_DIR)
-        original_path = os.path.join(SECOND_BASE_DIR, rel_path)
-
-        if os.path.exists(original_path):
-             target_original_path = original_path
-        elif GAME_VERSION in ["Xenoblade3", "XenobladeX"]:
-            parts = rel_path.split(os.sep)
-            if len(parts) > 1 and parts[0] in ["game", "evt"]:
-                opposite_folder = "evt" if parts[0] == "game" else "game"
-                opposite_path = os.path.join(SECOND_BASE_DIR, opposite_folder, *parts[1:])
-                if os.path.exists(opposite_path):
-                    target_original_path = opposite_path
+        target_original_path = resolve_original_path(item_path, BASE_DIR, SECOND_BASE_DIR, GAME_VERSION)
 
         if not target_original_path and mode == "original":
              messagebox.showerror("Error", "Original file not found.")
@@ -966,66 +1641,7 @@ def copy_file_content(mode="translated"):
     # Get filename without extension
     filename_no_ext = os.path.splitext(os.path.basename(item_path))[0]
 
-    output_lines = []
-    output_lines.append(filename_no_ext)
-    output_lines.append("")
-
-    if mode == "both" and data_translated and data_original:
-        # Create a map for original data for quick lookup
-        org_map = {row.get('$id'): list(row.values())[-1] for row in data_original['rows']}
-
-        for row in data_translated['rows']:
-            row_id = row.get('$id', '')
-            tl_text = list(row.values())[-1] if row else ''
-            org_text = org_map.get(row_id, "")
-
-            if tl_text is None: tl_text = ""
-            if org_text is None: org_text = ""
-
-            tl_text = str(tl_text).replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
-            org_text = str(org_text).replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
-
-            output_lines.append(f"[{row_id}]: {org_text}")
-            output_lines.append(f"[{row_id}]: {tl_text}")
-            output_lines.append("") # Separator
-
-    elif mode == "both_sequential" and data_translated and data_original:
-        # Block 1: Original
-        for row in data_original['rows']:
-            row_id = row.get('$id', '')
-            text_content = list(row.values())[-1] if row else ''
-            if text_content is None: text_content = ""
-            text_content = str(text_content).replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
-            output_lines.append(f"[{row_id}]: {text_content}")
-
-        output_lines.append("")
-        output_lines.append("")
-
-        # Block 2: Translated
-        output_lines.append(filename_no_ext)
-        output_lines.append("")
-        for row in data_translated['rows']:
-            row_id = row.get('$id', '')
-            text_content = list(row.values())[-1] if row else ''
-            if text_content is None: text_content = ""
-            text_content = str(text_content).replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
-            output_lines.append(f"[{row_id}]: {text_content}")
-
-    elif mode == "original" and data_original:
-        for row in data_original['rows']:
-            row_id = row.get('$id', '')
-            text_content = list(row.values())[-1] if row else ''
-            if text_content is None: text_content = ""
-            text_content = str(text_content).replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
-            output_lines.append(f"[{row_id}]: {text_content}")
-
-    elif mode == "translated" and data_translated:
-        for row in data_translated['rows']:
-            row_id = row.get('$id', '')
-            text_content = list(row.values())[-1] if row else ''
-            if text_content is None: text_content = ""
-            text_content = str(text_content).replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
-            output_lines.append(f"[{row_id}]: {text_content}")
+    output_lines = format_file_lines(filename_no_ext, mode, data_translated, data_original)
 
     final_text = "\n".join(output_lines)
 
@@ -1034,62 +1650,1184 @@ def copy_file_content(mode="translated"):
     root.update()
     messagebox.showinfo("Success", f"Copied content ({mode}) to clipboard.")
 
-def paste_file_content():
-    """Pastes translated lines from clipboard into the currently opened file."""
-    if not CURRENT_JSON_DATA:
-        messagebox.showerror("Error", "No file is currently loaded.")
+def run_background_task(title, work, on_done):
+    """Runs work(progress, cancel) on a worker thread while a progress dialog keeps the window responsive.
+
+    work may call progress(done, total) and should stop when the cancel event is set.
+    on_done(result, error) is called on the Tk thread when the work has finished.
+    """
+    state = {'done': 0, 'total': 0, 'result': None, 'error': None, 'finished': False}
+    cancel = threading.Event()
+
+    dialog = tk.Toplevel(root)
+    dialog.title(title)
+    dialog.transient(root)
+    dialog.resizable(False, False)
+    status_label = ttk.Label(dialog, text="Starting...", padding=10)
+    status_label.pack(fill=tk.X)
+    progress_bar = ttk.Progressbar(dialog, length=320, maximum=1)
+    progress_bar.pack(padx=10, pady=5)
+    ttk.Button(dialog, text="Cancel", command=cancel.set, bootstyle="secondary").pack(pady=(5, 10))
+    dialog.protocol("WM_DELETE_WINDOW", cancel.set)
+
+    def progress(done, total):
+        state['done'] = done
+        state['total'] = total
+
+    def worker():
+        try:
+            state['result'] = work(progress, cancel)
+        except Exception as e:
+            traceback.print_exc()
+            state['error'] = e
+        state['finished'] = True
+
+    def poll():
+        if state['total']:
+            progress_bar.config(maximum=state['total'], value=state['done'])
+            status_label.config(text=f"{state['done']} / {state['total']}" + (" (cancelling)" if cancel.is_set() else ""))
+        if state['finished']:
+            dialog.destroy()
+            on_done(state['result'], state['error'])
+        else:
+            root.after(100, poll)
+
+    threading.Thread(target=worker, daemon=True).start()
+    root.after(100, poll)
+
+def export_content(mode, scope):
+    """Streams the content of the selected BDAT folder or of the whole project to a text file.
+
+    Uses the same formats as copy_file_content. scope is "folder" or "project".
+    """
+    if not BASE_DIR:
+        messagebox.showerror("Error", "Base Directory not set.")
+        return
+    if mode != "translated" and not SECOND_BASE_DIR:
+        messagebox.showerror("Error", "Second Base Directory not set.")
+        return
+
+    if scope == "folder":
+        selection = file_list.selection()
+        if not selection or file_list.item(selection[0], 'values')[0] != "folder":
+            messagebox.showwarning("Warning", "Please select a folder to export.")
+            return
+        folder_path = file_list.item(selection[0], 'values')[1]
+        json_paths = [path for _, path in folder_files(folder_path)]
+        default_name = os.path.basename(folder_path)
+    else:
+        json_paths = list(iter_project_files(BASE_DIR, GAME_VERSION))
+        default_name = os.path.basename(os.path.normpath(BASE_DIR))
+
+    if not json_paths:
+        messagebox.showinfo("Info", "No JSON files to export.")
+        return
+
+    out_path = filedialog.asksaveasfilename(defaultextension=".txt", initialfile=f"{default_name}_{mode}.txt",
+                                            filetypes=[("Text", "*.txt")])
+    if not out_path:
+        return
+
+    def work(progress, cancel):
+        return export_files(json_paths, out_path, mode, BASE_DIR, SECOND_BASE_DIR, GAME_VERSION,
+                            progress=progress, cancel=cancel)
+
+    def done(result, error):
+        if error:
+            messagebox.showerror("Error", f"Export failed: {error}")
+            return
+        written, skipped, errors, cancelled = result
+        if cancelled:
+            messagebox.showinfo("Info", f"Export cancelled, {out_path} was not written.")
+            return
+        message = f"Exported {written} file(s) ({mode}) to {out_path}."
+        if skipped:
+            message += f"\n{len(skipped)} file(s) skipped because their original was not found."
+        if errors:
+            message += f"\n{len(errors)} file(s) skipped because they could not be read:\n" + \
+                "\n".join(f"{os.path.basename(path)}: {error}" for path, error in list(errors.items())[:5])
+            messagebox.showwarning("Export", message)
+            return
+        messagebox.showinfo("Success", message)
+
+    run_background_task("Exporting", work, done)
+
+def show_report_window(title, columns, rows):
+    """Shows a list of findings. rows are (json_path, row_id, *values); double-click opens the row."""
+    window = tk.Toplevel(root)
+    window.title(title)
+    window.geometry("800x400")
+
+    report = ttk.Treeview(window, columns=("FILE", "ID") + tuple(columns), show="headings")
+    report.heading("FILE", text="FILE")
+    report.heading("ID", text="ID")
+    report.column("FILE", width=200, stretch=False)
+    report.column("ID", width=60, stretch=False)
+    for column in columns:
+        report.heading(column, text=column)
+
+    report_scroll = ttk.Scrollbar(window, orient="vertical", command=report.yview)
+    report.configure(yscrollcommand=report_scroll.set)
+    report_scroll.pack(side="right", fill="y")
+    report.pack(fill=tk.BOTH, expand=True)
+
+    paths = {}
+    for json_path, row_id, *values in rows:
+        item = report.insert("", "end", values=(os.path.basename(json_path), row_id, *values))
+        paths[item] = (json_path, row_id)
+
+    def open_selected(event=None):
+        selection = report.selection()
+        if selection:
+            open_file_at_row(*paths[selection[0]])
+
+    report.bind("<Double-1>", open_selected)
+    return window
+
+def toggle_pixel_validation():
+    """Switches between character and pixel-width line validation and re-checks the open table."""
+    if pixel_validation_var.get() and GAME_VERSION and not find_glyph_table(GAME_VERSION, [BASE_DIR, GLYPH_TABLE_DIR]):
+        pixel_validation_var.set(False)
+        messagebox.showinfo("Info", f"No glyph table found for {GAME_VERSION}.\n"
+                                    f"Place {GAME_VERSION}.json in the base directory or in {GLYPH_TABLE_DIR}.")
+        return
+
+    if FOLDER_VIEW:
+        glyph_table = active_glyph_table()
+        for item in FOLDER_VIEW.item_rows:
+            TREE.item(item, tags=FOLDER_VIEW.row_tags(item, str(TREE.item(item, 'values')[3]), glyph_table))
+    elif CURRENT_JSON_PATH and CURRENT_JSON_DATA:
+        filename = os.path.basename(CURRENT_JSON_PATH)
+        glyph_table = active_glyph_table()
+        for item in ROW_ITEMS:
+            values = TREE.item(item, 'values')
+            TREE.item(item, tags=row_tags(filename, str(values[3]), values[0], glyph_table))
+            update_row_view_keys(item)
+
+def check_project_line_widths():
+    """Checks the pixel width of every row of the project in the background."""
+    table_path = find_glyph_table(GAME_VERSION, [BASE_DIR, GLYPH_TABLE_DIR]) if GAME_VERSION else None
+    if not BASE_DIR or not table_path:
+        messagebox.showinfo("Info", f"No glyph table found for {GAME_VERSION}.")
+        return
+    json_paths = list(iter_project_files(BASE_DIR, GAME_VERSION))
+
+    def work(progress, cancel):
+        return check_project_widths(json_paths, table_path, progress=progress, cancel=cancel)
+
+    def done(result, error):
+        if error:
+            messagebox.showerror("Error", f"Line width check failed: {error}")
+        elif not result:
+            messagebox.showinfo("Success", "No lines exceed their pixel budget.")
+        else:
+            rows = [(path, row_id, "over pixel budget") for path, row_ids in result.items() for row_id in row_ids]
+            show_report_window(f"Lines over pixel budget ({len(rows)} rows in {len(result)} files)", ("PROBLEM",), rows)
+
+    run_background_task("Checking line widths", work, done)
+
+def check_project_tag_integrity():
+    """Checks in the background that every translated row kept the tags of its original row."""
+    if not BASE_DIR or not SECOND_BASE_DIR:
+        messagebox.showinfo("Info", "Please select both the base directory and the second directory.")
+        return
+    json_paths = list(iter_project_files(BASE_DIR, GAME_VERSION))
+
+    def work(progress, cancel):
+        return check_project_tags(json_paths, BASE_DIR, SECOND_BASE_DIR, GAME_VERSION, progress=progress, cancel=cancel)
+
+    def done(result, error):
+        if error:
+            messagebox.showerror("Error", f"Tag check failed: {error}")
+        elif not result:
+            messagebox.showinfo("Success", "All translated rows keep the tags of their original rows.")
+        else:
+            rows = [(path, row_id, kind, detail) for path, issues in result.items() for row_id, kind, detail in issues]
+            show_report_window(f"Tag problems ({len(rows)} in {len(result)} files)", ("PROBLEM", "TAG"), rows)
+
+    run_background_task("Checking tags", work, done)
+
+def mark_rows_reviewed(row_ids):
+    """Removes rows of the current file from the review list."""
+    key = review_key(CURRENT_JSON_PATH, BASE_DIR)
+    row_ids = {str(row_id) for row_id in row_ids}
+    REVIEW_LIST[key] = [row_id for row_id in REVIEW_LIST.get(key, []) if str(row_id) not in row_ids]
+    if not REVIEW_LIST[key]:
+        del REVIEW_LIST[key]
+    CURRENT_REVIEW_IDS.difference_update(row_ids)
+    try:
+        save_review_list(BASE_DIR, REVIEW_LIST)
+    except OSError as e:
+        print(f"Error saving review list: {e}")
+
+    for item in ROW_ITEMS:
+        if str(TREE.item(item, 'values')[0]) in row_ids:
+            TREE.item(item, tags=tuple(tag for tag in TREE.item(item, 'tags') if tag != "review"))
+            update_row_view_keys(item)
+
+def mark_selected_reviewed():
+    """Marks the selected table rows as reviewed."""
+    if CURRENT_JSON_PATH and BASE_DIR and not FOLDER_VIEW:
+        mark_rows_reviewed(TREE.item(item, 'values')[0] for item in TREE.selection())
+
+def show_review_list():
+    """Lists the rows flagged for review by the last original update."""
+    if not REVIEW_LIST:
+        messagebox.showinfo("Info", "There are no rows to review.")
+        return
+    rows = [(os.path.join(BASE_DIR, *key.split('/')), row_id, "changed or new original")
+            for key, row_ids in REVIEW_LIST.items() for row_id in row_ids]
+    show_report_window(f"Rows to review ({len(rows)})", ("REASON",), rows)
+
+def update_originals():
+    """Carries the translations forward to a newer extraction of the original files."""
+    if not BASE_DIR or not SECOND_BASE_DIR:
+        messagebox.showinfo("Info", "Please select both the base directory and the second directory.")
+        return
+    if not confirm_unsaved_changes():
+        return
+    new_original_dir = filedialog.askdirectory(title="Select the directory with the new original files")
+    if not new_original_dir:
         return
 
+    def summary(result):
+        totals, errors = result[0], result[3]
+        text = (f"Unchanged rows kept: {totals['kept']}\n"
+                f"Untranslated rows updated: {totals['updated']}\n"
+                f"Rows with a new ID carried over: {totals['moved']}\n"
+                f"Changed originals (to review): {totals['changed']}\n"
+                f"New rows (to review): {totals['new']}\n"
+                f"Removed rows: {totals['removed']}")
+        if errors:
+            text += f"\n\nFiles that could not be read and were skipped: {totals['failed']}"
+            text += "".join(f"\n{os.path.basename(path)}: {error}" for path, error in list(errors.items())[:5])
+        return text
+
+    def applied(result, error):
+        global SECOND_BASE_DIR, REVIEW_LIST
+        if error:
+            messagebox.showerror("Error", f"Updating the translations failed: {error}")
+            return
+        REVIEW_LIST = load_review_list(BASE_DIR)
+        if result[2]:
+            messagebox.showwarning("Cancelled", "The update was cancelled. Files already being updated were finished:\n\n"
+                                   f"{summary(result)}\n\nRun Update Originals again to update the rest.")
+            populate_file_list()
+            return
+        if messagebox.askyesno("Success", f"{summary(result)}\n\nUse the new originals as the second directory?"):
+            SECOND_BASE_DIR = new_original_dir
+            second_base_dir_label.config(text=f"Second Directory: {SECOND_BASE_DIR}")
+            save_gui_state()
+        populate_file_list()
+        if CURRENT_JSON_PATH and os.path.exists(CURRENT_JSON_PATH):
+            load_table_data(CURRENT_JSON_PATH)
+
+    def planned(result, error):
+        if error:
+            messagebox.showerror("Error", f"Comparing the originals failed: {error}")
+            return
+        if result[2]:
+            return  # Cancelled while comparing, nothing was written
+        if messagebox.askyesno("Update Originals", f"{summary(result)}\n\nUpdate the translated files?"):
+            run_background_task("Updating translations",
+                                lambda progress, cancel: carry_forward(BASE_DIR, SECOND_BASE_DIR, new_original_dir,
+                                                                       GAME_VERSION, apply=True, progress=progress,
+                                                                       cancel=cancel),
+                                applied)
+
+    run_background_task("Comparing originals",
+                        lambda progress, cancel: carry_forward(BASE_DIR, SECOND_BASE_DIR, new_original_dir, GAME_VERSION,
+                                                               progress=progress, cancel=cancel),
+                        planned)
+
+def set_build_dir():
+    """Asks for the output directory of the mod build. Returns False if cancelled."""
+    global BUILD_DIR
+    build_dir = filedialog.askdirectory(title="Select the build output directory")
+    if not build_dir:
+        return False
+    if BASE_DIR and os.path.commonpath([os.path.abspath(build_dir), os.path.abspath(BASE_DIR)]) == os.path.abspath(BASE_DIR):
+        messagebox.showerror("Error", "The build directory must be outside the base directory.")
+        return False
+    BUILD_DIR = os.path.normpath(build_dir)
+    save_gui_state()
+    return True
+
+def build_mod_output():
+    """Copies the translated files changed since the last build into the build directory."""
+    if not BASE_DIR:
+        messagebox.showinfo("Info", "Please select a base directory first.")
+        return
+    if not confirm_unsaved_changes():
+        return
+    if not BUILD_DIR and not set_build_dir():
+        return
+
+    def work(progress, cancel):
+        return build_changed_files(BASE_DIR, BUILD_DIR, GAME_VERSION, progress=progress, cancel=cancel)
+
+    def done(result, error):
+        if error:
+            messagebox.showerror("Error", f"Build failed: {error}")
+            return
+        copied, removed = result
+        message = f"{len(copied)} changed file(s) copied to {BUILD_DIR}.\nThe list was written to changed_files.txt."
+        if removed:
+            message += f"\n\n{len(removed)} file(s) of the last build no longer exist in the base directory."
+        messagebox.showinfo("Build Complete", message)
+
+    run_background_task("Building changed files", work, done)
+
+def take_snapshot():
+    """Stores the current translated files in the project's snapshot store."""
+    if not BASE_DIR:
+        messagebox.showinfo("Info", "Please select a base directory first.")
+        return
+    if not confirm_unsaved_changes():
+        return
+    label = simpledialog.askstring("Take Snapshot", "Description (optional):", parent=root)
+    if label is None:
+        return
+    from bdat_core.snapshots import SnapshotStore  # Only needed for snapshots
+
+    def work(progress, cancel):
+        return SnapshotStore(BASE_DIR).take_snapshot(GAME_VERSION, label, progress, cancel)
+
+    def done(result, error):
+        if error:
+            messagebox.showerror("Error", f"Could not take snapshot: {error}")
+            return
+        snapshot, created = result
+        if snapshot is None:
+            return
+        if created:
+            messagebox.showinfo("Snapshot", f"Snapshot {snapshot['id']} of {len(snapshot['files'])} files taken.")
+        else:
+            messagebox.showinfo("Snapshot", f"Nothing changed since snapshot {snapshot['id']}.")
+
+    run_background_task("Taking snapshot", work, done)
+
+def show_snapshots():
+    """Lists the snapshots of the project to compare with or restore from."""
+    if not BASE_DIR:
+        messagebox.showinfo("Info", "Please select a base directory first.")
+        return
+    from bdat_core.snapshots import SnapshotStore  # Only needed for snapshots
+    try:
+        store = SnapshotStore(BASE_DIR)
+        snapshots = store.list_snapshots()
+    except Exception as e:
+        messagebox.showerror("Error", f"Could not read snapshots: {e}")
+        return
+
+    window = tk.Toplevel(root)
+    window.title("Snapshots")
+    window.geometry("600x320")
+    snapshot_list = ttk.Treeview(window, columns=("CREATED", "FILES", "DESCRIPTION"), show="headings", selectmode="browse")
+    snapshot_list.heading("CREATED", text="CREATED")
+    snapshot_list.heading("FILES", text="FILES")
+    snapshot_list.heading("DESCRIPTION", text="DESCRIPTION")
+    snapshot_list.column("CREATED", width=160, stretch=False)
+    snapshot_list.column("FILES", width=60, stretch=False)
+    by_item = {}
+    for snapshot in snapshots:
+        created = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(snapshot["created"]))
+        item = snapshot_list.insert("", "end", values=(created, len(snapshot["files"]), snapshot.get("label", "")))
+        by_item[item] = snapshot
+
+    def selected_snapshot():
+        selection = snapshot_list.selection()
+        if not selection:
+            messagebox.showinfo("Info", "Please select a snapshot.", parent=window)
+            return None
+        return by_item[selection[0]]
+
+    def compare():
+        snapshot = selected_snapshot()
+        if snapshot:
+            compare_with_snapshot(store, snapshot)
+
+    def restore():
+        snapshot = selected_snapshot()
+        if snapshot:
+            restore_from_snapshot(store, snapshot)
+
+    def delete():
+        snapshot = selected_snapshot()
+        if snapshot and messagebox.askyesno("Delete Snapshot", "Delete the selected snapshot?", parent=window):
+            store.delete_snapshot(snapshot["id"])
+            snapshot_list.delete(snapshot_list.selection()[0])
+
+    button_frame = ttk.Frame(window, padding=10)
+    button_frame.pack(side=tk.BOTTOM, fill=tk.X)
+    ttk.Button(button_frame, text="Compare With Current", command=compare).pack(side=tk.LEFT, padx=5)
+    ttk.Button(button_frame, text="Restore Selected File/Folder", command=restore, bootstyle="warning").pack(side=tk.LEFT, padx=5)
+    ttk.Button(button_frame, text="Delete", command=delete, bootstyle="secondary").pack(side=tk.RIGHT, padx=5)
+    snapshot_list.pack(fill=tk.BOTH, expand=True)
+
+def compare_with_snapshot(store, snapshot):
+    """Lists the rows that changed since a snapshot."""
+    def work(progress, cancel):
+        diff = store.diff(snapshot, GAME_VERSION)
+        rows = []
+        for done, rel_path in enumerate(diff["changed"], 1):
+            if cancel.is_set():
+                break
+            json_path = store.abs_path(rel_path)
+            rows.extend((json_path, row_id, escape_text(old), escape_text(new))
+                        for row_id, old, new in store.diff_rows(snapshot, rel_path))
+            progress(done, len(diff["changed"]))
+        rows.extend((store.abs_path(rel_path), "", "(no file)", "(new file)") for rel_path in diff["added"])
+        rows.extend((store.abs_path(rel_path), "", "(file)", "(deleted)") for rel_path in diff["removed"])
+        return rows
+
+    def done(rows, error):
+        if error:
+            messagebox.showerror("Error", f"Could not compare: {error}")
+        elif not rows:
+            messagebox.showinfo("Snapshot", "No changes since this snapshot.")
+        else:
+            show_report_window(f"Changes since {snapshot['id']}", ("SNAPSHOT TEXT", "CURRENT TEXT"), rows)
+
+    run_background_task("Comparing with snapshot", work, done)
+
+def restore_from_snapshot(store, snapshot):
+    """Restores the file or folder selected in the file list (or the open file) from a snapshot."""
+    from bdat_core.snapshots import snapshot_paths_under
+    selection = file_list.selection()
+    if selection:
+        target = file_list.item(selection[0], 'values')[1]
+    elif FOLDER_VIEW:
+        target = FOLDER_VIEW.folder_path
+    else:
+        target = CURRENT_JSON_PATH
+    rel_paths = snapshot_paths_under(snapshot, BASE_DIR, target) if target else []
+    if not rel_paths:
+        messagebox.showinfo("Info", "Select a file or folder in the file list that is part of the snapshot.")
+        return
+    if not messagebox.askyesno("Restore", f"Restore {len(rel_paths)} file(s) of {os.path.basename(target)} "
+                                          f"from snapshot {snapshot['id']}?\nThe current state is saved as a snapshot first."):
+        return
+    if not confirm_unsaved_changes():
+        return
+
+    def work(progress, cancel):
+        store.take_snapshot(GAME_VERSION, f"Before restoring {os.path.basename(target)}")
+        return store.restore(snapshot, rel_paths)
+
+    def done(restored, error):
+        if error:
+            messagebox.showerror("Error", f"Could not restore: {error}")
+            return
+        for rel_path in restored:
+            path = store.abs_path(rel_path)
+            if NAV_INDEX:
+                NAV_INDEX.set_file(path, *scan_file(
+                    path, resolve_original_path(path, BASE_DIR, SECOND_BASE_DIR, GAME_VERSION)))
+                update_file_status(path)
+        open_paths = set(FOLDER_VIEW.files) if FOLDER_VIEW else {CURRENT_JSON_PATH}
+        if any(os.path.normpath(store.abs_path(rel_path)) in {os.path.normpath(p) for p in open_paths if p}
+               for rel_path in restored):
+            reload_table()
+        messagebox.showinfo("Restore", f"{len(restored)} file(s) restored, {len(rel_paths) - len(restored)} already up to date.")
+
+    run_background_task("Restoring from snapshot", work, done)
+
+def rebuild_nav_index():
+    """Builds the navigation index of the project on a worker thread."""
+    global NAV_INDEX, nav_index_generation
+    NAV_INDEX = None
+    nav_index_generation += 1
+    if not BASE_DIR or STARTUP_PROBE:
+        return
+    generation = nav_index_generation
+    result = {}
+    base_dir, second_base_dir, game_version = BASE_DIR, SECOND_BASE_DIR, GAME_VERSION
+
+    def worker():
+        try:
+            result['index'] = build_nav_index(base_dir, second_base_dir, game_version)
+        except Exception as e:
+            print(f"Error building navigation index: {e}")
+            result['index'] = None
+
+    def poll():
+        global NAV_INDEX
+        if generation != nav_index_generation:
+            return  # A newer build replaced this one
+        if 'index' not in result:
+            root.after(200, poll)
+        else:
+            NAV_INDEX = result['index']
+            rebuild_status_rollup()
+
+    threading.Thread(target=worker, daemon=True).start()
+    root.after(200, poll)
+
+def update_nav_index(json_path, data, original):
+    """Re-indexes one saved file from its data in memory and the OriginalProjection of its original."""
+    if NAV_INDEX:
+        original_texts = original.texts_by_id() if original else {}
+        NAV_INDEX.set_file(json_path, len(data.get('rows', [])),
+                           scan_rows(os.path.basename(json_path), data, original_texts))
+        update_file_status(json_path)
+
+def current_row_position():
+    """Returns (path, row index) of the focused table row, or (None, -1)."""
+    item = TREE.focus()
+    if FOLDER_VIEW:
+        if item in FOLDER_VIEW.item_rows:
+            return FOLDER_VIEW.item_rows[item]
+        return (FOLDER_VIEW.files[0], -1) if FOLDER_VIEW.files else (None, -1)
+    if CURRENT_JSON_PATH:
+        return CURRENT_JSON_PATH, ROW_POSITIONS.get(item, -1)
+    return None, -1
+
+def jump_to_row(kind, backwards=False):
+    """Selects the next row of a kind ('untranslated' or 'over_limit'), opening its file if needed."""
+    if NAV_INDEX is None:
+        messagebox.showinfo("Info", "The project index is still being built." if BASE_DIR else "No project loaded.")
+        return "break"
+
+    path, row_index = current_row_position()
+    target = NAV_INDEX.find(kind, path, row_index, backwards)
+    if target is None:
+        messagebox.showinfo("Info", "No untranslated rows found." if kind == "untranslated" else "No rows over the line limit.")
+        return "break"
+
+    target_path, target_index, target_id = target
+    item = None
+    if FOLDER_VIEW and target_path in FOLDER_VIEW.files:
+        item = FOLDER_VIEW.ensure_row(target_path, target_index)
+    elif CURRENT_JSON_PATH and os.path.normpath(target_path) == os.path.normpath(CURRENT_JSON_PATH):
+        item = ROW_ITEMS[target_index] if target_index < len(ROW_ITEMS) else None
+    else:
+        open_file_at_row(target_path, target_id)
+        return "break"
+
+    if item is not None:
+        select_table_item(item)
+    return "break"
+
+def rebuild_row_index():
+    """Indexes the $id and label of the rows of CURRENT_JSON_DATA for the jump box."""
+    global ROW_INDEX
+    JUMP_STATE.update(query=None, matches=[], position=-1)
+    with span("row_index.build"):
+        ROW_INDEX = RowIndex(CURRENT_JSON_DATA.get('rows', [])) if CURRENT_JSON_DATA else None
+
+def jump_to_id(event=None, backwards=False):
+    """Selects the next row whose $id or label matches the jump box, exact matches first."""
+    query = jump_var.get().strip()
+    if not query:
+        return "break"
+    if query != JUMP_STATE["query"]:
+        with span("row_index.find"):
+            if FOLDER_VIEW:
+                matches = FOLDER_VIEW.find_rows(query)
+            elif ROW_INDEX:
+                matches = [(CURRENT_JSON_PATH, row_index) for row_index in ROW_INDEX.find(query)]
+            else:
+                matches = []
+        JUMP_STATE.update(query=query, matches=matches, position=-1)
+
+    matches = JUMP_STATE["matches"]
+    if not matches:
+        jump_status_label.config(text="No match")
+        return "break"
+    position = (JUMP_STATE["position"] + (-1 if backwards else 1)) % len(matches)
+    JUMP_STATE["position"] = position
+    path, row_index = matches[position]
+
+    if FOLDER_VIEW:
+        item = FOLDER_VIEW.ensure_row(path, row_index)  # Inserts the pages up to the row
+    else:
+        item = ROW_ITEMS[row_index] if row_index < len(ROW_ITEMS) else None
+    if item is not None:
+        select_table_item(item)
+    jump_status_label.config(text=f"{position + 1} of {len(matches)}")
+    return "break"
+
+def focus_jump_box(event=None):
+    jump_entry.focus_set()
+    jump_entry.select_range(0, tk.END)
+    return "break"
+
+def manage_reference_dirs():
+    """Edits the list of reference directories shown as extra columns."""
+    global REFERENCE_DIRS
+    dialog = tk.Toplevel(root)
+    dialog.title("Reference Directories")
+    dialog.transient(root)
+    dialog.grab_set()
+
+    ttk.Label(dialog, text="Each directory is shown as a column next to the original text.",
+              padding=10).pack(side=tk.TOP, fill=tk.X)
+    listbox = tk.Listbox(dialog, width=80, height=8)
+    listbox.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=10)
+    for path in REFERENCE_DIRS:
+        listbox.insert(tk.END, path)
+
+    def add():
+        path = filedialog.askdirectory(parent=dialog)
+        if path and os.path.normpath(path) not in listbox.get(0, tk.END):
+            listbox.insert(tk.END, os.path.normpath(path))
+
+    def remove():
+        for index in reversed(listbox.curselection()):
+            listbox.delete(index)
+
+    def move(offset):
+        selection = listbox.curselection()
+        if selection and 0 <= selection[0] + offset < listbox.size():
+            index = selection[0]
+            path = listbox.get(index)
+            listbox.delete(index)
+            listbox.insert(index + offset, path)
+            listbox.selection_set(index + offset)
+
+    result = {}
+
+    def ok():
+        result['dirs'] = list(listbox.get(0, tk.END))
+        dialog.destroy()
+
+    button_frame = ttk.Frame(dialog, padding=10)
+    button_frame.pack(side=tk.BOTTOM, fill=tk.X)
+    ttk.Button(button_frame, text="Add...", command=add).pack(side=tk.LEFT, padx=5)
+    ttk.Button(button_frame, text="Remove", command=remove, bootstyle="secondary").pack(side=tk.LEFT, padx=5)
+    ttk.Button(button_frame, text="Up", command=lambda: move(-1), bootstyle="secondary").pack(side=tk.LEFT, padx=5)
+    ttk.Button(button_frame, text="Down", command=lambda: move(1), bootstyle="secondary").pack(side=tk.LEFT, padx=5)
+    ttk.Button(button_frame, text="Cancel", command=dialog.destroy, bootstyle="secondary").pack(side=tk.RIGHT, padx=5)
+    ttk.Button(button_frame, text="OK", command=ok, bootstyle="primary").pack(side=tk.RIGHT, padx=5)
+    dialog.wait_window()
+
+    if 'dirs' not in result or result['dirs'] == REFERENCE_DIRS:
+        return
+    # The table is reloaded for the new columns, which discards edits
+    if not confirm_unsaved_changes():
+        return
+    REFERENCE_DIRS = result['dirs']
+    save_gui_state()
+    configure_table_columns()
+    reload_table()
+
+def reload_table():
+    """Reloads the open file or folder from disk."""
+    global UNSAVED_CHANGES
+    if FOLDER_VIEW:
+        open_folder_view(FOLDER_VIEW.folder_path)
+    elif CURRENT_JSON_PATH:
+        load_table_data(CURRENT_JSON_PATH)
+    UNSAVED_CHANGES = False
+
+def server_rel_path(json_path):
+    """Returns the name of a table on the project server: its path relative to BASE_DIR."""
+    return os.path.relpath(json_path, BASE_DIR).replace('\\', '/')
+
+def server_json_path(rel_path):
+    return os.path.normpath(os.path.join(BASE_DIR, *rel_path.split('/')))
+
+def parse_server_address(address):
+    """Splits "host:port". Raises ValueError for an invalid port."""
+    host, _, port = address.strip().rpartition(':')
+    return host or "127.0.0.1", int(port)
+
+def translator_name():
+    """Name shown to the other clients of the project server, e.g. when a row is locked."""
+    try:
+        return getpass.getuser()
+    except Exception:
+        return "translator"
+
+def host_project_server():
+    """Starts a project server for BASE_DIR in this instance and connects to it."""
+    global PROJECT_SERVER, SERVER_ADDRESS
+    from bdat_core.server import ServerThread, is_loopback  # Pulls in asyncio, only needed when hosting
+    if not BASE_DIR:
+        messagebox.showinfo("Info", "Please select the base directory first.")
+        return
+    if PROJECT_SERVER:
+        messagebox.showinfo("Project Server", f"This instance already hosts the project server on port {PROJECT_SERVER.port}.")
+        return
+    address = simpledialog.askstring(
+        "Host Project Server", "Address to listen on (host:port).\nUse 0.0.0.0 as host to accept other computers:",
+        initialvalue=SERVER_ADDRESS, parent=root)
+    if not address:
+        return
+    try:
+        host, port = parse_server_address(address)
+    except ValueError:
+        messagebox.showerror("Project Server", f"Invalid address: {address}")
+        return
+    password = simpledialog.askstring("Host Project Server", "Password the other translators must enter\n"
+                                      "(leave empty for none):", show="*", parent=root)
+    if password is None:
+        return
+    if not password and not is_loopback(host) and not messagebox.askyesno(
+            "Project Server", "Without a password, anyone who can reach this computer can read and change "
+            "the project. Host the project server without a password?", icon="warning"):
+        return
+    if not confirm_unsaved_changes():
+        return
+
+    server = ServerThread(BASE_DIR, GAME_VERSION, host, port, password)
+    try:
+        port = server.start_and_wait()
+    except Exception as e:
+        messagebox.showerror("Project Server", f"Could not start the project server:\n{e}")
+        return
+    PROJECT_SERVER = server
+    SERVER_ADDRESS = address.strip()
+    save_gui_state()
+    connect_to_server("127.0.0.1" if host in ("0.0.0.0", "::") else host, port, password)
+
+def connect_project_server():
+    """Asks for the address of a project server and connects to it."""
+    global SERVER_ADDRESS
+    if not BASE_DIR:
+        messagebox.showinfo("Info", "Please select the base directory first.")
+        return
+    address = simpledialog.askstring("Connect to Project Server", "Address of the project server (host:port):",
+                                     initialvalue=SERVER_ADDRESS, parent=root)
+    if not address:
+        return
+    try:
+        host, port = parse_server_address(address)
+    except ValueError:
+        messagebox.showerror("Project Server", f"Invalid address: {address}")
+        return
+    password = simpledialog.askstring("Connect to Project Server", "Password of the project server\n"
+                                      "(leave empty for none):", show="*", parent=root)
+    if password is None:
+        return
+    if not confirm_unsaved_changes():
+        return
+    if connect_to_server(host, port, password):
+        SERVER_ADDRESS = address.strip()
+        save_gui_state()
+
+def connect_to_server(host, port, password=None):
+    """Connects to a project server and reloads the table from it. Returns True on success.
+
+    The project folder must be the one the server serves (e.g. the same shared
+    folder): the file list and the originals are still read locally.
+    """
+    global SERVER_CLIENT
+    disconnect_project_server(reload=False, stop_server=False)
+    try:
+        client = ProjectClient(host, port, translator_name(), password=password)
+    except (OSError, ServerError) as e:
+        messagebox.showerror("Project Server", f"Could not connect to {host}:{port}:\n{e}")
+        return False
+    if client.game_version != GAME_VERSION:
+        client.close()
+        messagebox.showerror("Project Server", "The server serves a project of another game. "
+                             "Select the project folder the server was started for.")
+        return False
+
+    SERVER_CLIENT = client
+    root.title(f"BDAT Translation Tool [{GAME_SHORT_NAMES[GAME_VERSION]}] - {client.address}")
+    reload_table()
+    root.after(SERVER_POLL_INTERVAL, lambda: poll_server_events(client))
+    return True
+
+def disconnect_project_server(reload=True, stop_server=True):
+    """Leaves the project server, and stops it when this instance hosts it. Pending edits are written first."""
+    global SERVER_CLIENT, PROJECT_SERVER
+    if SERVER_CLIENT:
+        try:
+            SERVER_CLIENT.request("flush")
+        except (ServerError, ConnectionError):
+            pass
+        SERVER_CLIENT.close()
+        SERVER_CLIENT = None
+        if GAME_VERSION:
+            set_game_title(GAME_VERSION)
+        if reload:
+            reload_table()  # Back to the files, which now have every edit
+    if stop_server and PROJECT_SERVER:
+        PROJECT_SERVER.stop()
+        PROJECT_SERVER = None
+
+def poll_server_events(client):
+    """Applies the rows, locks and statuses changed by the other clients of the project server."""
+    global SERVER_CLIENT, REVIEW_LIST
+    if client is not SERVER_CLIENT:
+        return  # Disconnected, or connected again with a new client
+    for event in client.poll_events():
+        kind = event.get("event")
+        if kind == "rows":
+            set_table_texts(server_json_path(event["path"]), event["texts"])
+        elif kind == "lock":
+            set_row_locked(server_json_path(event["path"]), event["row"], event["by"] is not None)
+        elif kind == "status":
+            for rel_path, status in event["files"].items():
+                apply_file_status(server_json_path(rel_path), status)
+            folder_paths = dict(ORIGINAL_FILE_LIST)
+            for name, status in event["folders"].items():
+                if name in folder_paths:
+                    apply_folder_status(name, folder_paths[name], status)
+                elif status:
+                    FOLDER_STATUS[name] = status
+                else:
+                    FOLDER_STATUS.pop(name, None)
+        elif kind == "conflicts":
+            # The server kept the translators' texts and flagged the rows for review
+            REVIEW_LIST = load_review_list(BASE_DIR)
+            json_path = server_json_path(event["path"])
+            if CURRENT_JSON_PATH and os.path.normcase(os.path.normpath(json_path)) == \
+                    os.path.normcase(os.path.normpath(CURRENT_JSON_PATH)):
+                CURRENT_REVIEW_IDS.update(event["rows"])
+            messagebox.showwarning("Project Server",
+                                   f"{len(event['rows'])} row(s) of {os.path.basename(json_path)} were also changed "
+                                   "by another program. The translators' texts were kept and the rows were added "
+                                   "to the rows to review.")
+        elif kind == "disconnected":
+            SERVER_CLIENT = None
+            if GAME_VERSION:
+                set_game_title(GAME_VERSION)
+            messagebox.showwarning("Project Server", "The connection to the project server was lost. "
+                                   "The table is reloaded from the files.")
+            reload_table()
+            return
+    root.after(SERVER_POLL_INTERVAL, lambda: poll_server_events(client))
+
+def find_table_rows(json_path, row_ids):
+    """Finds rows of a table that is open in the table view.
+
+    Returns (path, data, {row id: (row index, Treeview item or None)}), or None when the table is not open.
+    """
+    key = os.path.normcase(os.path.normpath(json_path))
+    if FOLDER_VIEW:
+        path = next((path for path in FOLDER_VIEW.docs if os.path.normcase(os.path.normpath(path)) == key), None)
+        data = FOLDER_VIEW.docs.get(path) if path else None
+        if not data:
+            return None
+        if path not in FOLDER_VIEW.row_indexes:
+            FOLDER_VIEW.row_indexes[path] = RowIndex(data.get('rows', []))
+        row_index, item_of = FOLDER_VIEW.row_indexes[path], lambda index: FOLDER_VIEW.row_items.get((path, index))
+    elif CURRENT_JSON_PATH and CURRENT_JSON_DATA and ROW_INDEX and \
+            os.path.normcase(os.path.normpath(CURRENT_JSON_PATH)) == key:
+        path, data, row_index = CURRENT_JSON_PATH, CURRENT_JSON_DATA, ROW_INDEX
+        item_of = lambda index: ROW_ITEMS[index] if index < len(ROW_ITEMS) else None
+    else:
+        return None
+
+    rows = data.get('rows', [])
+    found = {}
+    for row_id in row_ids:
+        # The index also holds labels, so check the $id of its matches
+        for index in row_index.exact.get(str(row_id).lower(), ()):
+            if str(rows[index].get('$id', '')) == str(row_id):
+                found[str(row_id)] = (index, item_of(index))
+                break
+    return path, data, found
+
+def set_table_texts(json_path, texts_by_id):
+    """Stores texts of a table in the open table data and updates their rows on screen."""
+    found = find_table_rows(json_path, texts_by_id)
+    if not found or not found[2]:
+        return
+    path, data, rows = found
+    field = text_field(data)
+    glyph_table = active_glyph_table()
+    filename = os.path.basename(path)
+    for row_id, (row_index, item) in rows.items():
+        text = texts_by_id[row_id]
+        set_row_text(data['rows'][row_index], text, field)
+        if item:
+            formatted_value = escape_text(text)
+            values = list(TREE.item(item, 'values'))
+            values[3] = formatted_value
+            if FOLDER_VIEW:
+                TREE.item(item, values=values, tags=FOLDER_VIEW.row_tags(item, formatted_value, glyph_table))
+            else:
+                TREE.item(item, values=values, tags=row_tags(filename, formatted_value, row_id, glyph_table))
+                update_row_view_keys(item)
+    update_nav_index(path, data, FOLDER_VIEW.originals.get(path) if FOLDER_VIEW else CURRENT_ORIGINAL_JSON_DATA)
+
+def set_row_locked(json_path, row_id, locked):
+    """Greys out a row while another client of the project server edits it."""
+    found = find_table_rows(json_path, [row_id])
+    item = found[2].get(str(row_id), (None, None))[1] if found else None
+    if item:
+        tags = set(TREE.item(item, 'tags'))
+        if locked:
+            tags.add("locked")
+        else:
+            tags.discard("locked")
+        TREE.item(item, tags=tuple(tags))
+
+def lock_server_row(item):
+    """Locks the row of a table item on the project server. Returns False, after telling why, when it is taken."""
+    json_path, row_id = item_file_path(item), str(TREE.item(item, 'values')[0])
+    try:
+        result = SERVER_CLIENT.request("lock", path=server_rel_path(json_path), row=row_id)
+    except ServerError as e:
+        messagebox.showinfo("Row Locked", str(e))
+        return False
+    except ConnectionError as e:
+        messagebox.showerror("Project Server", str(e))
+        return False
+    set_table_texts(json_path, {row_id: result["text"]})  # Edit the newest text
+    return True
+
+def unlock_server_row(json_path, row_id):
+    try:
+        SERVER_CLIENT.send("unlock", path=server_rel_path(json_path), row=str(row_id))
+    except ConnectionError:
+        pass  # The server releases the locks of lost connections
+
+def send_server_edit(json_path, texts_by_id, wait=False):
+    """Sends edited texts of a table to the project server, which also releases their row locks.
+
+    With wait, returns the server's answer ({"applied": [row ids], "skipped": {row id: editor}})
+    and raises its errors; rows that other clients are editing are left unchanged.
+    """
+    texts_by_id = {str(row_id): text for row_id, text in texts_by_id.items()}
+    if wait:
+        result = SERVER_CLIENT.request("edit", path=server_rel_path(json_path), texts=texts_by_id)
+        set_table_texts(json_path, {row_id: texts_by_id[row_id] for row_id in result["applied"]})
+        return result
+    set_table_texts(json_path, texts_by_id)
+    try:
+        SERVER_CLIENT.send("edit", path=server_rel_path(json_path), texts=texts_by_id)
+    except ConnectionError as e:
+        messagebox.showerror("Project Server", str(e))
+
+def set_mt_endpoint():
+    """Asks for the URL of the machine-translation server."""
+    global MT_ENDPOINT
+    endpoint = simpledialog.askstring("Machine Translation", "URL of the local machine-translation server:",
+                                      initialvalue=MT_ENDPOINT, parent=root)
+    if endpoint:
+        MT_ENDPOINT = endpoint.strip()
+        save_gui_state()
+
+def machine_translate(scope):
+    """Fills the untranslated rows of the open file, the selected folder or the project with drafts."""
+    if not BASE_DIR or not SECOND_BASE_DIR:
+        messagebox.showinfo("Info", "Please select both the base directory and the second directory.")
+        return
+
+    if scope == "file":
+        json_paths = FOLDER_VIEW.files if FOLDER_VIEW else [CURRENT_JSON_PATH] if CURRENT_JSON_PATH else []
+    elif scope == "folder":
+        selection = file_list.selection()
+        json_paths = []
+        if selection and file_list.item(selection[0], 'values')[0] == "folder":
+            json_paths = [path for _, path in folder_files(file_list.item(selection[0], 'values')[1])]
+    else:
+        json_paths = list(iter_project_files(BASE_DIR, GAME_VERSION))
+    if not json_paths:
+        messagebox.showinfo("Info", "Please open a file or select a folder first.")
+        return
+
+    if not confirm_unsaved_changes():
+        return
+    if not messagebox.askyesno("Machine Translation",
+                               f"Fill the untranslated rows of {len(json_paths)} file(s) with drafts from {MT_ENDPOINT}?\n"
+                               "The filled rows are added to the rows to review."):
+        return
+
+    client = SERVER_CLIENT
+    from bdat_core.mt import prefill_files  # Only needed for machine translation
+
+    def write_server_rows(json_path, texts):
+        # Rows other clients are editing are skipped by the server
+        return client.request("edit", path=server_rel_path(json_path), texts=texts)["applied"]
+
+    def work(progress, cancel):
+        if client is None:
+            return prefill_files(json_paths, BASE_DIR, SECOND_BASE_DIR, GAME_VERSION, MT_ENDPOINT,
+                                 progress=progress, cancel=cancel)
+        client.request("flush")  # The untranslated rows are read from the files
+        result = prefill_files(json_paths, BASE_DIR, SECOND_BASE_DIR, GAME_VERSION, MT_ENDPOINT,
+                               progress=progress, cancel=cancel, write_rows=write_server_rows)
+        client.request("flush")  # Write the drafts now so they can be indexed
+        return result
+
+    def done(result, error):
+        global REVIEW_LIST, UNSAVED_CHANGES
+        if error:
+            messagebox.showerror("Error", f"Machine translation failed: {error}")
+            return
+        REVIEW_LIST = load_review_list(BASE_DIR)
+        # Show the written drafts
+        if FOLDER_VIEW:
+            open_folder_view(FOLDER_VIEW.folder_path)
+        elif CURRENT_JSON_PATH:
+            load_table_data(CURRENT_JSON_PATH)
+        UNSAVED_CHANGES = False
+        rebuild_nav_index()
+
+        message = f"Filled {result['rows']} row(s) in {result['files']} file(s)."
+        if result['cached']:
+            message += f"\n{result['cached']} text(s) were taken from the cache."
+        if result['tag_errors']:
+            message += f"\n{result['tag_errors']} draft(s) were skipped because their tags differ from the original."
+        if result['failed']:
+            message += f"\n{result['failed']} text(s) could not be translated: {result['error']}"
+            messagebox.showwarning("Machine Translation", message)
+        else:
+            messagebox.showinfo("Machine Translation", message)
+
+    run_background_task("Machine translation", work, done)
+
+def show_memory_report():
+    """Shows how much memory the cached original files use."""
+    report = ORIGINAL_CACHE.memory_report()
+    lines = [f"Cached original files: {len(report)}",
+             f"Total: {ORIGINAL_CACHE.total_bytes / 1024 / 1024:.1f} MB of {ORIGINAL_CACHE.budget_bytes / 1024 / 1024:.0f} MB", ""]
+    for path, rows, nbytes in report[:20]:
+        lines.append(f"{os.path.basename(path)}: {rows} rows, {nbytes / 1024:.0f} KB")
+    if len(report) > 20:
+        lines.append(f"... and {len(report) - 20} more")
+    messagebox.showinfo("Memory Report", "\n".join(lines))
+
+def find_files_by_name():
+    """Maps each JSON file name (without extension) of the project to its paths."""
+    files_by_name = {}
+    for _, folder_path in ORIGINAL_FILE_LIST:
+        for child_text, child_path in folder_files(folder_path):
+            name = os.path.splitext(child_text)[0]
+            files_by_name.setdefault(name, []).append(child_path)
+    return files_by_name
+
+def apply_texts_to_table(texts_by_id):
+    """Updates only the on-screen rows of the open file whose $id is in texts_by_id."""
+    filename = os.path.basename(CURRENT_JSON_PATH)
+    glyph_table = active_glyph_table()
+    updated_count = 0
+    for row, item in zip(CURRENT_JSON_DATA.get('rows', []), ROW_ITEMS):
+        row_id = str(row.get('$id', ''))
+        if row_id not in texts_by_id:
+            continue
+        formatted_value = escape_text(texts_by_id[row_id])
+        values = list(TREE.item(item, 'values'))
+        values[3] = formatted_value
+        TREE.item(item, values=values, tags=row_tags(filename, formatted_value, values[0], glyph_table))
+        update_row_view_keys(item)
+        updated_count += 1
+    return updated_count
+
+@timed("paste")
+def paste_file_content():
+    """Pastes translated lines from clipboard into the opened file and any other files named in it.
+
+    The text may contain several file blocks as produced by copy_file_content, each starting with
+    the file name. Rows of the opened file are updated in the table, the other files are written
+    in one pass after confirmation.
+    """
+    global UNSAVED_CHANGES
     try:
         clipboard_text = root.clipboard_get()
     except:
         messagebox.showinfo("Info", "Clipboard is empty.")
         return
 
-    lines = clipboard_text.splitlines()
+    files_by_name = find_files_by_name()
+    sections = parse_paste_sections(clipboard_text, files_by_name)
+
+    # Lines without a file header belong to the opened file
+    current_name = os.path.splitext(os.path.basename(CURRENT_JSON_PATH))[0] if CURRENT_JSON_PATH else None
+    current_texts = sections.pop(None, {})
+    current_texts.update(sections.pop(current_name, {}))
+
+    if not CURRENT_JSON_DATA and not sections:
+        messagebox.showerror("Error", "No file is currently loaded.")
+        return
+
+    # Resolve the other files; prefer the one in the same BDAT folder when a name is ambiguous
+    other_files = {}
+    skipped = []
+    for name, texts in sections.items():
+        paths = files_by_name[name]
+        if len(paths) > 1 and CURRENT_JSON_PATH:
+            same_folder = [p for p in paths if os.path.dirname(p) == os.path.dirname(CURRENT_JSON_PATH)]
+            paths = same_folder or paths
+        if len(paths) == 1:
+            other_files[paths[0]] = texts
+        else:
+            skipped.append(name)
+
     updated_count = 0
+    busy_rows = 0  # Rows other clients of the project server are editing
+    errors = []
+    if CURRENT_JSON_DATA and current_texts:
+        if SERVER_CLIENT:
+            try:
+                result = send_server_edit(CURRENT_JSON_PATH, current_texts, wait=True)
+                updated_count, busy_rows = len(result["applied"]), len(result["skipped"])
+            except (ServerError, ConnectionError) as e:
+                errors.append(f"{os.path.basename(CURRENT_JSON_PATH)}: {e}")
+        else:
+            updated_count = apply_texts_to_table(current_texts)
+            if updated_count:
+                UNSAVED_CHANGES = True
+
+    written_files = 0
+    written_rows = 0
+    if other_files:
+        if messagebox.askyesno("Paste", f"The clipboard also contains lines for {len(other_files)} other file(s). Write them now?"):
+            written_paths = []
+            with span("paste.batch_save", files=len(other_files)):
+                for path, texts in other_files.items():
+                    try:
+                        if SERVER_CLIENT:
+                            result = send_server_edit(path, texts, wait=True)
+                            rows = len(result["applied"])
+                            busy_rows += len(result["skipped"])
+                        else:
+                            data, state = load_document(path)
+                            rows = len(save_row_texts(state, data, texts))
+                    except Exception as e:
+                        errors.append(f"{os.path.basename(path)}: {e}")
+                        continue
+                    if rows:
+                        written_files += 1
+                        written_rows += rows
+                        written_paths.append(path)
+                if SERVER_CLIENT and written_paths:
+                    try:
+                        SERVER_CLIENT.request("flush")  # Write them now so they can be indexed
+                    except (ServerError, ConnectionError) as e:
+                        errors.append(str(e))
+                        written_paths = []
+                for path in written_paths:
+                    if NAV_INDEX:
+                        NAV_INDEX.set_file(path, *scan_file(
+                            path, resolve_original_path(path, BASE_DIR, SECOND_BASE_DIR, GAME_VERSION)))
+                        update_file_status(path)
+
+    if updated_count == 0 and written_files == 0 and not busy_rows and not errors:
+        messagebox.showwarning("Warning", "No valid lines found in clipboard matching this file.")
+        return
 
-    # Map IDs to rows for O(1) lookup
-    id_to_row = {str(row.get('$id', '')): row for row in CURRENT_JSON_DATA.get('rows', [])}
-
-    for line in lines:
-        line = line.strip()
-        if not line: continue
-
-        # Regex to capture ID and Content.
-        # Matches "[123]: some text"
-        # Non-greedy match for ID in case ID contains weird chars, though usually numeric.
-        match = re.match(r'^\[(.*?)]: (.*)$', line)
-
-        if match:
-            row_id = match.group(1)
-            content = match.group(2)
-
-            if row_id in id_to_row:
-                # Revert the escaping done during copy
-                # The copy function did: text.replace('\n', '\\n')...
-                # We must do the reverse.
-                content = content.replace('\\n', '\n').replace('\\r', '\r').replace('\\t', '\t')
-
-                # Update the row.
-                # We strictly update 'edited_text'.
-                # If it exists, overwrite. If not, create.
-                id_to_row[row_id]['edited_text'] = content
-                updated_count += 1
-
-    if updated_count > 0:
-        global UNSAVED_CHANGES
-        UNSAVED_CHANGES = True
-        # Refresh table
-        populate_table(TREE, CURRENT_ORIGINAL_JSON_DATA, CURRENT_JSON_DATA)
-        messagebox.showinfo("Success", f"Pasted and updated {updated_count} lines.")
+    summary = []
+    if updated_count:
+        summary.append(f"Pasted and updated {updated_count} lines in the opened file.")
+    if written_files:
+        summary.append(f"Saved {written_rows} lines in {written_files} other file(s).")
+    if skipped:
+        summary.append(f"Skipped ambiguous file names: {', '.join(skipped)}")
+    if busy_rows:
+        summary.append(f"Skipped {busy_rows} lines that other translators are editing.")
+    if errors:
+        summary.append("Errors:\n" + "\n".join(errors))
+        messagebox.showerror("Paste", "\n".join(summary))
     else:
-        messagebox.showwarning("Warning", "No valid lines found in clipboard matching this file.")
+        messagebox.showinfo("Success", "\n".join(summary))
 
 def show_context_menu(event):
+    global context_menu, folder_export_menu
     selected_item = file_list.selection()
     if selected_item:
-        # Rebuild context menu dynamically
+        # Create the menu on first use, rebuild its entries dynamically
+        if context_menu is None:
+            context_menu = tk.Menu(root, tearoff=0)
+            folder_export_menu = build_export_menu(context_menu, "folder")
         context_menu.delete(0, "end")
 
         context_menu.add_command(label="Open Translated JSON Directory", command=open_translated_dir)
@@ -1100,6 +2838,10 @@ def show_context_menu(event):
         context_menu.add_command(label="Copy Both Content", command=lambda: copy_file_content("both"))
         context_menu.add_command(label="Copy Both Content (Sequential)", command=lambda: copy_file_content("both_sequential"))
 
+        if file_list.item(selected_item[0], 'values')[0] == "folder":
+            context_menu.add_separator()
+            context_menu.add_cascade(label="Export Folder Content", menu=folder_export_menu)
+
         # Check if selected item matches currently opened file
         # Use [0] to get the single ID from selection tuple
         item_path = file_list.item(selected_item[0], 'values')[1]
@@ -1110,93 +2852,23 @@ def show_context_menu(event):
 
         context_menu.post(event.x_root, event.y_root)
 
-# Create context menu (Empty initially, populated in show_context_menu)
-context_menu = tk.Menu(root, tearoff=0)
-
-# Bind right click to show context menu
-file_list.bind("<Button-3>", show_context_menu)
-
-file_list_scrollbar.config(command=file_list.yview)
-
-# Configure styles with consistent font sizes
-style = ttk.Style()
-style.configure('FileList.Treeview', font=('Calibri', 12, 'bold'))  # Bold style for file list
-style.configure('DataTable.Treeview', font=('Calibri', 12))  # Regular style for data table
-
-# --- Define tags for background colors ---
-file_list.tag_configure("green", background="green")
-file_list.tag_configure("orange", background="orange")
-file_list.tag_configure("red", background="red")
-
-# --- Right Frame (Table Editor) ---
-right_frame = ttk.Frame(paned_window, padding=10)
-paned_window.add(right_frame)
-
-# --- Buttons ---
-button_frame = ttk.Frame(right_frame)
-button_frame.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
-
-save_button = ttk.Button(button_frame, text="Save", command=save_table_data, bootstyle="primary")
-save_button.pack(side=tk.LEFT, padx=5, pady=5)
-
-undo_button = ttk.Button(button_frame, text="Undo", command=undo_changes, bootstyle="warning")
-undo_button.pack(side=tk.LEFT, padx=5, pady=5)
-
-# Font Size Selection
-font_size_label = ttk.Label(button_frame, text="Font Size:")
-font_size_label.pack(side=tk.LEFT, padx=(10,0))
-
-font_size_var = tk.IntVar(value=12)  # Default font size
-font_size_combo = ttk.Combobox(button_frame, textvariable=font_size_var, values=[8, 10, 12, 14, 16], width=3)
-font_size_combo.pack(side=tk.LEFT, padx=5)
-font_size_combo.bind("<<ComboboxSelected>>", update_font_size)
-
-mark_green_button = ttk.Button(button_frame, text="Mark Green", command=lambda: mark_folder("green"), bootstyle="success")
-mark_green_button.pack(side=tk.LEFT, padx=5, pady=5)
-
-mark_orange_button = ttk.Button(button_frame, text="Mark Orange", command=lambda: mark_folder("orange"), bootstyle="warning")
-mark_orange_button.pack(side=tk.LEFT, padx=5, pady=5)
-
-clear_color_button = ttk.Button(button_frame, text="Clear Color", command=lambda: mark_folder(None), bootstyle="secondary")
-clear_color_button.pack(side=tk.LEFT, padx=5, pady=5)
-
-# --- Treeview Table ---
-style = ttk.Style()
-style.configure('Treeview', rowheight=40)
-
-TREE = ttk.Treeview(
-    right_frame,
-    columns=("ID", "LABEL", "ORIGINAL TEXT", "TRANSLATED TEXT"),
-    show="headings",
-    style='DataTable.Treeview'
-)
-TREE.heading("ID", text="ID")
-TREE.heading("LABEL", text="LABEL")
-TREE.heading("ORIGINAL TEXT", text="ORIGINAL TEXT")
-TREE.heading("TRANSLATED TEXT", text="TRANSLATED TEXT")
-
-# Set column widths with stretch for text columns
-TREE.column("ID", width=50, stretch=False)
-TREE.column("LABEL", width=150, stretch=False)
-TREE.column("ORIGINAL TEXT", width=200, stretch=True, anchor=tk.W)
-TREE.column("TRANSLATED TEXT", width=200, stretch=True, anchor=tk.W)
-
-# Add a Scrollbar to the Treeview Table
-tree_scroll = ttk.Scrollbar(right_frame, orient="vertical", command=TREE.yview)
-TREE.configure(yscrollcommand=tree_scroll.set)
-tree_scroll.pack(side="right", fill="y")
-TREE.pack(fill=tk.BOTH, expand=True)
-
-# Define tag for red background
-TREE.tag_configure("red", background="red")
-
-# Bind double click to edit cell
-TREE.bind("<Double-1>", edit_cell)
+def build_export_menu(parent, scope):
+    """Creates the submenu with one export entry per copy format."""
+    menu = tk.Menu(parent, tearoff=0)
+    menu.add_command(label="Original...", command=lambda: export_content("original", scope))
+    menu.add_command(label="Translated...", command=lambda: export_content("translated", scope))
+    menu.add_command(label="Both...", command=lambda: export_content("both", scope))
+    menu.add_command(label="Both (Sequential)...", command=lambda: export_content("both_sequential", scope))
+    return menu
 
 def show_tree_context_menu(event):
     """Shows the context menu for the Treeview."""
+    global context_menu_event, tree_context_menu
+    if tree_context_menu is None:
+        tree_context_menu = tk.Menu(root, tearoff=0)
+        tree_context_menu.add_command(label="Copy Cell Value", command=lambda: copy_cell_value())
+        tree_context_menu.add_command(label="Mark Reviewed", command=mark_selected_reviewed)
     tree_context_menu.post(event.x_root, event.y_root)
-    global context_menu_event
     context_menu_event = event
 
 def copy_cell_value():
@@ -1205,45 +2877,269 @@ def copy_cell_value():
         return
 
     item = TREE.selection()[0]  # Get the selected item
-    column_id = int(TREE.identify_column(context_menu_event.x)[1:]) - 1  # Get the column ID
+    column_id = value_index(TREE.identify_column(context_menu_event.x))  # Get the column ID
     value = TREE.item(item, 'values')[column_id]  # Get the cell value
     root.clipboard_clear()
     root.clipboard_append(value)
     root.update()
 
-# Create context menu for the Treeview
-tree_context_menu = tk.Menu(root, tearoff=0)
-tree_context_menu.add_command(label="Copy Cell Value", command=lambda: copy_cell_value())
+# --- GUI Setup ---
+
+def build_gui():
+    """Creates the main window and all widgets."""
+    global root, file_list, search_var, font_size_var, profiling_var, pixel_validation_var, base_dir_label, second_base_dir_label
+    global paned_window, status_bar, TREE, jump_var, jump_entry, jump_status_label, row_filter_var, filter_status_label
+
+    root = tk.Window(themename='flatly')
+    root.title("BDAT Translation Tool")
+    # Set default font size for the application
+    default_font = ('Calibri', 12)
+    root.option_add('*Font', default_font)
+    root.option_add('*TCombobox*Font', default_font)
+    root.option_add('*TEntry*Font', default_font)
+    root.option_add('*TLabel*Font', default_font)
+
+    # Save the status and GUI state when the window is closed
+    root.protocol("WM_DELETE_WINDOW", on_close)
+
+    # Ensure we only have one window
+    root.withdraw()
+    root.deiconify()
+
+    # --- Top Frame (Directory/File Navigation and Buttons) ---
+    top_frame = ttk.Frame(root, padding=10)
+    top_frame.pack(side=tk.TOP, fill=tk.X)
+
+    # Search filter
+    search_frame = ttk.Frame(top_frame)
+    search_frame.pack(side=tk.LEFT, padx=5, pady=5)
+
+    search_label = ttk.Label(search_frame, text="Search:")
+    search_label.pack(side=tk.LEFT)
+
+    search_var = tk.StringVar()
+    search_entry = ttk.Entry(search_frame, textvariable=search_var, width=20)
+    search_entry.pack(side=tk.LEFT, padx=5)
+    search_entry.bind('<KeyRelease>', filter_folders)
+
+    base_dir_button = ttk.Button(top_frame, text="Select Base Dir", command=browse_base_dir)
+    base_dir_button.pack(side=tk.LEFT, padx=5, pady=5)
+
+    base_dir_label = ttk.Label(top_frame, text=f"Base Directory: {BASE_DIR}")
+    base_dir_label.pack(side=tk.LEFT, padx=5, pady=5)
+
+    second_base_dir_button = ttk.Button(top_frame, text="Select Second Dir", command=browse_second_base_dir)
+    second_base_dir_button.pack(side=tk.LEFT, padx=5, pady=5)
+
+    second_base_dir_label = ttk.Label(top_frame, text=f"Second Directory: {SECOND_BASE_DIR}")
+    second_base_dir_label.pack(side=tk.LEFT, padx=5, pady=5)
+
+    # --- Status Bar (profiling timings) ---
+    status_bar = ttk.Label(root, text="", anchor=tk.W, padding=(10, 2))
+    instrument.add_listener(on_span_finished)
+
+    # --- Menu Bar ---
+    menu_bar = tk.Menu(root)
+    root.config(menu=menu_bar)
+
+    tools_menu = tk.Menu(menu_bar, tearoff=0)
+    menu_bar.add_cascade(label="Tools", menu=tools_menu)
+
+    profiling_var = tk.BooleanVar(value=instrument.ENABLED)
+    tools_menu.add_checkbutton(label="Enable Profiling", variable=profiling_var, command=toggle_profiling)
+    tools_menu.add_command(label="Export Trace...", command=export_trace)
+    tools_menu.add_command(label="Memory Report...", command=show_memory_report)
+    tools_menu.add_command(label="Show UI Stalls...", command=show_stall_log)
+    tools_menu.add_command(label="Export Stall Log...", command=export_stall_log)
+    tools_menu.add_separator()
+    pixel_validation_var = tk.BooleanVar(value=False)
+    tools_menu.add_checkbutton(label="Pixel-Width Validation", variable=pixel_validation_var, command=toggle_pixel_validation)
+    tools_menu.add_command(label="Check Project Line Widths...", command=check_project_line_widths)
+    tools_menu.add_command(label="Check Project Tags...", command=check_project_tag_integrity)
+    tools_menu.add_separator()
+    tools_menu.add_command(label="Reference Directories...", command=manage_reference_dirs)
+    tools_menu.add_command(label="Take Snapshot...", command=take_snapshot)
+    tools_menu.add_command(label="Snapshots...", command=show_snapshots)
+    tools_menu.add_command(label="Update Originals...", command=update_originals)
+    tools_menu.add_command(label="Show Rows To Review...", command=show_review_list)
+    server_menu = tk.Menu(tools_menu, tearoff=0)
+    server_menu.add_command(label="Host Project Server...", command=host_project_server)
+    server_menu.add_command(label="Connect to Project Server...", command=connect_project_server)
+    server_menu.add_command(label="Disconnect", command=disconnect_project_server)
+    tools_menu.add_cascade(label="Project Server", menu=server_menu)
+    mt_menu = tk.Menu(tools_menu, tearoff=0)
+    mt_menu.add_command(label="Open File...", command=lambda: machine_translate("file"))
+    mt_menu.add_command(label="Selected Folder...", command=lambda: machine_translate("folder"))
+    mt_menu.add_command(label="Whole Project...", command=lambda: machine_translate("project"))
+    mt_menu.add_separator()
+    mt_menu.add_command(label="Set Server URL...", command=set_mt_endpoint)
+    tools_menu.add_cascade(label="Machine Translation Pre-fill", menu=mt_menu)
+    tools_menu.add_separator()
+    tools_menu.add_command(label="Build Changed Files", command=build_mod_output)
+    tools_menu.add_command(label="Set Build Directory...", command=set_build_dir)
+    tools_menu.add_separator()
+    tools_menu.add_command(label="Paste Lines From Clipboard", command=paste_file_content)
+    tools_menu.add_cascade(label="Export Project Content", menu=build_export_menu(tools_menu, "project"))
+
+    # Navigation through the project index
+    navigate_menu = tk.Menu(menu_bar, tearoff=0)
+    menu_bar.add_cascade(label="Navigate", menu=navigate_menu)
+    navigate_menu.add_command(label="Next Untranslated Row", accelerator="F3", command=lambda: jump_to_row("untranslated"))
+    navigate_menu.add_command(label="Previous Untranslated Row", accelerator="Shift+F3",
+                              command=lambda: jump_to_row("untranslated", backwards=True))
+    navigate_menu.add_command(label="Next Row Over Limit", accelerator="F4", command=lambda: jump_to_row("over_limit"))
+    navigate_menu.add_command(label="Previous Row Over Limit", accelerator="Shift+F4",
+                              command=lambda: jump_to_row("over_limit", backwards=True))
+    root.bind("<F3>", lambda e: jump_to_row("untranslated"))
+    root.bind("<Shift-F3>", lambda e: jump_to_row("untranslated", backwards=True))
+    root.bind("<F4>", lambda e: jump_to_row("over_limit"))
+    root.bind("<Shift-F4>", lambda e: jump_to_row("over_limit", backwards=True))
+    navigate_menu.add_separator()
+    navigate_menu.add_command(label="Go to ID/Label", accelerator="Ctrl+G", command=focus_jump_box)
+    root.bind("<Control-g>", focus_jump_box)
+
+    # --- Panedwindow for Left/Right Sections ---
+    paned_window = ttk.Panedwindow(root, orient=tk.HORIZONTAL)
+    paned_window.pack(fill=tk.BOTH, expand=True)
+
+    if instrument.ENABLED:
+        toggle_profiling()
+
+    # --- Left Frame (File List) ---
+    left_frame = ttk.Frame(paned_window, padding=10)
+    paned_window.add(left_frame)
+
+    # --- File List with Scrollbar ---
+    file_list_frame = ttk.Frame(left_frame)
+    file_list_frame.pack(fill=tk.BOTH, expand=True)
+
+    file_list_scrollbar = ttk.Scrollbar(file_list_frame)
+    file_list_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+    file_list = ttk.Treeview(file_list_frame, columns=("Type", "Path"), yscrollcommand=file_list_scrollbar.set, style='FileList.Treeview')
+    file_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    file_list.heading("#0", text="Folders/Files", anchor=tk.W)
+    file_list.heading("Type", text="Type")
+    file_list.column("Type", width=50, stretch=False)
+    file_list.column("Path", width=0, stretch=False)  # Hide the path column
+    file_list.bind("<Double-1>", file_list_select)  # Double-click to load
+    file_list.bind("<<TreeviewOpen>>", expand_folder)  # List a folder's files when it is first opened
+
+    # Bind right click to show context menu (created on first use)
+    file_list.bind("<Button-3>", show_context_menu)
+
+    file_list_scrollbar.config(command=file_list.yview)
+
+    # Configure styles with consistent font sizes
+    style = ttk.Style()
+    style.configure('FileList.Treeview', font=('Calibri', 12, 'bold'))  # Bold style for file list
+    style.configure('DataTable.Treeview', font=('Calibri', 12))  # Regular style for data table
+
+    # --- Define tags for background colors ---
+    file_list.tag_configure("green", background="green")
+    file_list.tag_configure("orange", background="orange")
+    file_list.tag_configure("red", background="red")
+
+    # --- Right Frame (Table Editor) ---
+    right_frame = ttk.Frame(paned_window, padding=10)
+    paned_window.add(right_frame)
+
+    # --- Buttons ---
+    button_frame = ttk.Frame(right_frame)
+    button_frame.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
+
+    save_button = ttk.Button(button_frame, text="Save", command=save_table_data, bootstyle="primary")
+    save_button.pack(side=tk.LEFT, padx=5, pady=5)
+
+    undo_button = ttk.Button(button_frame, text="Undo", command=undo_changes, bootstyle="warning")
+    undo_button.pack(side=tk.LEFT, padx=5, pady=5)
+
+    # Font Size Selection
+    font_size_label = ttk.Label(button_frame, text="Font Size:")
+    font_size_label.pack(side=tk.LEFT, padx=(10,0))
+
+    font_size_var = tk.IntVar(value=12)  # Default font size
+    font_size_combo = ttk.Combobox(button_frame, textvariable=font_size_var, values=[8, 10, 12, 14, 16], width=3)
+    font_size_combo.pack(side=tk.LEFT, padx=5)
+    font_size_combo.bind("<<ComboboxSelected>>", update_font_size)
+
+    mark_green_button = ttk.Button(button_frame, text="Mark Green", command=lambda: mark_folder("green"), bootstyle="success")
+    mark_green_button.pack(side=tk.LEFT, padx=5, pady=5)
+
+    mark_orange_button = ttk.Button(button_frame, text="Mark Orange", command=lambda: mark_folder("orange"), bootstyle="warning")
+    mark_orange_button.pack(side=tk.LEFT, padx=5, pady=5)
+
+    clear_color_button = ttk.Button(button_frame, text="Clear Color", command=lambda: mark_folder(None), bootstyle="secondary")
+    clear_color_button.pack(side=tk.LEFT, padx=5, pady=5)
+
+    # Jump box: Enter selects the next row with a matching $id or label, Shift+Enter the previous one
+    jump_label = ttk.Label(button_frame, text="Go to ID/Label:")
+    jump_label.pack(side=tk.LEFT, padx=(10,0))
+
+    jump_var = tk.StringVar()
+    jump_entry = ttk.Entry(button_frame, textvariable=jump_var, width=16)
+    jump_entry.pack(side=tk.LEFT, padx=5)
+    jump_entry.bind('<Return>', jump_to_id)
+    jump_entry.bind('<Shift-Return>', lambda e: jump_to_id(e, backwards=True))
+
+    jump_status_label = ttk.Label(button_frame, text="")
+    jump_status_label.pack(side=tk.LEFT)
+
+    # Row filter; clicking a column heading sorts by it
+    row_filter_label = ttk.Label(button_frame, text="Show:")
+    row_filter_label.pack(side=tk.LEFT, padx=(10,0))
+
+    row_filter_var = tk.StringVar(value="All rows")
+    row_filter_combo = ttk.Combobox(button_frame, textvariable=row_filter_var, values=list(FILTER_LABELS),
+                                    width=12, state="readonly")
+    row_filter_combo.pack(side=tk.LEFT, padx=5)
+    row_filter_combo.bind("<<ComboboxSelected>>", set_row_filter)
+
+    filter_status_label = ttk.Label(button_frame, text="")
+    filter_status_label.pack(side=tk.LEFT)
 
-# Bind right click to show context menu
-TREE.bind("<Button-3>", show_tree_context_menu)
+    # --- Treeview Table ---
+    style = ttk.Style()
+    style.configure('Treeview', rowheight=40)
+
+    TREE = ttk.Treeview(
+        right_frame,
+        columns=TABLE_COLUMNS,
+        show="headings",
+        style='DataTable.Treeview'
+    )
+    # FILE is only shown in the folder view, the reference directories get a column each
+    configure_table_columns()
+
+    # Add a Scrollbar to the Treeview Table
+    tree_scroll = ttk.Scrollbar(right_frame, orient="vertical", command=TREE.yview)
+    TREE.configure(yscrollcommand=lambda first, last: on_tree_scroll(tree_scroll, first, last))
+    tree_scroll.pack(side="right", fill="y")
+    TREE.pack(fill=tk.BOTH, expand=True)
+
+    # Define tag for red background
+    TREE.tag_configure("red", background="red")
+    TREE.tag_configure("review", foreground="blue")
+    TREE.tag_configure("locked", background="#D3D3D3")  # Being edited by another client of the project server
+
+    # Bind double click to edit cell
+    TREE.bind("<Double-1>", edit_cell)
+
+    # Bind right click to show context menu (created on first use)
+    TREE.bind("<Button-3>", show_tree_context_menu)
+
+    STARTUP_TIMINGS["window"] = time.perf_counter() - _START_TIME
 
 # --- Application Initialization ---
 
 def on_startup():
-    """Runs on application startup to load state and populate lists."""
-    load_gui_state()
-
+    """Runs on application startup to populate lists from the state loaded by main()."""
     if BASE_DIR:
-        print(f"Loading config from: {os.path.join(BASE_DIR, 'translation_config.ini')}")
+        print(f"Loading status from: {BASE_DIR}")
         try:
             load_config()
-            populate_file_list()
-
-            # Apply colors to nested files after population
-            for item in file_list.get_children():
-                item_type = file_list.item(item, 'values')[0]
-                if item_type == "folder":
-                    for child in file_list.get_children(item):
-                        child_path = file_list.item(child, 'values')[1]
-                        # Get the BDAT folder name (parent folder)
-                        bdat_folder = os.path.basename(os.path.dirname(os.path.dirname(child_path)))
-                        # Get relative path within BDAT folder
-                        rel_path = os.path.relpath(child_path, os.path.join(BASE_DIR, bdat_folder))
-                        # Convert to forward slashes for consistency
-                        key = rel_path.replace('\\', '/')
-                        if key in FOLDER_STATUS:
-                            file_list.item(child, tags=(FOLDER_STATUS[key],))
+            # Use the scan that ran while the window was being built
+            populate_file_list(STARTUP_SCAN.result() if STARTUP_SCAN else None)
 
             # Select the first item if available
             first_item = file_list.get_children()
@@ -1256,8 +3152,30 @@ def on_startup():
             traceback.print_exc()
             messagebox.showerror("Startup Error", f"An error occurred while loading the file list:\n{e}")
 
-# Use root.after to run initialization after the window is ready (important for Linux/GTK)
-root.after(100, on_startup)
+    if STARTUP_PROBE:
+        root.update_idletasks()
+        STARTUP_TIMINGS["first_data"] = time.perf_counter() - _START_TIME
+        print("STARTUP_PROBE " + json.dumps(STARTUP_TIMINGS))
+        root.destroy()
+
+def main():
+    global STARTUP_SCAN
+    load_gui_state()
+
+    # Scan the project on a worker thread while Tk builds and themes the window
+    if BASE_DIR:
+        executor = ThreadPoolExecutor(max_workers=1)
+        STARTUP_SCAN = executor.submit(scan_project, BASE_DIR)
+        executor.shutdown(wait=False)
+
+    build_gui()
+    start_watchdog()
+
+    # Use root.after to run initialization after the window is ready (important for Linux/GTK)
+    root.after(100, on_startup)
+
+    # Start the main loop
+    root.mainloop()
 
-# Start the main loop
-root.mainloop()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Headless core of the BDAT Translation Tool.
+
+Everything in this package works without Tk so it can be reused by scripts,
+benchmarks and the GUI alike. The names below are imported from their module
+on first use, so importing the package stays cheap and programs only pay for
+the modules they use (mt and server pull in urllib and asyncio, for example).
+"""
+import importlib
+
+_EXPORTS = {
+    "build": ("build_changed_files",),
+    "carry": ("carry_forward", "load_review_list", "review_key", "save_review_list"),
+    "game": ("GAME_SHORT_NAMES", "detect_game_version"),
+    "glyphs": ("GlyphTable", "check_project_widths", "find_glyph_table", "load_glyph_table"),
+    "jsonio": ("apply_edited_text", "read_json", "row_text", "set_row_text", "write_json"),
+    "merge": ("DocumentState", "load_document", "merge_rows", "save_document", "save_row_texts"),
+    "mt": ("prefill_files",),
+    "navindex": ("NAV_KINDS", "NavIndex", "build_nav_index", "scan_file", "scan_rows"),
+    "paths": ("cache_dir", "file_status_key", "iter_bdat_folders", "iter_project_files", "list_json_files",
+              "resolve_original_path"),
+    "projection": ("OriginalProjection", "ProjectionCache"),
+    "rollup": ("StatusRollup", "derived_file_status"),
+    "rowindex": ("RowIndex",),
+    "schema": ("table_columns", "text_field"),
+    "snapshots": ("SnapshotStore", "snapshot_paths_under"),
+    "status_store": ("StatusStore",),
+    "tableview": ("ROW_FILTERS", "SORT_KEY_INDEX", "row_view_keys", "view_order"),
+    "tags": ("check_project_tags", "compare_tags", "extract_tags", "format_tag_issues"),
+    "text": ("escape_text", "strip_tags", "unescape_text"),
+    "transfer": ("COPY_MODES", "export_files", "format_file_lines", "parse_paste_sections", "read_file_block"),
+    "validation": ("check_line_length", "line_limit"),
+    "watchdog": ("StallWatchdog",),
+}
+_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_MODULES)
+
+
+def __getattr__(name):
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value  # Later lookups don't come back here
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
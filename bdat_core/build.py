@@ -0,0 +1,117 @@
+"""Delta builds of the translated files into a mod or repack output directory.
+
+The output directory keeps a manifest with the content hash of every file it
+received. A build only hashes files whose size or modification time changed
+since the last build and only copies files whose content changed, then writes
+the list of copied files to changed_files.txt for the repack tool.
+"""
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from .instrument import span
+from .paths import iter_bdat_folders, list_json_files
+
+MANIFEST_NAME = ".bdat_manifest.json"
+CHANGED_LIST_NAME = "changed_files.txt"
+
+
+def file_hash(path):
+    """Returns the SHA-1 of a file's content."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(out_dir):
+    """Returns {relative path: {"size": int, "mtime": int, "hash": str}} of the last build."""
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}  # A damaged manifest only means a full build
+
+
+def save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def iter_build_files(base_dir, game_version):
+    """Yields the path of every file that belongs in the output: JSON tables and their .bschema files."""
+    for _, bdat_folder_path, bdat_folder in iter_bdat_folders(base_dir, game_version):
+        schema_path = os.path.join(bdat_folder_path, f"{bdat_folder}.bschema")
+        if os.path.exists(schema_path):
+            yield schema_path
+        for _, json_path in list_json_files(bdat_folder_path):
+            yield json_path
+
+
+def _build_file(source, target, entry):
+    """Hashes one file and copies it when its content changed. Returns (new manifest entry, copied)."""
+    stat = os.stat(source)
+    if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime_ns and os.path.exists(target):
+        return entry, False
+
+    content_hash = file_hash(source)
+    new_entry = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "hash": content_hash}
+    if entry and entry["hash"] == content_hash and os.path.exists(target):
+        return new_entry, False  # Touched but unchanged
+
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    shutil.copy2(source, target)
+    return new_entry, True
+
+
+def build_changed_files(base_dir, out_dir, game_version, workers=8, progress=None, cancel=None):
+    """Copies the files of base_dir that changed since the last build into out_dir.
+
+    Returns (copied relative paths, relative paths no longer in base_dir). The
+    changed-files list is written even when nothing changed, so the repack tool
+    never picks up a stale one. Removed files are not deleted from out_dir.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = load_manifest(out_dir)
+    sources = list(iter_build_files(base_dir, game_version))
+    rel_paths = [os.path.relpath(source, base_dir).replace('\\', '/') for source in sources]
+
+    copied = []
+    new_manifest = {}
+    with span("build", files=len(sources)):
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_build_file, source, os.path.join(out_dir, *rel_path.split('/')),
+                                       manifest.get(rel_path))
+                       for source, rel_path in zip(sources, rel_paths)]
+            for done, (rel_path, future) in enumerate(zip(rel_paths, futures), 1):
+                if cancel is not None and cancel.is_set():
+                    for pending in futures:
+                        pending.cancel()
+                    break
+                entry, was_copied = future.result()
+                new_manifest[rel_path] = entry
+                if was_copied:
+                    copied.append(rel_path)
+                if progress:
+                    progress(done, len(sources))
+
+        # Keep the old entries of files that were not processed because of a cancel
+        for rel_path in rel_paths:
+            if rel_path not in new_manifest and rel_path in manifest:
+                new_manifest[rel_path] = manifest[rel_path]
+        current = set(rel_paths)
+        removed = sorted(rel_path for rel_path in manifest if rel_path not in current)
+
+        save_manifest(out_dir, new_manifest)
+        with open(os.path.join(out_dir, CHANGED_LIST_NAME), 'w', encoding='utf-8') as f:
+            f.writelines(f"{rel_path}\n" for rel_path in copied)
+    return copied, removed
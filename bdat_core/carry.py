@@ -0,0 +1,196 @@
+"""Carries translations forward when the original files are replaced by a newer extraction.
+
+Three trees are joined per file: the old originals (the current Second
+Directory), the new originals and the translations (the Base Directory). Rows
+are matched by $id and by original text:
+
+- kept:    the original text did not change, the translation is kept
+- updated: the row was never translated, it takes the new original text
+- moved:   the row got a new $id but its original text exists under an old $id,
+           the translation of that row is carried over
+- changed: the original text changed, the old translation is kept for review
+- new:     the row has no translation, the new original text is used for review
+
+The result has the structure of the new original file. Rows that need a look are
+kept in a review list in the project's cache folder.
+"""
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .instrument import span
+from .jsonio import read_json, row_text, set_row_text, write_json
+from .paths import CACHE_DIR_NAME, cache_dir, iter_project_files, resolve_original_path
+from .schema import text_field
+
+REVIEW_LIST_NAME = "review.json"
+CARRY_COUNTS = ("kept", "updated", "moved", "changed", "new", "removed")
+
+
+def carry_rows(new_data, old_data, translated_data):
+    """Returns (rows, counts, review ids) for one table.
+
+    old_data may be empty when the old original is missing; translations are then
+    kept as they are and flagged when they differ from the new original.
+    """
+    new_rows = new_data.get('rows', [])
+    new_field, old_field, translated_field = text_field(new_data), text_field(old_data), text_field(translated_data)
+    old_texts = {row.get('$id'): row_text(row, old_field) for row in old_data.get('rows', [])}
+    old_ids_by_text = {}
+    for row_id, text in old_texts.items():
+        old_ids_by_text.setdefault(text, row_id)
+    translations = {row.get('$id'): row_text(row, translated_field) for row in translated_data.get('rows', [])}
+
+    counts = dict.fromkeys(CARRY_COUNTS, 0)
+    review = []
+    rows = []
+    for new_row in new_rows:
+        row_id = new_row.get('$id')
+        new_text = row_text(new_row, new_field)
+        row = dict(new_row)
+
+        if row_id in translations and row_id in old_texts:
+            if old_texts[row_id] == new_text:
+                text, result = translations[row_id], "kept"
+            elif translations[row_id] == old_texts[row_id]:
+                text, result = new_text, "updated"
+            else:
+                text, result = translations[row_id], "changed"
+        elif row_id in translations:
+            text = translations[row_id]
+            result = "kept" if text == new_text else "changed"
+        elif old_ids_by_text.get(new_text) in translations:
+            text, result = translations[old_ids_by_text[new_text]], "moved"
+        else:
+            text, result = new_text, "new"
+
+        set_row_text(row, text, new_field)
+        rows.append(row)
+        counts[result] += 1
+        if result in ("changed", "new"):
+            review.append(row_id)
+
+    new_ids = {row.get('$id') for row in new_rows}
+    counts["removed"] = sum(1 for row_id in translations if row_id not in new_ids)
+    return rows, counts, review
+
+
+def carry_file(new_original_path, old_original_path, translated_path, apply=False):
+    """Carries the translations of one file. Returns (counts, review ids).
+
+    translated_path does not need to exist; the new file is then created from the
+    new original. Nothing is written unless apply is set.
+    """
+    new_data = read_json(new_original_path)
+    old_data = read_json(old_original_path) if old_original_path else {}
+    translated_data = read_json(translated_path) if os.path.exists(translated_path) else {}
+
+    rows, counts, review = carry_rows(new_data, old_data, translated_data)
+    if apply:
+        new_data['rows'] = rows
+        _copy_schema(new_original_path, translated_path)
+        write_json(translated_path, new_data)
+    return counts, review
+
+
+def _copy_schema(new_original_path, translated_path):
+    """Creates the folders of a new BDAT folder together with its .bschema file."""
+    inner_dir = os.path.dirname(translated_path)
+    bdat_dir = os.path.dirname(inner_dir)
+    os.makedirs(inner_dir, exist_ok=True)
+    schema_name = os.path.basename(bdat_dir) + ".bschema"
+    schema_source = os.path.join(os.path.dirname(os.path.dirname(new_original_path)), schema_name)
+    schema_target = os.path.join(bdat_dir, schema_name)
+    if os.path.exists(schema_source) and not os.path.exists(schema_target):
+        shutil.copy2(schema_source, schema_target)
+
+
+def carry_forward(base_dir, second_base_dir, new_original_dir, game_version, apply=False,
+                  progress=None, cancel=None):
+    """Carries the translations of a whole project forward to the new originals on a process pool.
+
+    Returns (totals per result, {translated path: review ids}, cancelled,
+    {translated path: error}). With apply the translated files are rewritten and
+    the review list is updated. A file that can't be read is skipped, counted as
+    "failed" in the totals and its error returned; the other files go on. A
+    cancel stops files that have not started; files already being written are
+    finished and counted, so their rows still reach the review list.
+    """
+    new_paths = list(iter_project_files(new_original_dir, game_version))
+    jobs = []
+    for new_path in new_paths:
+        old_path = resolve_original_path(new_path, new_original_dir, second_base_dir, game_version)
+        translated_path = (resolve_original_path(new_path, new_original_dir, base_dir, game_version)
+                           or os.path.join(base_dir, os.path.relpath(new_path, new_original_dir)))
+        jobs.append((new_path, old_path, translated_path))
+
+    totals = dict.fromkeys(CARRY_COUNTS + ("failed",), 0)
+    review = {}
+    errors = {}
+    cancelled = False
+
+    def collect(future):
+        try:
+            counts, review_ids = future.result()
+        except Exception as e:
+            errors[futures[future]] = f"{type(e).__name__}: {e}"
+            totals["failed"] += 1
+            return
+        for key, value in counts.items():
+            totals[key] += value
+        if review_ids:
+            review[futures[future]] = review_ids
+
+    futures = {}
+    with span("carry.forward", files=len(jobs), apply=apply):
+        try:
+            with ProcessPoolExecutor() as executor:
+                futures = {executor.submit(carry_file, new_path, old_path, translated_path, apply): translated_path
+                           for new_path, old_path, translated_path in jobs}
+                collected = set()
+                for done, future in enumerate(as_completed(futures), 1):
+                    collect(future)
+                    collected.add(future)
+                    if progress:
+                        progress(done, len(jobs))
+                    if cancel is not None and cancel.is_set():
+                        cancelled = True
+                        for pending in futures:
+                            pending.cancel()
+                        break
+                # Files that were already running when cancelled have been written too
+                for future in futures:
+                    if future not in collected and not future.cancelled():
+                        collect(future)
+        finally:
+            # Whatever stopped the run, the rows of the files written so far must reach the review list
+            if apply and review:
+                review_list = load_review_list(base_dir)
+                for translated_path, review_ids in review.items():
+                    key = review_key(translated_path, base_dir)
+                    review_list[key] = sorted(set(review_list.get(key, [])) | set(review_ids), key=str)
+                save_review_list(base_dir, review_list)
+    return totals, review, cancelled, errors
+
+
+def review_key(json_path, base_dir):
+    """Returns the key of a file in the review list."""
+    return os.path.relpath(json_path, base_dir).replace('\\', '/')
+
+
+def load_review_list(base_dir):
+    """Returns {file key: [row ids to review]}."""
+    path = os.path.join(base_dir, CACHE_DIR_NAME, REVIEW_LIST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_review_list(base_dir, review_list):
+    path = os.path.join(cache_dir(base_dir), REVIEW_LIST_NAME)
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({key: ids for key, ids in review_list.items() if ids}, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
@@ -0,0 +1,105 @@
+"""Client of the project server (see bdat_core.server for the protocol).
+
+Kept apart from the server so that the GUI can connect without importing
+asyncio and the rest of the server.
+"""
+import json
+import queue
+import socket
+import threading
+
+DEFAULT_PORT = 8766
+
+
+class ServerError(Exception):
+    """A request that the server refused or could not carry out."""
+
+
+def encode_message(message):
+    return json.dumps(message, ensure_ascii=False).encode('utf-8') + b"\n"
+
+
+class ProjectClient:
+    """Blocking client of a ProjectServer for the GUI thread.
+
+    Events pushed by the server are collected by a reader thread and taken with
+    poll_events(), so the GUI can apply them from its own event loop.
+    """
+
+    def __init__(self, host, port, name, timeout=10, password=None):
+        self.address = f"{host}:{port}"
+        self.timeout = timeout
+        self.sock = socket.create_connection((host, port), timeout)
+        self.sock.settimeout(None)
+        self.reader = self.sock.makefile('rb')
+        self.send_lock = threading.Lock()
+        self.pending = {}  # request id -> [threading.Event, response]
+        self.next_id = 1
+        self.events = queue.Queue()
+        self.connected = True
+        threading.Thread(target=self.read_loop, daemon=True).start()
+        try:
+            hello = self.request("hello", name=name, password=password)
+        except ServerError:
+            self.close()
+            raise
+        self.client_id = hello["client"]
+        self.game_version = hello["game_version"]
+
+    def read_loop(self):
+        try:
+            for line in self.reader:
+                message = json.loads(line)
+                if "event" in message:
+                    self.events.put(message)
+                elif message.get("id") in self.pending:
+                    waiter = self.pending.pop(message["id"])
+                    waiter[1] = message
+                    waiter[0].set()
+        except (OSError, ValueError):
+            pass
+        self.connected = False
+        self.events.put({"event": "disconnected"})
+        for waiter in list(self.pending.values()):
+            waiter[0].set()
+
+    def send(self, op, **args):
+        """Sends a request without waiting for its answer."""
+        self._write(dict(args, op=op))
+
+    def request(self, op, **args):
+        """Sends a request and returns its result. Raises ServerError or ConnectionError."""
+        with self.send_lock:
+            request_id = self.next_id
+            self.next_id += 1
+        waiter = self.pending[request_id] = [threading.Event(), None]
+        self._write(dict(args, op=op, id=request_id))
+        if not waiter[0].wait(self.timeout) or waiter[1] is None:
+            self.pending.pop(request_id, None)
+            raise ConnectionError(f"No answer from the project server at {self.address}")
+        if "error" in waiter[1]:
+            raise ServerError(waiter[1]["error"])
+        return waiter[1].get("result")
+
+    def _write(self, message):
+        if not self.connected:
+            raise ConnectionError(f"Not connected to the project server at {self.address}")
+        with self.send_lock:
+            self.sock.sendall(encode_message(message))
+
+    def poll_events(self):
+        """Returns the events received since the last call."""
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def close(self):
+        self.connected = False
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
@@ -0,0 +1,46 @@
+"""Game version detection."""
+import json
+import os
+
+from .instrument import timed
+
+# Short names used in the window title
+GAME_SHORT_NAMES = {
+    "Xenoblade2": "X2",
+    "Xenoblade3": "X3",
+    "XenobladeX": "X",
+}
+
+
+@timed("detect")
+def detect_game_version(base_dir):
+    """Detects whether this is Xenoblade 2, 3 or X based on folder structure and bschema files."""
+    # Check for Xenoblade 3 structure (has game/ and evt/ folders)
+    game_path = os.path.join(base_dir, "game")
+    evt_path = os.path.join(base_dir, "evt")
+
+    if os.path.exists(game_path) and os.path.exists(evt_path):
+        # Found Xenoblade 3 structure
+        return "Xenoblade3"
+
+    # Check for Xenoblade X structure (Modern schema but direct bdat folders)
+    for item in os.listdir(base_dir):
+        item_path = os.path.join(base_dir, item)
+        if os.path.isdir(item_path):
+            # Check for bschema file
+            bschema_path = os.path.join(item_path, f"{item}.bschema")
+            if os.path.exists(bschema_path):
+                try:
+                    with open(bschema_path, 'r') as f:
+                        bschema = json.load(f)
+                        if "version" in bschema and isinstance(bschema["version"], dict) and "Legacy" in bschema["version"]:
+                            return "Xenoblade2"
+                        elif "version" in bschema and bschema["version"] == "Modern":
+                            # Check if this is X or 3 by looking for game/evt folders
+                            if not os.path.exists(game_path) and not os.path.exists(evt_path):
+                                return "XenobladeX"
+                            else:
+                                return "Xenoblade3"
+                except Exception:
+                    continue
+    return "Xenoblade2"  # Default to XB2 if unsure
@@ -0,0 +1,133 @@
+"""Pixel-width line validation using glyph advance tables of the game fonts.
+
+A glyph table is a JSON file:
+
+    {
+      "font": "name of the game font",
+      "default_advance": 24,                 # width of glyphs not listed below
+      "ranges": [[32, 126, 16], ...],        # [first code point, last code point, advance]
+      "advances": {"W": 28, "i": 8, ...},    # per-character overrides
+      "budgets": {"bf": 1100, "fev": 860}    # pixel budget per line, by file name prefix
+    }
+
+Tables are looked up as <GameVersion>.json (e.g. Xenoblade3.json) in the given
+directories and cached per path and modification time.
+"""
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from .instrument import span
+from .jsonio import read_json, row_text
+from .schema import text_field
+from .text import escape_text, strip_tags
+
+BMP_SIZE = 0x10000
+
+
+class GlyphTable:
+    """Glyph advances of one font with the line budgets that apply to it."""
+
+    def __init__(self, data):
+        self.font = data.get("font", "")
+        self.default_advance = int(data.get("default_advance", 0))
+        # Flat lookup table for the Basic Multilingual Plane, indexed by code point
+        self.advances = array('H', [self.default_advance]) * BMP_SIZE
+        self.extra_advances = {}  # Code points outside the BMP
+
+        for first, last, advance in data.get("ranges", []):
+            for code_point in range(first, last + 1):
+                self._set(code_point, advance)
+        for char, advance in data.get("advances", {}).items():
+            self._set(ord(char), advance)
+
+        # Longest prefixes first so that "campfev" wins over "c"
+        self.budgets = sorted(data.get("budgets", {}).items(), key=lambda item: len(item[0]), reverse=True)
+
+    def _set(self, code_point, advance):
+        if code_point < BMP_SIZE:
+            self.advances[code_point] = advance
+        else:
+            self.extra_advances[code_point] = advance
+
+    def line_width(self, line):
+        """Returns the rendered width of a line in pixels."""
+        try:
+            # map() over the lookup table runs the whole line in C
+            return sum(map(self.advances.__getitem__, map(ord, line)))
+        except IndexError:
+            return sum(self.advances[c] if c < BMP_SIZE else self.extra_advances.get(c, self.default_advance)
+                       for c in map(ord, line))
+
+    def budget_for(self, filename):
+        """Returns the pixel budget per line for a file, or None if there is none."""
+        for prefix, budget in self.budgets:
+            if filename.startswith(prefix):
+                return budget
+        return None
+
+    def line_widths(self, text):
+        """Returns the width of every \\n separated line of escaped text, ignoring control tags."""
+        return [self.line_width(strip_tags(line)) for line in text.split('\\n')]
+
+    def check_line_width(self, filename, text, budget=None):
+        """Checks if any line of the escaped text is wider than the file's pixel budget."""
+        if not text:
+            return False
+        budget = budget if budget is not None else self.budget_for(filename)
+        if budget is None:
+            return False
+        return any(width > budget for width in self.line_widths(text))
+
+
+@lru_cache(maxsize=8)
+def _load_glyph_table(path, mtime):
+    with span("glyphs.load", file=path):
+        return GlyphTable(read_json(path))
+
+
+def load_glyph_table(path):
+    """Loads a glyph table, reusing the cached one while the file is unchanged."""
+    return _load_glyph_table(path, os.path.getmtime(path))
+
+
+def find_glyph_table(game_version, search_dirs):
+    """Returns the path of the glyph table for a game, or None."""
+    for directory in search_dirs:
+        if directory:
+            path = os.path.join(directory, f"{game_version}.json")
+            if os.path.isfile(path):
+                return path
+    return None
+
+
+def check_file_widths(json_path, table_path):
+    """Returns the $id of every row of a file that is wider than its pixel budget."""
+    table = load_glyph_table(table_path)
+    filename = os.path.basename(json_path)
+    budget = table.budget_for(filename)
+    if budget is None:
+        return []
+    data = read_json(json_path)
+    field = text_field(data)
+    return [row.get('$id', '') for row in data.get('rows', [])
+            if table.check_line_width(filename, escape_text(row_text(row, field)), budget)]
+
+
+def check_project_widths(json_paths, table_path, progress=None, cancel=None):
+    """Checks many files on a process pool. Returns {path: [over-budget row ids]} for files with findings."""
+    json_paths = list(json_paths)
+    results = {}
+    with span("glyphs.check_project", files=len(json_paths)):
+        with ProcessPoolExecutor() as executor:
+            rows = executor.map(check_file_widths, json_paths, [table_path] * len(json_paths), chunksize=16)
+            for done, (path, over_budget) in enumerate(zip(json_paths, rows), 1):
+                if over_budget:
+                    results[path] = over_budget
+                if progress:
+                    progress(done, len(json_paths))
+                if cancel is not None and cancel.is_set():
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    break
+    return results
@@ -0,0 +1,132 @@
+"""Named timing spans, counters and Chrome trace export.
+
+Enable with XB_PROFILE=1 (or set_enabled(True)). XB_TRACE=<file> writes a
+Chrome trace (chrome://tracing, Perfetto) of all recorded spans on exit.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+ENABLED = os.environ.get("XB_PROFILE", "") not in ("", "0")
+TRACE_PATH = os.environ.get("XB_TRACE") or None
+TRACE_EVENTS = deque(maxlen=200000)  # Chrome trace events
+RECENT_TIMINGS = deque(maxlen=8)  # (name, seconds, {child: [seconds, calls]}) of top-level spans
+COUNTERS = {}
+_TRACE_START = time.perf_counter()
+_span_state = threading.local()
+_thread_stacks = {}  # thread id -> open span stack of that thread, for the stall watchdog
+_listeners = []
+
+
+def set_enabled(enabled):
+    """Switches the instrumentation on or off."""
+    global ENABLED
+    ENABLED = bool(enabled)
+
+
+def add_listener(callback):
+    """Registers callback(name, seconds, children) for every finished top-level span.
+
+    The callback runs on the thread that finished the span.
+    """
+    _listeners.append(callback)
+
+
+def current_spans():
+    """Returns the names of the spans currently open on the calling thread."""
+    return [name for name, _ in getattr(_span_state, "stack", None) or []]
+
+
+def thread_spans(thread_id):
+    """Returns the names of the spans currently open on another thread."""
+    return [name for name, _ in list(_thread_stacks.get(thread_id, ()))]
+
+
+@contextmanager
+def span(name, **args):
+    """Records a named timing span. Does nothing when profiling is disabled."""
+    if not ENABLED:
+        yield
+        return
+
+    stack = getattr(_span_state, "stack", None)
+    if stack is None:
+        stack = _span_state.stack = []
+        _thread_stacks[threading.get_ident()] = stack
+    children = {}
+    stack.append((name, children))
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        stack.pop()
+        TRACE_EVENTS.append({
+            "name": name, "ph": "X", "pid": os.getpid(), "tid": threading.get_ident(),
+            "ts": (start - _TRACE_START) * 1e6, "dur": duration * 1e6, "args": args,
+        })
+        if stack:
+            # Aggregate into the parent so the status bar can show a breakdown
+            totals = stack[-1][1].setdefault(name, [0.0, 0])
+            totals[0] += duration
+            totals[1] += 1
+        else:
+            RECENT_TIMINGS.append((name, duration, children))
+            TRACE_EVENTS.append({
+                "name": "counters", "ph": "C", "pid": os.getpid(), "tid": threading.get_ident(),
+                "ts": (start + duration - _TRACE_START) * 1e6, "args": dict(COUNTERS),
+            })
+            for callback in _listeners:
+                callback(name, duration, children)
+
+
+def timed(name):
+    """Decorator that wraps a function in a timing span."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name, n=1):
+    """Increments a named counter."""
+    if ENABLED:
+        COUNTERS[name] = COUNTERS.get(name, 0) + n
+
+
+def format_recent_timings():
+    """Formats the most recent top-level spans for a status bar."""
+    parts = []
+    for name, duration, children in list(RECENT_TIMINGS)[-3:]:
+        text = f"{name} {duration * 1000:.0f} ms"
+        if children:
+            slowest = sorted(children.items(), key=lambda item: item[1][0], reverse=True)[:3]
+            text += " (" + ", ".join(f"{child} {total * 1000:.0f} ms x{calls}" for child, (total, calls) in slowest) + ")"
+        parts.append(text)
+    return "  |  ".join(reversed(parts))
+
+
+def write_trace(path):
+    """Writes the recorded spans as a Chrome trace file."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"traceEvents": list(TRACE_EVENTS), "displayTimeUnit": "ms"}, f)
+
+
+def _write_trace_on_exit():
+    if TRACE_PATH and TRACE_EVENTS:
+        try:
+            write_trace(TRACE_PATH)
+            print(f"Trace written to {TRACE_PATH}")
+        except Exception as e:
+            print(f"Error writing trace: {e}")
+
+
+atexit.register(_write_trace_on_exit)
@@ -0,0 +1,67 @@
+"""Reading and writing BDAT JSON tables."""
+import json
+import os
+
+from .instrument import span
+from .schema import text_field
+
+
+def read_json(filepath):
+    """Loads JSON data from a file. Raises on I/O or parse errors."""
+    with span("disk.read", file=filepath):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            content = f.read()
+    with span("json.parse"):
+        return json.loads(content)
+
+
+def dump_json(data):
+    """Serializes JSON data in the format produced by the BDAT extract tool."""
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
+def write_text(filepath, text):
+    """Writes text to a temporary file that then replaces the target.
+
+    An interrupted save never leaves a half-written table behind.
+    """
+    temp_path = filepath + ".tmp"
+    with span("disk.write", file=filepath):
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(temp_path, filepath)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+def write_json(filepath, data):
+    """Writes JSON data in the format produced by the BDAT extract tool, atomically."""
+    write_text(filepath, dump_json(data))
+
+
+def row_text(row, field):
+    """Returns the translatable text of a row; field is the table's text_field()."""
+    return row.get(field, '') if field else ''
+
+
+def set_row_text(row, text, field):
+    """Stores text in the translatable field of a row; field is the table's text_field()."""
+    if field:
+        row[field] = text
+
+
+def apply_edited_text(data):
+    """Returns a copy of the document with every row's 'edited_text' moved into its text field."""
+    # Create a copy of the data to avoid modifying the original
+    with span("save.copy"):
+        data_copy = json.loads(json.dumps(data))
+
+    field = text_field(data_copy)
+    for row in data_copy['rows']:
+        if 'edited_text' in row:
+            edited_text = row.pop('edited_text')  # Remove the 'edited_text' field after saving
+            set_row_text(row, edited_text, field)
+    return data_copy
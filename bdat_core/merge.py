@@ -0,0 +1,146 @@
+"""Conflict-aware saving of tables that may have been changed by another program.
+
+A document loaded with load_document remembers the modification time, size and
+content hash of its file and the text of every row. save_document then
+
+- skips the write when the new content equals what is on disk,
+- writes directly when the file was not changed since it was loaded,
+- otherwise merges row by row: a row changed on only one side takes that
+  side's text, and rows changed differently on both sides are conflicts that
+  the caller resolves.
+"""
+import hashlib
+import json
+import os
+
+from .instrument import span
+from .jsonio import dump_json, row_text, set_row_text, write_text
+from .schema import text_field
+
+
+def content_hash(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class DocumentState:
+    """What a table looked like on disk when it was loaded or last saved."""
+
+    def __init__(self, path, mtime_ns, size, text_hash, base_texts, field):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.hash = text_hash
+        self.base_texts = base_texts  # row id -> text
+        self.field = field  # Text column of the table, see schema.text_field
+
+    @classmethod
+    def from_text(cls, path, text, data):
+        stat = os.stat(path)
+        field = text_field(data)
+        return cls(path, stat.st_mtime_ns, stat.st_size, content_hash(text),
+                   {row.get('$id'): row_text(row, field) for row in data.get('rows', [])}, field)
+
+    def changed_on_disk(self):
+        """Checks if the file was modified since it was loaded or saved."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return True
+        if stat.st_mtime_ns == self.mtime_ns and stat.st_size == self.size:
+            return False
+        # Touched files (e.g. by a sync tool) only count when their content changed
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return content_hash(f.read()) != self.hash
+
+
+def load_document(path):
+    """Loads a table. Returns (data, DocumentState). Raises on I/O or parse errors."""
+    with span("disk.read", file=path):
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+    with span("json.parse"):
+        data = json.loads(text)
+    return data, DocumentState.from_text(path, text, data)
+
+
+def merge_rows(base_texts, disk_data, mine_data):
+    """Three-way merges the row texts of mine_data into disk_data.
+
+    Returns (merged data, conflicts) where conflicts is [(row id, base, disk, mine), ...]
+    and the merged data keeps the disk text for conflicting rows.
+    """
+    mine_field = text_field(mine_data)
+    mine_texts = {row.get('$id'): row_text(row, mine_field) for row in mine_data.get('rows', [])}
+    merged = json.loads(json.dumps(disk_data))
+    field = text_field(merged)
+    conflicts = []
+    for row in merged.get('rows', []):
+        row_id = row.get('$id')
+        if row_id not in mine_texts:
+            continue  # Added on disk
+        base, disk, mine = base_texts.get(row_id), row_text(row, field), mine_texts[row_id]
+        if mine == base or mine == disk:
+            continue  # Only changed on disk, or the same change on both sides
+        if disk == base:
+            set_row_text(row, mine, field)
+        else:
+            conflicts.append((row_id, base, disk, mine))
+    return merged, conflicts
+
+
+def save_document(state, data, resolve_conflicts=None):
+    """Saves data (with edits already applied) over the document described by state.
+
+    resolve_conflicts(conflicts) is called when rows were changed differently on
+    disk and in data. It returns {row id: text} for the conflicting rows, or None
+    to cancel the save.
+
+    Returns (status, saved data, new state) with status one of "unchanged",
+    "written", "merged" or "cancelled".
+    """
+    with span("save.document", file=state.path):
+        if not state.changed_on_disk():
+            text = dump_json(data)
+            if content_hash(text) == state.hash:
+                return "unchanged", data, state
+            write_text(state.path, text)
+            return "written", data, DocumentState.from_text(state.path, text, data)
+
+        disk_data, disk_state = load_document(state.path)
+        merged, conflicts = merge_rows(state.base_texts, disk_data, data)
+        if conflicts:
+            choices = resolve_conflicts(conflicts) if resolve_conflicts else None
+            if choices is None:
+                return "cancelled", data, state
+            for row in merged.get('rows', []):
+                if row.get('$id') in choices:
+                    set_row_text(row, choices[row.get('$id')], disk_state.field)
+
+        text = dump_json(merged)
+        if content_hash(text) == disk_state.hash:
+            return "merged", merged, disk_state  # Disk already has everything
+        write_text(state.path, text)
+        return "merged", merged, DocumentState.from_text(state.path, text, merged)
+
+
+def save_row_texts(state, data, texts_by_id):
+    """Stores {row id: text} in data and saves it over the document described by state.
+
+    Rows that were changed on disk since state was loaded keep the disk text.
+    Returns the ids (as strings) of the rows saved.
+    """
+    saved = set()
+    for row in data.get('rows', []):
+        row_id = str(row.get('$id', ''))
+        if row_id in texts_by_id:
+            set_row_text(row, texts_by_id[row_id], state.field)
+            saved.add(row_id)
+    if not saved:
+        return saved
+
+    def keep_disk(conflicts):
+        saved.difference_update(str(row_id) for row_id, _, _, _ in conflicts)
+        return {row_id: disk for row_id, _, disk, _ in conflicts}
+
+    save_document(state, data, keep_disk)
+    return saved
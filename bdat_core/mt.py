@@ -0,0 +1,249 @@
+"""Pre-fills untranslated rows with drafts from a local machine-translation server.
+
+The server is any HTTP endpoint that accepts a POST with the JSON body
+
+    {"texts": ["...", ...], "source": "", "target": ""}
+
+and answers with {"translations": ["...", ...]} in the same order (see
+mt_standin for a minimal implementation). Texts are sent in batches by asyncio
+tasks, with a limit on the requests in flight and retries with backoff. Game
+tags are replaced by numbered placeholders before sending; a draft that loses a
+placeholder, or whose tags don't match the source afterwards, is rejected. Results are cached in the project's cache folder keyed
+on a hash of the protected source text, so texts are only translated once.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+import urllib.error
+import urllib.request
+
+from .carry import load_review_list, review_key, save_review_list
+from .instrument import span
+from .jsonio import read_json, row_text
+from .merge import load_document, save_row_texts
+from .paths import cache_dir, resolve_original_path
+from .schema import text_field
+from .tags import compare_tags
+from .text import TAG_RE
+
+MT_CACHE_NAME = "mt_cache.sqlite3"
+PLACEHOLDER_RE = re.compile(r'⟦(\d+)⟧')  # ⟦0⟧, unlikely to be changed by a translation model
+
+
+def protect_tags(text):
+    """Replaces tags by ⟦n⟧ placeholders. Returns (protected text, tags)."""
+    tags = []
+
+    def replace(match):
+        tags.append(match.group(0))
+        return f"⟦{len(tags) - 1}⟧"
+
+    return TAG_RE.sub(replace, text), tags
+
+
+def restore_tags(text, tags, source):
+    """Puts the tags of source back. Returns None when a placeholder is missing, duplicated or
+    unknown, or when the draft has other tags than source (e.g. a bracketed word added by the model).
+    """
+    found = [int(number) for number in PLACEHOLDER_RE.findall(text)]
+    if sorted(found) != list(range(len(tags))):
+        return None
+    restored = PLACEHOLDER_RE.sub(lambda match: tags[int(match.group(1))], text)
+    return None if compare_tags(source, restored) else restored
+
+
+def text_hash(text, target_lang=""):
+    return hashlib.sha1(f"{target_lang}\0{text}".encode('utf-8')).hexdigest()
+
+
+class MTCache:
+    """Translations of earlier runs, keyed on the hash of the protected source text."""
+
+    def __init__(self, db_path):
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS mt_cache ("
+                                "hash TEXT PRIMARY KEY, source TEXT NOT NULL, translation TEXT NOT NULL, "
+                                "created REAL NOT NULL)")
+
+    @classmethod
+    def open(cls, base_dir):
+        return cls(os.path.join(cache_dir(base_dir), MT_CACHE_NAME))
+
+    def get_many(self, hashes):
+        """Returns {hash: translation} for the cached hashes."""
+        found = {}
+        hashes = list(hashes)
+        for start in range(0, len(hashes), 500):  # Stay below the SQLite variable limit
+            chunk = hashes[start:start + 500]
+            query = f"SELECT hash, translation FROM mt_cache WHERE hash IN ({','.join('?' * len(chunk))})"
+            found.update(self.connection.execute(query, chunk))
+        return found
+
+    def put_many(self, entries):
+        """Stores [(hash, source, translation), ...] in one transaction."""
+        now = time.time()
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO mt_cache VALUES (?, ?, ?, ?)",
+                                        [(h, source, translation, now) for h, source, translation in entries])
+
+    def close(self):
+        self.connection.close()
+
+
+def _post_json(url, payload, timeout):
+    request = urllib.request.Request(url, data=json.dumps(payload).encode('utf-8'),
+                                     headers={"Content-Type": "application/json"}, method="POST")
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read().decode('utf-8'))
+
+
+async def _translate_batch(url, texts, semaphore, source_lang, target_lang, retries, timeout, cancel):
+    payload = {"texts": texts, "source": source_lang, "target": target_lang}
+    async with semaphore:
+        for attempt in range(retries + 1):
+            if cancel is not None and cancel.is_set():
+                return None
+            try:
+                # urllib blocks, so each request runs on the default thread pool
+                result = await asyncio.to_thread(_post_json, url, payload, timeout)
+                translations = result.get("translations")
+                if not isinstance(translations, list) or len(translations) != len(texts):
+                    raise ValueError("The server returned a different number of translations")
+                return translations
+            except (OSError, ValueError, urllib.error.URLError):
+                if attempt == retries:
+                    raise
+                await asyncio.sleep(0.5 * 2 ** attempt)
+
+
+async def translate_texts(url, texts, batch_size=16, concurrency=4, source_lang="", target_lang="",
+                          retries=3, timeout=30, progress=None, cancel=None):
+    """Translates texts with batched concurrent requests. Returns (translations in order, errors).
+
+    The translations of a batch that still fails after its retries are None and
+    its exception is added to errors; the other batches are kept. Translations of
+    a cancelled run are None.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    batches = [texts[start:start + batch_size] for start in range(0, len(texts), batch_size)]
+    done = 0
+
+    async def run(batch):
+        nonlocal done
+        result = await _translate_batch(url, batch, semaphore, source_lang, target_lang, retries, timeout, cancel)
+        done += 1
+        if progress:
+            progress(done, len(batches))
+        return result if result is not None else [None] * len(batch)
+
+    results = await asyncio.gather(*(run(batch) for batch in batches), return_exceptions=True)
+    translations = []
+    errors = []
+    for batch, result in zip(batches, results):
+        if isinstance(result, BaseException):
+            errors.append(result)
+            result = [None] * len(batch)
+        translations.extend(result)
+    return translations, errors
+
+
+def collect_untranslated(json_paths, base_dir, second_base_dir, game_version):
+    """Finds the untranslated rows that have an original.
+
+    Returns {path: ({row id: original text}, data, DocumentState)}, with the
+    table as it was read so that drafts can be merged with later edits.
+    """
+    found = {}
+    for json_path in json_paths:
+        original_path = resolve_original_path(json_path, base_dir, second_base_dir, game_version)
+        if not original_path:
+            continue
+        data, state = load_document(json_path)
+        original_data = read_json(original_path)
+        original_field = text_field(original_data)
+        original_texts = {row.get('$id'): row_text(row, original_field) for row in original_data.get('rows', [])}
+        field = text_field(data)
+        texts = {}
+        for row in data.get('rows', []):
+            row_id = row.get('$id')
+            original = original_texts.get(row_id)
+            # Same rule as the navigation index: empty or still equal to the original
+            if original and (not row_text(row, field) or row_text(row, field) == original):
+                texts[str(row_id)] = original
+        if texts:
+            found[json_path] = (texts, data, state)
+    return found
+
+
+def prefill_files(json_paths, base_dir, second_base_dir, game_version, url, batch_size=16, concurrency=4,
+                  source_lang="", target_lang="", progress=None, cancel=None, write_rows=None):
+    """Fills the untranslated rows of json_paths with machine translations and writes the files.
+
+    write_rows(json path, {row id: text}) writes the drafts of one file and
+    returns the ids of the rows written. By default the files are saved with
+    save_row_texts, so rows edited since they were read keep their edit.
+    Filled rows are added to the review list. Returns a dict with the numbers of
+    rows filled, distinct texts taken from the cache, rows rejected because their
+    tags differ from the source, files written and distinct texts whose request
+    failed, with the first error of those requests ("error", None if none failed).
+    """
+    stats = {"rows": 0, "cached": 0, "tag_errors": 0, "files": 0, "failed": 0, "error": None}
+    with span("mt.prefill", files=len(json_paths)):
+        untranslated = collect_untranslated(json_paths, base_dir, second_base_dir, game_version)
+
+        # Translate every distinct source text once
+        sources = {}  # hash -> (protected text, tags)
+        for texts, _, _ in untranslated.values():
+            for text in texts.values():
+                protected, tags = protect_tags(text)
+                sources.setdefault(text_hash(protected, target_lang), (protected, tags))
+
+        cache = MTCache.open(base_dir)
+        try:
+            translations = cache.get_many(sources)
+            stats["cached"] = len(translations)
+            missing = [h for h in sources if h not in translations]
+            if missing:
+                results, errors = asyncio.run(translate_texts(url, [sources[h][0] for h in missing], batch_size,
+                                                              concurrency, source_lang, target_lang,
+                                                              progress=progress, cancel=cancel))
+                if errors:
+                    # The successful batches are still cached and written
+                    stats["failed"] = sum(1 for result in results if result is None)
+                    stats["error"] = str(errors[0])
+                new_entries = [(h, sources[h][0], result) for h, result in zip(missing, results) if result is not None]
+                cache.put_many(new_entries)
+                translations.update((h, result) for h, _, result in new_entries)
+        finally:
+            cache.close()
+
+        if cancel is not None and cancel.is_set():
+            return stats
+
+        review_list = load_review_list(base_dir)
+        for json_path, (texts, data, state) in untranslated.items():
+            filled = {}
+            for row_id, text in texts.items():
+                protected, tags = protect_tags(text)
+                translation = translations.get(text_hash(protected, target_lang))
+                if translation is None:
+                    continue
+                restored = restore_tags(translation, tags, text)
+                if restored is None:
+                    stats["tag_errors"] += 1
+                else:
+                    filled[row_id] = restored
+            if not filled:
+                continue
+            written = write_rows(json_path, filled) if write_rows else save_row_texts(state, data, filled)
+            if written:
+                stats["rows"] += len(written)
+                stats["files"] += 1
+                key = review_key(json_path, base_dir)
+                review_list[key] = sorted(set(map(str, review_list.get(key, []))) | set(map(str, written)), key=str)
+        save_review_list(base_dir, review_list)
+    return stats
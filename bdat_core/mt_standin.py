@@ -0,0 +1,64 @@
+"""Stand-in machine-translation server for trying out and testing the pre-fill pipeline.
+
+    python -m bdat_core.mt_standin --port 8765 [--delay 0.2] [--fail-rate 0.1]
+
+It implements the request format expected by bdat_core.mt and "translates" by
+appending " (MT)" to every text while leaving tag placeholders untouched. The
+marker has no square brackets, so it isn't read as a game tag.
+"""
+import argparse
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MT_MARKER = " (MT)"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    delay = 0.0
+    fail_rate = 0.0
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.delay)
+        if random.random() < self.fail_rate:
+            self.send_error(503, "Simulated failure")
+            return
+        try:
+            texts = json.loads(body)["texts"]
+        except (ValueError, KeyError):
+            self.send_error(400, "Expected {\"texts\": [...]}")
+            return
+
+        response = json.dumps({"translations": [f"{text}{MT_MARKER}" for text in texts]}).encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, format, *args):
+        pass  # Keep the console quiet
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to wait before answering")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    args = parser.parse_args()
+
+    StandInHandler.delay = args.delay
+    StandInHandler.fail_rate = args.fail_rate
+    server = ThreadingHTTPServer((args.host, args.port), StandInHandler)
+    print(f"Stand-in MT server on http://{args.host}:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
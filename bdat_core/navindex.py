@@ -0,0 +1,131 @@
+"""Project-wide index of rows that still need work, for jumping to the next one.
+
+Two kinds of rows are indexed: untranslated rows (empty, or equal to the
+original row with the same $id) and rows over the line limit. Positions are
+kept sorted as (file number, row index), so finding the next row after the
+current one is a binary search and updating one file after a save only
+replaces that file's entries.
+"""
+import os
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+
+from .instrument import span
+from .jsonio import read_json, row_text
+from .paths import iter_project_files, resolve_original_path
+from .schema import text_field
+from .text import escape_text
+from .validation import check_line_length
+
+NAV_KINDS = ("untranslated", "over_limit")
+
+
+def scan_rows(filename, data, original_texts):
+    """Returns {kind: [(row index, row id), ...]} for the rows of one table.
+
+    original_texts maps the row ids of the original table to their text. The
+    result also holds "compared", the number of rows that have an original row:
+    rows without one only count as untranslated when they are empty.
+    """
+    found = {kind: [] for kind in NAV_KINDS}
+    found["compared"] = 0
+    field = text_field(data)
+    for row_index, row in enumerate(data.get('rows', [])):
+        row_id = row.get('$id', '')
+        text = row_text(row, field)
+        if row_id in original_texts:
+            found["compared"] += 1
+        if not text or (row_id in original_texts and text == original_texts[row_id]):
+            found["untranslated"].append((row_index, row_id))
+        if check_line_length(filename, escape_text(text)):
+            found["over_limit"].append((row_index, row_id))
+    return found
+
+
+def scan_file(json_path, original_path):
+    """Reads one translated file and its original and returns (row count, scan_rows result).
+
+    Unreadable files are indexed as empty.
+    """
+    try:
+        data = read_json(json_path)
+        original_data = read_json(original_path) if original_path else {}
+    except (OSError, ValueError):
+        return 0, {kind: [] for kind in NAV_KINDS}
+    original_field = text_field(original_data)
+    original_texts = {row.get('$id'): row_text(row, original_field) for row in original_data.get('rows', [])}
+    return len(data.get('rows', [])), scan_rows(os.path.basename(json_path), data, original_texts)
+
+
+class NavIndex:
+    """Sorted positions of the rows of every kind across the files of a project."""
+
+    def __init__(self, json_paths):
+        self.files = list(json_paths)
+        self.file_numbers = {os.path.normcase(os.path.normpath(path)): n for n, path in enumerate(self.files)}
+        self.positions = {kind: [] for kind in NAV_KINDS}  # kind -> sorted [(file number, row index, row id)]
+        self.file_stats = {}  # path -> {"rows": int, kind: int, ...}
+
+    def file_number(self, json_path):
+        return self.file_numbers.get(os.path.normcase(os.path.normpath(json_path)))
+
+    def set_file(self, json_path, row_count, found):
+        """Replaces the entries of one file."""
+        number = self.file_number(json_path)
+        if number is None:
+            return
+        for kind in NAV_KINDS:
+            positions = self.positions[kind]
+            start = bisect_left(positions, (number,))
+            stop = bisect_left(positions, (number + 1,))
+            positions[start:stop] = [(number, row_index, row_id) for row_index, row_id in found[kind]]
+        stats = {"rows": row_count, "compared": found.get("compared", 0)}
+        stats.update((kind, len(found[kind])) for kind in NAV_KINDS)
+        self.file_stats[self.files[number]] = stats
+
+    def stats(self, json_path):
+        """Returns the stats of one file, or None when it is not indexed."""
+        number = self.file_number(json_path)
+        return self.file_stats.get(self.files[number]) if number is not None else None
+
+    def find(self, kind, json_path=None, row_index=-1, backwards=False):
+        """Returns (path, row index, row id) of the next row of a kind after a position, wrapping around.
+
+        Without json_path the search starts before the first file. Returns None when
+        there are no rows of that kind.
+        """
+        positions = self.positions[kind]
+        if not positions:
+            return None
+        number = self.file_number(json_path) if json_path else None
+        number = number if number is not None else -1
+        # Row ids are never compared: (file number, row index) is unique per entry
+        if backwards:
+            i = bisect_left(positions, (number, row_index)) - 1  # -1 wraps to the last entry
+        else:
+            i = bisect_left(positions, (number, row_index + 1))
+            if i == len(positions):
+                i = 0
+        number, row_index, row_id = positions[i]
+        return self.files[number], row_index, row_id
+
+    def total(self, kind):
+        return len(self.positions[kind])
+
+
+def build_nav_index(base_dir, second_base_dir, game_version, progress=None, cancel=None):
+    """Scans every file of the project on a process pool. Returns the NavIndex, or None when cancelled."""
+    json_paths = list(iter_project_files(base_dir, game_version))
+    original_paths = [resolve_original_path(path, base_dir, second_base_dir, game_version) for path in json_paths]
+    index = NavIndex(json_paths)
+    with span("navindex.build", files=len(json_paths)):
+        with ProcessPoolExecutor() as executor:
+            results = executor.map(scan_file, json_paths, original_paths, chunksize=16)
+            for done, (path, (row_count, found)) in enumerate(zip(json_paths, results), 1):
+                index.set_file(path, row_count, found)
+                if progress:
+                    progress(done, len(json_paths))
+                if cancel is not None and cancel.is_set():
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    return None
+    return index
@@ -0,0 +1,82 @@
+"""Project layout: BDAT folders, JSON files and original file resolution."""
+import os
+
+CACHE_DIR_NAME = ".bdat_tool"  # Caches kept inside a project; skipped when listing BDAT folders
+
+
+def iter_bdat_folders(base_dir, game_version):
+    """Yields (display_name, folder_path, folder_name) for every BDAT folder of the project.
+
+    Xenoblade 3 projects keep their BDAT folders under game/ and evt/, the other
+    games have them directly in the base directory.
+    """
+    if game_version == "Xenoblade3":
+        for top_folder in ["game", "evt"]:
+            top_folder_path = os.path.join(base_dir, top_folder)
+            if os.path.exists(top_folder_path):
+                for bdat_folder in os.listdir(top_folder_path):
+                    bdat_folder_path = os.path.join(top_folder_path, bdat_folder)
+                    if os.path.isdir(bdat_folder_path) and not bdat_folder.startswith('.'):
+                        yield f"{top_folder}/{bdat_folder}", bdat_folder_path, bdat_folder
+    else:
+        for bdat_folder in os.listdir(base_dir):
+            bdat_folder_path = os.path.join(base_dir, bdat_folder)
+            if os.path.isdir(bdat_folder_path) and not bdat_folder.startswith('.'):
+                yield bdat_folder, bdat_folder_path, bdat_folder
+
+
+def list_json_files(bdat_folder_path):
+    """Returns (filename, path) for every JSON file inside a BDAT folder."""
+    inner_folder_path = os.path.join(bdat_folder_path, os.path.basename(bdat_folder_path))
+    if not os.path.isdir(inner_folder_path):
+        return []
+    return [(f, os.path.join(inner_folder_path, f)) for f in os.listdir(inner_folder_path) if f.endswith(".json")]
+
+
+def iter_project_files(base_dir, game_version):
+    """Yields the path of every JSON file of the project."""
+    for _, bdat_folder_path, _ in iter_bdat_folders(base_dir, game_version):
+        for _, json_path in list_json_files(bdat_folder_path):
+            yield json_path
+
+
+def resolve_original_path(json_path, base_dir, second_base_dir, game_version):
+    """Finds the file in the second directory that corresponds to json_path, or None.
+
+    For Xenoblade 3 and X the file may live in the other top-level folder (game/evt).
+    """
+    if not second_base_dir:
+        return None
+
+    # Get relative path from first base dir and build the path in the second base dir
+    rel_path = os.path.relpath(json_path, base_dir)
+    original_path = os.path.join(second_base_dir, rel_path)
+    if os.path.exists(original_path):
+        return original_path
+
+    if game_version in ["Xenoblade3", "XenobladeX"]:
+        parts = rel_path.split(os.sep)
+        if len(parts) > 1 and parts[0] in ["game", "evt"]:
+            # Try the opposite folder
+            opposite_folder = "evt" if parts[0] == "game" else "game"
+            opposite_path = os.path.join(second_base_dir, opposite_folder, *parts[1:])
+            if os.path.exists(opposite_path):
+                return opposite_path
+    return None
+
+
+def cache_dir(base_dir):
+    """Returns the cache directory of a project, creating it if needed."""
+    path = os.path.join(base_dir, CACHE_DIR_NAME)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def file_status_key(json_path, base_dir):
+    """Returns the key a file's status is stored under in translation_config.ini."""
+    # Get the BDAT folder name (parent folder)
+    bdat_folder = os.path.basename(os.path.dirname(os.path.dirname(json_path)))
+    # Get relative path within BDAT folder
+    rel_path = os.path.relpath(json_path, os.path.join(base_dir, bdat_folder))
+    # Convert to forward slashes for consistency
+    return rel_path.replace('\\', '/')
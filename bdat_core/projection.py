@@ -0,0 +1,152 @@
+"""Compact, cached projections of the original-language tables.
+
+The table view only needs the $id, label and text of every original row, so
+instead of the whole document (every column of every row, as dicts) the
+original side is kept as parallel arrays with interned strings. Projections are
+cached per path and evicted least recently used once the cache exceeds its
+byte budget.
+"""
+import os
+import sys
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .instrument import count, span
+from .jsonio import read_json, row_text
+from .schema import text_field
+
+
+class OriginalProjection:
+    """$id, label and text of every row of an original table, by row index."""
+
+    __slots__ = ("path", "mtime_ns", "ids", "labels", "texts", "nbytes", "_index")
+
+    def __init__(self, path, rows, field, mtime_ns=0):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        ids = [row.get('$id') for row in rows]
+        # Numeric ids, the usual case, fit in an array of machine integers
+        self.ids = array('q', ids) if all(type(row_id) is int for row_id in ids) else ids
+        labels = [row.get('label') for row in rows]
+        self.labels = [sys.intern(label) if isinstance(label, str) else label for label in labels] \
+            if any(label is not None for label in labels) else None
+        # The same lines repeat across tables (names, menu texts), interning shares them
+        self.texts = [sys.intern(text) if isinstance(text, str) else text for text in (row_text(row, field) for row in rows)]
+        self._index = None
+        self.nbytes = self._measure()
+
+    @classmethod
+    def load(cls, path):
+        with span("projection.load", file=path):
+            mtime_ns = os.stat(path).st_mtime_ns
+            data = read_json(path)
+            return cls(path, data.get('rows', []), text_field(data), mtime_ns)
+
+    def _measure(self):
+        """Estimates the memory held by the projection in bytes."""
+        size = sys.getsizeof(self.ids) + sys.getsizeof(self.texts)
+        size += sum(sys.getsizeof(text) for text in self.texts)
+        if self.labels is not None:
+            size += sys.getsizeof(self.labels) + sum(sys.getsizeof(label) for label in self.labels)
+        if isinstance(self.ids, list):
+            size += sum(sys.getsizeof(row_id) for row_id in self.ids)
+        return size
+
+    def __len__(self):
+        return len(self.texts)
+
+    def text_at(self, index):
+        """Returns the text of the row at a position, or "" past the end."""
+        return self.texts[index] if index < len(self.texts) else ""
+
+    def texts_by_id(self):
+        """Returns {row id: text}, built on first use."""
+        if self._index is None:
+            self._index = dict(zip(self.ids, self.texts))
+        return self._index
+
+
+class ProjectionCache:
+    """Least recently used cache of OriginalProjection objects within a byte budget."""
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.entries = OrderedDict()  # path -> OriginalProjection, least recently used first
+        self.total_bytes = 0
+
+    def _cached(self, path):
+        """Returns the cached projection of a file if it is still current."""
+        projection = self.entries.get(path)
+        if projection is not None and projection.mtime_ns == os.stat(path).st_mtime_ns:
+            self.entries.move_to_end(path)
+            count("projection.hit")
+            return projection
+        count("projection.miss")
+        return None
+
+    def _add(self, projection):
+        self.discard(projection.path)
+        self.entries[projection.path] = projection
+        self.total_bytes += projection.nbytes
+
+    def get(self, path):
+        """Returns the projection of a file, loading it when missing or modified. Raises on read errors."""
+        projection = self._cached(path)
+        if projection is None:
+            projection = OriginalProjection.load(path)
+            self._add(projection)
+            self._evict()
+        return projection
+
+    def get_many(self, paths, max_workers=4):
+        """Returns {path: projection or exception} for several files, loading the missing ones on a thread pool.
+
+        Only the calling thread touches the cache; the pool just reads and parses files.
+        """
+        results = {}
+        missing = []
+        for path in dict.fromkeys(paths):
+            try:
+                projection = self._cached(path)
+            except OSError as e:
+                results[path] = e
+                continue
+            if projection is None:
+                missing.append(path)
+            else:
+                results[path] = projection
+
+        if missing:
+            with span("projection.load_many", files=len(missing)):
+                with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as executor:
+                    futures = [(path, executor.submit(OriginalProjection.load, path)) for path in missing]
+                for path, future in futures:
+                    try:
+                        results[path] = future.result()
+                    except Exception as e:
+                        results[path] = e
+                        continue
+                    self._add(results[path])
+            self._evict()
+        return results
+
+    def discard(self, path):
+        projection = self.entries.pop(path, None)
+        if projection is not None:
+            self.total_bytes -= projection.nbytes
+
+    def clear(self):
+        self.entries.clear()
+        self.total_bytes = 0
+
+    def _evict(self):
+        # The most recent entry always stays, even when it alone exceeds the budget
+        while self.total_bytes > self.budget_bytes and len(self.entries) > 1:
+            _, projection = self.entries.popitem(last=False)
+            self.total_bytes -= projection.nbytes
+
+    def memory_report(self):
+        """Returns [(path, rows, bytes), ...], largest first."""
+        return sorted(((path, len(p), p.nbytes) for path, p in self.entries.items()),
+                      key=lambda entry: entry[2], reverse=True)
@@ -0,0 +1,88 @@
+"""Folder statuses derived from the completion of their files.
+
+A file is complete (green) when every row was compared with its original and
+it has no untranslated rows and no rows over the line limit, in progress
+(orange) when some of its rows are translated, and has no status otherwise.
+A file without an original gets no derived status: only its empty rows are
+known to be untranslated, so it can't be told apart from an untouched copy.
+A status set by hand on a file overrides the derived one. A folder is green
+when all its files are green and orange when any file is green or orange,
+unless it was marked by hand: that mark is kept apart from its files, which
+keep their own statuses. Every folder keeps counts of its files per status, so changing one file
+updates its folder in constant time.
+"""
+import os
+from collections import Counter
+
+
+def derived_file_status(stats):
+    """Returns 'green', 'orange' or None from the navigation index stats of a file."""
+    untranslated = stats.get("untranslated", 0)
+    rows = stats.get("rows", 0)
+    compared = stats.get("compared", 0)
+    if rows and not compared:
+        return None  # No original to compare with
+    if untranslated == 0 and stats.get("over_limit", 0) == 0 and compared == rows:
+        return "green"
+    if untranslated < rows:
+        return "orange"
+    return None
+
+
+def folder_of(json_path):
+    """Returns the BDAT folder path of a table (<folder>/<folder>/<file>.json)."""
+    return os.path.normcase(os.path.normpath(os.path.dirname(os.path.dirname(json_path))))
+
+
+class StatusRollup:
+    """File statuses and the folder statuses rolled up from them."""
+
+    def __init__(self):
+        self.file_status = {}  # normalized json path -> 'green', 'orange' or None
+        self.counts = {}  # folder path -> Counter of file statuses, None included
+        self.folder_marks = {}  # folder path -> status set by hand on the folder
+
+    @classmethod
+    def from_stats(cls, file_stats, manual_status=None):
+        """Builds the roll-up from {json path: stats}; manual_status(json path) returns a status set by hand."""
+        rollup = cls()
+        for json_path, stats in file_stats.items():
+            rollup.set_file(json_path, stats, manual_status(json_path) if manual_status else None)
+        return rollup
+
+    def set_file(self, json_path, stats, manual=None):
+        """Updates one file. Returns (file status, folder status)."""
+        key = os.path.normcase(os.path.normpath(json_path))
+        status = manual or derived_file_status(stats)
+        counts = self.counts.setdefault(folder_of(json_path), Counter())
+        if key in self.file_status:
+            counts[self.file_status[key]] -= 1
+        self.file_status[key] = status
+        counts[status] += 1
+        return status, self.folder_status(json_path, is_file=True)
+
+    def set_folder_mark(self, folder_path, status):
+        """Sets or clears (None) the status set by hand on a folder."""
+        key = os.path.normcase(os.path.normpath(folder_path))
+        if status:
+            self.folder_marks[key] = status
+        else:
+            self.folder_marks.pop(key, None)
+
+    def get_file(self, json_path):
+        return self.file_status.get(os.path.normcase(os.path.normpath(json_path)))
+
+    def folder_status(self, path, is_file=False):
+        """Returns the status of a BDAT folder, given its path or the path of one of its files."""
+        key = folder_of(path) if is_file else os.path.normcase(os.path.normpath(path))
+        if key in self.folder_marks:
+            return self.folder_marks[key]
+        counts = self.counts.get(key)
+        if not counts:
+            return None
+        total = sum(counts.values())
+        if counts["green"] == total:
+            return "green"
+        if counts["green"] or counts["orange"]:
+            return "orange"
+        return None
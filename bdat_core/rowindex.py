@@ -0,0 +1,52 @@
+"""Lookup of the rows of a table by $id or label.
+
+Keys are lowercased. Exact matches come from a dict and prefix matches from a
+sorted key list searched with bisect, so both are fast on tables with tens of
+thousands of rows. Hashed labels such as <DBAF43F0> are also indexed without
+their angle brackets.
+"""
+from bisect import bisect_left
+
+
+def row_keys(row):
+    """Returns the lookup keys of a row."""
+    keys = []
+    for value in (row.get('$id'), row.get('label')):
+        if value is None or value == '':
+            continue
+        key = str(value).lower()
+        keys.append(key)
+        if key.startswith('<') and key.endswith('>'):
+            keys.append(key[1:-1])
+    return keys
+
+
+class RowIndex:
+    """Hash and prefix indexes over the $id and label of a table's rows."""
+
+    def __init__(self, rows):
+        self.exact = {}  # key -> [row index, ...]
+        for row_index, row in enumerate(rows):
+            for key in row_keys(row):
+                self.exact.setdefault(key, []).append(row_index)
+        self.sorted_keys = sorted(self.exact)  # Distinct keys, for prefix searches
+
+    def find(self, query, limit=100):
+        """Returns the indices of the rows matching a query: exact matches first, then prefix matches.
+
+        Each group is in row order and no row is returned twice.
+        """
+        key = query.strip().lower()
+        if not key:
+            return []
+        exact = sorted(set(self.exact.get(key, ())))
+        found = set(exact)
+        prefix = set()
+        i = bisect_left(self.sorted_keys, key)
+        while i < len(self.sorted_keys) and len(found) + len(prefix) < limit:
+            entry_key = self.sorted_keys[i]
+            if not entry_key.startswith(key):
+                break
+            prefix.update(row_index for row_index in self.exact[entry_key] if row_index not in found)
+            i += 1
+        return exact + sorted(prefix)[:limit - len(exact)]
@@ -0,0 +1,28 @@
+"""Resolution of the translatable column of a table.
+
+bdat-rs writes the columns of every table in its "schema" list (the .bschema
+file of a BDAT folder only lists the tables). The text column is Xenoblade 3's
+hashed <DBAF43F0> or the name column of Xenoblade 2 and X when the table has
+one, and the last column otherwise. Callers resolve it once when a table is
+loaded and keep it with the table, so reading and writing rows never guess
+per row and always use the same column.
+"""
+TEXT_FIELDS = ("<DBAF43F0>", "name")  # Text columns of Xenoblade 3 and of Xenoblade 2 / X
+
+
+def table_columns(data):
+    """Returns the column names of a table from its schema, or from the keys of its first row."""
+    columns = [column.get('name') for column in data.get('schema') or [] if isinstance(column, dict)]
+    if not columns:
+        rows = data.get('rows') or []
+        columns = [key for key in rows[0] if key not in ('$id', 'edited_text')] if rows else []
+    return tuple(column for column in columns if column)
+
+
+def text_field(data):
+    """Returns the name of the translatable column of a table, or None for a table without columns."""
+    columns = table_columns(data)
+    for field in TEXT_FIELDS:
+        if field in columns:
+            return field
+    return columns[-1] if columns else None
@@ -0,0 +1,437 @@
+"""Local project server for several translators working on one project.
+
+    python -m bdat_core.server BASE_DIR [--host 127.0.0.1] [--port 8766] [--password SECRET]
+
+The server holds the translated tables that its clients have opened in memory
+and is the only one writing them. A client locks a row while it edits it,
+sends the new text, and every other client is told which rows changed so it
+can update just those. Edits are written back in batches a short time after
+they arrive, through save_document, so changes made to a file by another
+program are merged instead of overwritten. A row changed differently on disk
+and by a client keeps the client's text; the conflict is logged, the row is
+added to the rows to review and the clients are told with a "conflicts" event. File statuses are stored in the
+project's StatusStore and passed on to the other clients as well.
+
+A server started with a password only answers clients whose "hello" request
+carries the same password; every other request is refused until then. The
+password is sent in clear text, so it keeps out strangers on a local network
+but is no protection on an untrusted one.
+
+Messages are JSON objects, one per line. A request carries an "id" and an
+"op" and is answered with {"id", "result"} or {"id", "error"}; a request
+without an id gets no answer, and a JSON value that is not an object gets an
+error with a null id. Events pushed by the server carry an "event"
+name instead. Files are named by their path relative to the project folder,
+with forward slashes, and rows by their $id as a string.
+"""
+import argparse
+import asyncio
+import hmac
+import json
+import os
+import threading
+
+from .carry import load_review_list, review_key, save_review_list
+from .client import DEFAULT_PORT, ServerError, encode_message
+from .game import detect_game_version
+from .instrument import span
+from .jsonio import row_text, set_row_text
+from .merge import load_document, save_document
+from .paths import file_status_key, iter_project_files
+from .status_store import StatusStore
+
+FLUSH_DELAY = 2.0  # Seconds to collect edits before they are written
+FLUSH_RETRY_LIMIT = 60.0  # Longest wait before trying again to write a table that failed
+LINE_LIMIT = 64 * 1024 * 1024  # Longest message, a pasted batch of rows can be large
+LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+
+def is_loopback(host):
+    """Checks if a server listening on host only accepts connections from this computer."""
+    return host in LOOPBACK_HOSTS
+
+
+class Document:
+    """A table held by the server, with its rows by $id."""
+
+    def __init__(self, data, state):
+        self.data = data
+        self.state = state
+        self.rows = {str(row.get('$id', '')): row for row in data.get('rows', [])}
+
+    def text(self, row_id):
+        return row_text(self.rows[row_id], self.state.field)
+
+    def set_text(self, row_id, text):
+        set_row_text(self.rows[row_id], text, self.state.field)
+
+
+class Connection:
+    def __init__(self, client_id, writer):
+        self.client_id = client_id
+        self.name = f"client {client_id}"
+        self.writer = writer
+        self.authenticated = False  # Set by a hello request with the right password
+
+    def send(self, message):
+        self.writer.write(encode_message(message))
+
+
+class ProjectServer:
+    """Tables, row locks and statuses of one project, shared by the connected clients."""
+
+    def __init__(self, base_dir, game_version, flush_delay=FLUSH_DELAY, password=None):
+        self.base_dir = os.path.abspath(base_dir)
+        self.game_version = game_version
+        self.flush_delay = flush_delay
+        self.password = password or None
+        self.docs = {}  # relative path -> Document
+        self.doc_locks = {}  # relative path -> asyncio.Lock, so a table is loaded once
+        self.row_locks = {}  # (relative path, row id) -> Connection
+        self.dirty = set()  # Relative paths with edits not written yet
+        self.flush_handle = None
+        self.failed_flushes = 0  # Flushes in a row that left a table unwritten
+        self.flush_lock = asyncio.Lock()
+        self.clients = {}  # client id -> Connection
+        self.next_client_id = 1
+        self.status_store = StatusStore.open(self.base_dir)
+        self.server = None
+
+    # --- Paths and documents ---
+
+    def abs_path(self, rel_path):
+        """Returns the path of a project table, refusing anything outside the project."""
+        path = os.path.normpath(os.path.join(self.base_dir, *str(rel_path).split('/')))
+        if not path.startswith(self.base_dir + os.sep) or not path.endswith(".json") or not os.path.isfile(path):
+            raise ServerError(f"Not a table of the project: {rel_path}")
+        return path
+
+    def rel_path(self, path):
+        return os.path.relpath(path, self.base_dir).replace('\\', '/')
+
+    async def document(self, rel_path):
+        if rel_path in self.docs:
+            return self.docs[rel_path]
+        lock = self.doc_locks.setdefault(rel_path, asyncio.Lock())
+        async with lock:
+            if rel_path not in self.docs:
+                data, state = await asyncio.to_thread(load_document, self.abs_path(rel_path))
+                self.docs[rel_path] = Document(data, state)
+        return self.docs[rel_path]
+
+    # --- Connections ---
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        if not self.password and not is_loopback(host):
+            print(f"Warning: the project server on {host} has no password; "
+                  "anyone who can reach this computer can read and change the project")
+        self.server = await asyncio.start_server(self.handle_client, host, port, limit=LINE_LIMIT)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        for connection in list(self.clients.values()):
+            connection.writer.close()
+        await self.flush()
+        if self.flush_handle:  # A retry of tables that could not be written
+            self.flush_handle.cancel()
+        self.status_store.close()
+
+    async def handle_client(self, reader, writer):
+        connection = Connection(self.next_client_id, writer)
+        self.next_client_id += 1
+        self.clients[connection.client_id] = connection
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                await self.dispatch(connection, message)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            del self.clients[connection.client_id]
+            released = [key for key, holder in self.row_locks.items() if holder is connection]
+            for key in released:
+                del self.row_locks[key]
+                self.broadcast({"event": "lock", "path": key[0], "row": key[1], "by": None})
+            writer.close()
+
+    def broadcast(self, message, exclude=None):
+        for connection in self.clients.values():
+            if connection is not exclude:
+                connection.send(message)
+
+    async def dispatch(self, connection, message):
+        if not isinstance(message, dict):
+            connection.send({"id": None, "error": "Messages must be JSON objects"})
+            return
+        request_id = message.get("id")
+        handler = getattr(self, "op_" + str(message.get("op")), None)
+        try:
+            if handler is None:
+                raise ServerError(f"Unknown request: {message.get('op')}")
+            if not connection.authenticated and handler != self.op_hello:
+                raise ServerError("Send a hello request with the project password first")
+            with span("server." + message["op"]):
+                result = await handler(connection, message)
+            response = {"id": request_id, "result": result}
+        except KeyError as e:
+            response = {"id": request_id, "error": f"Missing field {e} in {message.get('op')} request"}
+        except Exception as e:  # A failing request must not drop the connection
+            response = {"id": request_id, "error": str(e)}
+        if request_id is not None:
+            connection.send(response)
+
+    # --- Requests ---
+
+    async def op_hello(self, connection, message):
+        if self.password and not hmac.compare_digest(str(message.get("password") or "").encode('utf-8'),
+                                                     self.password.encode('utf-8')):
+            raise ServerError("Wrong project server password")
+        connection.authenticated = True
+        connection.name = str(message.get("name") or connection.name)
+        return {"client": connection.client_id, "game_version": self.game_version}
+
+    async def op_list_files(self, connection, message):
+        paths = await asyncio.to_thread(lambda: list(iter_project_files(self.base_dir, self.game_version)))
+        return [self.rel_path(path) for path in paths]
+
+    async def op_open(self, connection, message):
+        """Returns the table as the server holds it, with the rows other clients have locked."""
+        rel_path = message["path"]
+        doc = await self.document(rel_path)
+        locks = {row_id: holder.name for (path, row_id), holder in self.row_locks.items()
+                 if path == rel_path and holder is not connection}
+        return {"data": doc.data, "locks": locks}
+
+    async def op_lock(self, connection, message):
+        rel_path, row_id = message["path"], str(message["row"])
+        doc = await self.document(rel_path)
+        if row_id not in doc.rows:
+            raise ServerError(f"No row {row_id} in {rel_path}")
+        holder = self.row_locks.setdefault((rel_path, row_id), connection)
+        if holder is not connection:
+            raise ServerError(f"Row {row_id} is being edited by {holder.name}")
+        self.broadcast({"event": "lock", "path": rel_path, "row": row_id, "by": connection.name}, exclude=connection)
+        return {"text": doc.text(row_id)}
+
+    async def op_unlock(self, connection, message):
+        self.release(connection, message["path"], str(message["row"]))
+
+    def release(self, connection, rel_path, row_id):
+        if self.row_locks.get((rel_path, row_id)) is connection:
+            del self.row_locks[(rel_path, row_id)]
+            self.broadcast({"event": "lock", "path": rel_path, "row": row_id, "by": None}, exclude=connection)
+
+    async def op_edit(self, connection, message):
+        """Stores {row id: text} for one table and releases the sender's locks on those rows.
+
+        Rows locked by another client are skipped. Returns the applied and skipped row ids.
+        """
+        rel_path, texts = message["path"], message["texts"]
+        if not isinstance(texts, dict) or not all(isinstance(text, str) for text in texts.values()):
+            raise ServerError("The texts of an edit request must be an object of strings")
+        doc = await self.document(rel_path)
+        applied, skipped = {}, {}
+        for row_id, text in texts.items():
+            holder = self.row_locks.get((rel_path, row_id))
+            if row_id not in doc.rows:
+                continue
+            if holder is not None and holder is not connection:
+                skipped[row_id] = holder.name
+                continue
+            if doc.text(row_id) != text:
+                doc.set_text(row_id, text)
+                applied[row_id] = text
+            self.release(connection, rel_path, row_id)
+        if applied:
+            self.dirty.add(rel_path)
+            self.schedule_flush()
+            self.broadcast({"event": "rows", "path": rel_path, "texts": applied, "by": connection.name},
+                           exclude=connection)
+        return {"applied": list(applied), "skipped": skipped}
+
+    async def op_statuses(self, connection, message):
+        return self.status_store.load()
+
+    async def op_set_status(self, connection, message):
+        """Stores statuses given as {"files": {relative path: status}, "folders": {name: status}}."""
+        files = message.get("files", {})
+        for rel_path, status in files.items():
+            self.status_store.set(file_status_key(self.abs_path(rel_path), self.base_dir), status)
+        for name, status in message.get("folders", {}).items():
+            self.status_store.set(name, status)
+        self.status_store.flush()  # One small transaction; SQLite stays on the loop thread
+        self.broadcast({"event": "status", "files": files, "folders": message.get("folders", {}),
+                        "by": connection.name}, exclude=connection)
+
+    async def op_flush(self, connection, message):
+        """Writes pending edits now. Returns the relative paths written."""
+        return await self.flush()
+
+    # --- Write-back ---
+
+    def schedule_flush(self, delay=None):
+        if self.flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self.flush_handle = loop.call_later(self.flush_delay if delay is None else delay,
+                                                lambda: loop.create_task(self.flush()))
+
+    async def flush(self):
+        """Writes every table with pending edits, merging changes made on disk meanwhile.
+
+        Tables that fail to write keep their edits and are tried again later, waiting
+        longer after each failed flush.
+        """
+        if self.flush_handle:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        written, failed = [], []
+        async with self.flush_lock:
+            dirty, self.dirty = self.dirty, set()
+            for rel_path in sorted(dirty):
+                doc = self.docs[rel_path]
+                # Edits arriving while the file is written stay in doc.data for the next flush
+                data = json.loads(json.dumps(doc.data))
+                conflicts = []
+
+                def keep_mine(found):
+                    conflicts.extend(found)
+                    return {row_id: mine for row_id, _, _, mine in found}
+
+                try:
+                    status, saved, doc.state = await asyncio.to_thread(save_document, doc.state, data, keep_mine)
+                except Exception as e:
+                    # Keep the edits for the next flush and go on with the other files
+                    print(f"Error writing {rel_path}: {e}")
+                    self.dirty.add(rel_path)
+                    failed.append(rel_path)
+                    continue
+                written.append(rel_path)
+                if status == "merged":
+                    self.take_disk_changes(rel_path, doc, data, saved)
+                if conflicts:
+                    await self.report_conflicts(rel_path, conflicts)
+            if failed:
+                self.failed_flushes += 1
+                self.schedule_flush(min(self.flush_delay * 2 ** self.failed_flushes, FLUSH_RETRY_LIMIT))
+            else:
+                self.failed_flushes = 0
+        return written
+
+    async def report_conflicts(self, rel_path, conflicts):
+        """Logs rows whose disk text was replaced by a client's text and adds them to the rows to review."""
+        for row_id, _, disk, mine in conflicts:
+            print(f"Conflict in {rel_path} row {row_id}: kept {mine!r}, replaced {disk!r} written by another program")
+        row_ids = [str(row_id) for row_id, _, _, _ in conflicts]
+
+        def add_to_review_list():
+            review_list = load_review_list(self.base_dir)
+            key = review_key(self.abs_path(rel_path), self.base_dir)
+            review_list[key] = sorted(set(map(str, review_list.get(key, []))) | set(row_ids), key=str)
+            save_review_list(self.base_dir, review_list)
+
+        try:
+            await asyncio.to_thread(add_to_review_list)
+        except (OSError, ValueError, ServerError) as e:
+            print(f"Error adding the conflicts of {rel_path} to the rows to review: {e}")
+        self.broadcast({"event": "conflicts", "path": rel_path,
+                        "rows": {str(row_id): disk for row_id, _, disk, _ in conflicts}, "by": None})
+
+    def take_disk_changes(self, rel_path, doc, sent, saved):
+        """Adopts rows that another program changed on disk and tells every client."""
+        sent_rows = {str(row.get('$id', '')): row for row in sent.get('rows', [])}
+        changed = {}
+        for row in saved.get('rows', []):
+            row_id = str(row.get('$id', ''))
+            text = row_text(row, doc.state.field)
+            if row_id not in doc.rows:
+                continue  # Rows added on disk show up when the table is loaded again
+            if row_id in sent_rows and row_text(sent_rows[row_id], doc.state.field) != text \
+                    and doc.text(row_id) == row_text(sent_rows[row_id], doc.state.field):
+                doc.set_text(row_id, text)
+                changed[row_id] = text
+        if changed:
+            self.broadcast({"event": "rows", "path": rel_path, "texts": changed, "by": None})
+
+
+class ServerThread(threading.Thread):
+    """Runs a ProjectServer on its own event loop, for hosting from the GUI."""
+
+    def __init__(self, base_dir, game_version, host="127.0.0.1", port=DEFAULT_PORT, password=None):
+        super().__init__(daemon=True)
+        self.args = (base_dir, game_version, host, port, password)
+        self.port = None
+        self.error = None
+        self.loop = None
+        self.stopped = None
+        self.ready = threading.Event()
+
+    def run(self):
+        asyncio.run(self.serve())
+
+    async def serve(self):
+        base_dir, game_version, host, port, password = self.args
+        self.loop = asyncio.get_running_loop()
+        self.stopped = asyncio.Event()
+        try:
+            server = ProjectServer(base_dir, game_version, password=password)
+            self.port = await server.start(host, port)
+        except Exception as e:
+            self.error = e
+            self.ready.set()
+            return
+        self.ready.set()
+        await self.stopped.wait()
+        await server.stop()
+
+    def start_and_wait(self, timeout=10):
+        """Starts the server. Returns its port, raises the error that kept it from starting."""
+        self.start()
+        self.ready.wait(timeout)
+        if self.error:
+            raise self.error
+        return self.port
+
+    def stop(self, timeout=30):
+        """Stops the server after writing the pending edits."""
+        if self.loop and self.stopped and self.is_alive():
+            self.loop.call_soon_threadsafe(self.stopped.set)
+            self.join(timeout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base_dir", help="folder with the translated JSON files")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--flush-delay", type=float, default=FLUSH_DELAY, help="seconds to collect edits before writing")
+    parser.add_argument("--password", default=os.environ.get("XB_SERVER_PASSWORD"),
+                        help="password the clients must send (default: $XB_SERVER_PASSWORD)")
+    args = parser.parse_args()
+
+    async def serve():
+        server = ProjectServer(args.base_dir, detect_game_version(args.base_dir), args.flush_delay, args.password)
+        port = await server.start(args.host, args.port)
+        print(f"Project server for {server.base_dir} on {args.host}:{port}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
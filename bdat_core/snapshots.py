@@ -0,0 +1,225 @@
+"""Snapshots of the translated tables in a content-addressed local store.
+
+Every distinct file content is stored once, compressed with zlib, under its
+SHA-1 in the project's cache folder; a snapshot is only a manifest mapping
+relative paths to content hashes. A stat cache remembers the hash of every
+file by size and modification time, so a snapshot of an unchanged project
+reads no table at all and creates nothing new.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from .instrument import span
+from .jsonio import row_text
+from .paths import cache_dir, iter_project_files
+from .schema import text_field
+
+SNAPSHOT_DIR_NAME = "snapshots"
+STAT_CACHE_NAME = "stat_cache.json"
+
+
+def _atomic_write(path, content):
+    # A unique temporary name per writer: worker threads may store the same object at once
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class SnapshotStore:
+    """Objects, manifests and stat cache of one project's snapshots."""
+
+    def __init__(self, base_dir):
+        self.base_dir = base_dir
+        self.root = os.path.join(cache_dir(base_dir), SNAPSHOT_DIR_NAME)
+        self.objects_dir = os.path.join(self.root, "objects")
+        self.manifests_dir = os.path.join(self.root, "manifests")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.manifests_dir, exist_ok=True)
+
+    def rel_path(self, json_path):
+        return os.path.relpath(json_path, self.base_dir).replace('\\', '/')
+
+    def abs_path(self, rel_path):
+        return os.path.join(self.base_dir, *rel_path.split('/'))
+
+    # --- Objects ---
+
+    def object_path(self, content_hash):
+        return os.path.join(self.objects_dir, content_hash[:2], content_hash[2:])
+
+    def put_object(self, content):
+        """Stores file content if it is new. Returns its hash."""
+        content_hash = hashlib.sha1(content).hexdigest()
+        path = self.object_path(content_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                _atomic_write(path, zlib.compress(content, 6))
+            except OSError:
+                # Another thread stored the same content first (Windows refuses to replace an open file)
+                if not os.path.exists(path):
+                    raise
+        return content_hash
+
+    def get_object(self, content_hash):
+        with open(self.object_path(content_hash), 'rb') as f:
+            return zlib.decompress(f.read())
+
+    # --- Stat cache ---
+
+    def load_stat_cache(self):
+        """Returns {relative path: [size, mtime_ns, hash]}."""
+        try:
+            with open(os.path.join(self.root, STAT_CACHE_NAME), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}  # A missing or damaged cache only means rehashing
+
+    def save_stat_cache(self, stat_cache):
+        _atomic_write(os.path.join(self.root, STAT_CACHE_NAME), json.dumps(stat_cache).encode('utf-8'))
+
+    def _hash_file(self, rel_path, entry, store):
+        """Returns the [size, mtime_ns, hash] of a file, reading it only when its stat changed."""
+        path = self.abs_path(rel_path)
+        stat = os.stat(path)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns and \
+                (not store or os.path.exists(self.object_path(entry[2]))):
+            return entry
+        with open(path, 'rb') as f:
+            content = f.read()
+        content_hash = self.put_object(content) if store else hashlib.sha1(content).hexdigest()
+        return [stat.st_size, stat.st_mtime_ns, content_hash]
+
+    def current_state(self, game_version, store=False, workers=8, progress=None, cancel=None):
+        """Returns {relative path: hash} of the project's tables, storing new contents when store is set.
+
+        Returns None when cancelled.
+        """
+        rel_paths = [self.rel_path(path) for path in iter_project_files(self.base_dir, game_version)]
+        stat_cache = self.load_stat_cache()
+        state = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self._hash_file, rel_path, stat_cache.get(rel_path), store)
+                       for rel_path in rel_paths]
+            for done, (rel_path, future) in enumerate(zip(rel_paths, futures), 1):
+                if cancel is not None and cancel.is_set():
+                    for pending in futures:
+                        pending.cancel()
+                    return None
+                stat_cache[rel_path] = future.result()
+                state[rel_path] = stat_cache[rel_path][2]
+                if progress:
+                    progress(done, len(rel_paths))
+        self.save_stat_cache({rel_path: stat_cache[rel_path] for rel_path in state})
+        return state
+
+    # --- Manifests ---
+
+    def list_snapshots(self):
+        """Returns the snapshots, newest first, as dicts with id, created, label and files."""
+        snapshots = []
+        for name in os.listdir(self.manifests_dir):
+            if name.endswith(".json"):
+                try:
+                    snapshots.append(self.load_snapshot(name[:-5]))
+                except (OSError, ValueError):
+                    continue
+        return sorted(snapshots, key=lambda snapshot: snapshot["created"], reverse=True)
+
+    def load_snapshot(self, snapshot_id):
+        with open(os.path.join(self.manifests_dir, f"{snapshot_id}.json"), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def take_snapshot(self, game_version, label="", progress=None, cancel=None):
+        """Stores the current tables. Returns (snapshot, created).
+
+        When nothing changed since the newest snapshot, that snapshot is returned
+        and created is False. Returns (None, False) when cancelled.
+        """
+        with span("snapshot.take"):
+            files = self.current_state(game_version, store=True, progress=progress, cancel=cancel)
+            if files is None:
+                return None, False
+            snapshots = self.list_snapshots()
+            if snapshots and snapshots[0]["files"] == files:
+                return snapshots[0], False
+            created = time.time()
+            snapshot_id = time.strftime("%Y%m%d-%H%M%S", time.localtime(created)) + f"-{int(created * 1000) % 1000:03d}"
+            snapshot = {"id": snapshot_id, "created": created, "label": label, "files": files}
+            _atomic_write(os.path.join(self.manifests_dir, f"{snapshot_id}.json"),
+                          json.dumps(snapshot, indent=1, sort_keys=True).encode('utf-8'))
+        return snapshot, True
+
+    def delete_snapshot(self, snapshot_id):
+        """Removes a manifest. Objects stay, they may be shared with other snapshots."""
+        os.remove(os.path.join(self.manifests_dir, f"{snapshot_id}.json"))
+
+    # --- Diff and restore ---
+
+    def diff(self, snapshot, game_version):
+        """Compares a snapshot with the current tables. Returns {"changed", "added", "removed"} relative paths.
+
+        "added" are files that exist now but not in the snapshot.
+        """
+        with span("snapshot.diff"):
+            current = self.current_state(game_version)
+        files = snapshot["files"]
+        return {
+            "changed": sorted(path for path in files if path in current and current[path] != files[path]),
+            "added": sorted(path for path in current if path not in files),
+            "removed": sorted(path for path in files if path not in current),
+        }
+
+    def diff_rows(self, snapshot, rel_path):
+        """Returns [(row id, snapshot text, current text)] for the rows that differ in one file."""
+        old_data = json.loads(self.get_object(snapshot["files"][rel_path]).decode('utf-8'))
+        path = self.abs_path(rel_path)
+        new_data = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                new_data = json.load(f)
+        old_field, new_field = text_field(old_data), text_field(new_data)
+        old_texts = {row.get('$id'): row_text(row, old_field) for row in old_data.get('rows', [])}
+        new_texts = {row.get('$id'): row_text(row, new_field) for row in new_data.get('rows', [])}
+        return [(row_id, old_texts.get(row_id, ""), new_texts.get(row_id, ""))
+                for row_id in list(old_texts) + [row_id for row_id in new_texts if row_id not in old_texts]
+                if old_texts.get(row_id) != new_texts.get(row_id)]
+
+    def restore(self, snapshot, rel_paths):
+        """Writes the snapshot content of files back to the project. Returns the restored relative paths.
+
+        Files that are already identical are skipped.
+        """
+        restored = []
+        with span("snapshot.restore", files=len(rel_paths)):
+            for rel_path in rel_paths:
+                content_hash = snapshot["files"][rel_path]
+                path = self.abs_path(rel_path)
+                if os.path.exists(path):
+                    with open(path, 'rb') as f:
+                        if hashlib.sha1(f.read()).hexdigest() == content_hash:
+                            continue
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                _atomic_write(path, self.get_object(content_hash))
+                restored.append(rel_path)
+        return restored
+
+
+def snapshot_paths_under(snapshot, base_dir, path):
+    """Returns the relative paths of a snapshot that are a file or inside a folder of the project."""
+    rel_path = os.path.relpath(path, base_dir).replace('\\', '/')
+    if rel_path in snapshot["files"]:
+        return [rel_path]
+    prefix = rel_path.rstrip('/') + '/'
+    return sorted(path for path in snapshot["files"] if path.startswith(prefix))
@@ -0,0 +1,102 @@
+"""Translation progress (folder and file colors) stored in a local SQLite database.
+
+Every status is its own row, so saving one change never rewrites the others and
+two running instances don't overwrite each other's changes. Changes are queued
+and written in one transaction by flush().
+"""
+import configparser
+import os
+import sqlite3
+import time
+
+STATUS_DB_NAME = "translation_status.sqlite3"
+LEGACY_CONFIG_NAME = "translation_config.ini"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS status (
+    kind TEXT NOT NULL,     -- 'folder' or 'file'
+    key TEXT NOT NULL,      -- folder name or file path relative to its BDAT folder
+    status TEXT NOT NULL,   -- 'green' or 'orange'
+    updated REAL NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def status_kind(key):
+    """Returns 'file' for file keys (relative .json paths) and 'folder' for folder names."""
+    return "file" if key.endswith(".json") else "folder"
+
+
+class StatusStore:
+    """Folder and file statuses of one project."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path, timeout=5)
+        # The project folder may be a network share, where WAL's shared memory doesn't work.
+        # A database left in WAL mode by an earlier version is switched back as well.
+        self.connection.execute("PRAGMA journal_mode=DELETE")
+        self.connection.executescript(SCHEMA)
+        self.pending = {}  # (kind, key) -> status, or None to clear
+
+    @classmethod
+    def open(cls, base_dir):
+        """Opens the store of a project, importing translation_config.ini the first time."""
+        store = cls(os.path.join(base_dir, STATUS_DB_NAME))
+        store.import_legacy_config(os.path.join(base_dir, LEGACY_CONFIG_NAME))
+        return store
+
+    def import_legacy_config(self, config_path):
+        """Imports the FOLDER_STATUS section of an ini file once. Returns the number of imported entries."""
+        if self.connection.execute("SELECT 1 FROM meta WHERE name = 'legacy_config_imported'").fetchone():
+            return 0
+
+        statuses = {}
+        if os.path.exists(config_path):
+            config = configparser.ConfigParser()
+            config.read(config_path)
+            if 'FOLDER_STATUS' in config:
+                statuses = dict(config['FOLDER_STATUS'].items())
+
+        now = time.time()
+        with self.connection:
+            # Keep entries that another instance may already have written
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO status (kind, key, status, updated) VALUES (?, ?, ?, ?)",
+                [(status_kind(key), key, status, now) for key, status in statuses.items() if status])
+            self.connection.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('legacy_config_imported', ?)",
+                                    (config_path,))
+        return len(statuses)
+
+    def load(self):
+        """Returns {key: status} for every folder and file."""
+        return {key: status for key, status in self.connection.execute("SELECT key, status FROM status")}
+
+    def set(self, key, status):
+        """Queues a status change. A falsy status clears the entry."""
+        self.pending[(status_kind(key), key)] = status or None
+
+    def flush(self):
+        """Writes all queued changes in one transaction."""
+        if not self.pending:
+            return
+        now = time.time()
+        changes = self.pending
+        self.pending = {}
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO status (kind, key, status, updated) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (kind, key) DO UPDATE SET status = excluded.status, updated = excluded.updated",
+                [(kind, key, status, now) for (kind, key), status in changes.items() if status])
+            self.connection.executemany(
+                "DELETE FROM status WHERE kind = ? AND key = ?",
+                [(kind, key) for (kind, key), status in changes.items() if not status])
+
+    def close(self):
+        self.flush()
+        self.connection.close()
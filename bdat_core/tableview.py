@@ -0,0 +1,40 @@
+"""Sort and filter keys of the rows of the table view.
+
+The keys of every row are computed once when the table is filled, so sorting
+by a column or filtering rows only reorders the existing rows instead of
+reading and inserting them again.
+"""
+
+# Sort key of each sortable column: its position in the row_view_keys() tuple
+SORT_KEY_INDEX = {"ID": 0, "LABEL": 1, "ORIGINAL TEXT": 2, "TRANSLATED TEXT": 3}
+ROW_FILTERS = {
+    "all": None,
+    "over_limit": lambda keys: "red" in keys[5],
+    "untranslated": lambda keys: keys[4],
+    "review": lambda keys: "review" in keys[5],
+}
+
+
+def row_view_keys(row_id, label, original_text, translated_text, tags):
+    """Returns the sort and filter keys of a table row.
+
+    (id, lowercased label, original length, translated length, untranslated, tags);
+    numeric ids sort before text ids.
+    """
+    id_key = (0, row_id, "") if isinstance(row_id, int) else (1, 0, str(row_id))
+    return (id_key, str(label or "").lower(), len(original_text), len(translated_text),
+            not translated_text or translated_text == original_text, tuple(tags))
+
+
+def view_order(view_keys, sort=None, descending=False, row_filter="all"):
+    """Returns the positions of the rows to show, in display order.
+
+    sort is a column of SORT_KEY_INDEX (None keeps the file order) and row_filter
+    a key of ROW_FILTERS.
+    """
+    order = range(len(view_keys))
+    if sort:
+        key_index = SORT_KEY_INDEX[sort]
+        order = sorted(order, key=lambda i: view_keys[i][key_index], reverse=descending)
+    keep = ROW_FILTERS[row_filter]
+    return [i for i in order if keep is None or keep(view_keys[i])]
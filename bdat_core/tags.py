@@ -0,0 +1,180 @@
+"""Checks that translations keep the control tags of their original rows.
+
+Tags are the `[...]` sequences of the game text (e.g. `[ML:Feeling ]`). Each
+translated row must contain the same multiset of tags as the original row with
+the same $id; the order may change. A tag with the same name but different
+parameters (e.g. `[ML:Icon icon=a ]` vs `[ML:Icon icon=b ]`) is reported as
+altered rather than as one missing and one extra tag.
+"""
+import hashlib
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from .instrument import span
+from .jsonio import row_text
+from .schema import text_field
+from .paths import cache_dir, resolve_original_path
+from .text import TAG_RE
+
+TAG_CACHE_NAME = "tag_check.json"
+
+
+def tag_name(tag):
+    """Returns the name part of a tag: "[ML:Icon icon=a ]" -> "ML:Icon"."""
+    return tag[1:-1].strip().split(' ', 1)[0].split('=', 1)[0]
+
+
+def extract_tags(text):
+    """Returns the multiset of tags in a text."""
+    return Counter(TAG_RE.findall(str(text))) if text else Counter()
+
+
+def compare_tags(original_text, translated_text):
+    """Returns the tag problems of a translation as [(kind, detail), ...].
+
+    kind is 'missing', 'extra' or 'altered'; an empty list means the tags match.
+    """
+    original_tags = extract_tags(original_text)
+    translated_tags = extract_tags(translated_text)
+    if original_tags == translated_tags:
+        return []
+
+    missing = list((original_tags - translated_tags).elements())
+    extra = list((translated_tags - original_tags).elements())
+
+    issues = []
+    for tag in missing:
+        # Pair a missing tag with an extra tag of the same name
+        name = tag_name(tag)
+        replacement = next((other for other in extra if tag_name(other) == name), None)
+        if replacement is not None:
+            extra.remove(replacement)
+            issues.append(("altered", f"{tag} -> {replacement}"))
+        else:
+            issues.append(("missing", tag))
+    issues.extend(("extra", tag) for tag in extra)
+    return issues
+
+
+def format_tag_issues(issues):
+    """Returns a one-line description of tag problems."""
+    return "; ".join(f"{kind}: {detail}" for kind, detail in issues)
+
+
+def _read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def check_file_tags(json_path, original_path, cached_hash=None):
+    """Compares the tags of every translated row with its original row.
+
+    Returns (content hash, issues) where issues is [[row id, kind, detail], ...],
+    or (content hash, None) when the hash equals cached_hash and nothing was checked.
+    """
+    translated_bytes = _read_bytes(json_path)
+    original_bytes = _read_bytes(original_path)
+    content_hash = hashlib.sha1(translated_bytes + b"\0" + original_bytes).hexdigest()
+    if content_hash == cached_hash:
+        return content_hash, None
+
+    original_data = json.loads(original_bytes)
+    original_field = text_field(original_data)
+    original_texts = {row.get('$id'): row_text(row, original_field) for row in original_data.get('rows', [])}
+    data = json.loads(translated_bytes)
+    field = text_field(data)
+    issues = []
+    for row in data.get('rows', []):
+        row_id = row.get('$id')
+        if row_id not in original_texts:
+            continue
+        for kind, detail in compare_tags(original_texts[row_id], row_text(row, field)):
+            issues.append([row_id, kind, detail])
+    return content_hash, issues
+
+
+class TagCheckCache:
+    """Results of earlier tag checks, keyed by file path and content hash."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}  # rel path -> {"stat": [...], "hash": str, "issues": [...]}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}  # A damaged cache is rebuilt
+
+    @classmethod
+    def open(cls, base_dir):
+        return cls(os.path.join(cache_dir(base_dir), TAG_CACHE_NAME))
+
+    def save(self):
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        os.replace(temp_path, self.path)
+
+
+def _stat_signature(*paths):
+    signature = []
+    for path in paths:
+        stat = os.stat(path)
+        signature += [stat.st_size, stat.st_mtime_ns]
+    return signature
+
+
+def check_project_tags(json_paths, base_dir, second_base_dir, game_version, progress=None, cancel=None):
+    """Checks the tags of many files on a process pool.
+
+    Files whose size and modification time are unchanged reuse the cached result
+    directly; the others are hashed by the workers and only checked again when
+    their content changed. Returns {path: [[row id, kind, detail], ...]} for files
+    with problems. Files without an original are skipped.
+    """
+    json_paths = list(json_paths)
+    cache = TagCheckCache.open(base_dir)
+    results = {}
+    jobs = []  # (path, rel path, original path, stat signature, cached entry)
+
+    with span("tags.check_project", files=len(json_paths)):
+        done = 0
+        for json_path in json_paths:
+            original_path = resolve_original_path(json_path, base_dir, second_base_dir, game_version)
+            if not original_path:
+                done += 1
+                continue
+            rel_path = os.path.relpath(json_path, base_dir).replace('\\', '/')
+            entry = cache.entries.get(rel_path)
+            signature = _stat_signature(json_path, original_path)
+            if entry and entry.get("stat") == signature:
+                if entry["issues"]:
+                    results[json_path] = entry["issues"]
+                done += 1
+            else:
+                jobs.append((json_path, rel_path, original_path, signature, entry))
+        if progress:
+            progress(done, len(json_paths))
+
+        if jobs:
+            with ProcessPoolExecutor() as executor:
+                checked = executor.map(check_file_tags, [job[0] for job in jobs], [job[2] for job in jobs],
+                                       [job[4]["hash"] if job[4] else None for job in jobs], chunksize=16)
+                for (json_path, rel_path, _, signature, entry), (content_hash, issues) in zip(jobs, checked):
+                    if issues is None:
+                        issues = entry["issues"]  # Touched but unchanged
+                    cache.entries[rel_path] = {"stat": signature, "hash": content_hash, "issues": issues}
+                    if issues:
+                        results[json_path] = issues
+                    done += 1
+                    if progress:
+                        progress(done, len(json_paths))
+                    if cancel is not None and cancel.is_set():
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        break
+
+        cache.save()
+    return results
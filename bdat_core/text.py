@@ -0,0 +1,23 @@
+"""Conversion between stored text and the escaped form shown in the table."""
+import re
+
+TAG_RE = re.compile(r'\[.*?\]')
+
+
+def escape_text(text):
+    """Replaces special characters with visible representations."""
+    if not text:
+        return ""
+    # Convert to string to avoid errors with non-string types (e.g., numbers)
+    text = str(text)
+    return text.replace('\n', '\\n').replace('\t', '\\t').replace('\r', '\\r')
+
+
+def unescape_text(text):
+    """Converts visible special characters back to actual characters."""
+    return text.replace('\\n', '\n').replace('\\t', '\t').replace('\\r', '\r')
+
+
+def strip_tags(line):
+    """Removes game control tags (content within square brackets)."""
+    return TAG_RE.sub('', line)
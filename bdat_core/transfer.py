@@ -0,0 +1,174 @@
+"""Text exchange format used by the copy and paste actions.
+
+Each file block starts with the file name (without extension) followed by an
+empty line and one "[ID]: text" line per row, with special characters escaped.
+"""
+import os
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .instrument import span
+from .jsonio import read_json, row_text
+from .schema import text_field
+from .paths import resolve_original_path
+from .text import escape_text, unescape_text
+
+COPY_MODES = ("original", "translated", "both", "both_sequential")
+
+LINE_RE = re.compile(r'^\[(.*?)]: (.*)$')
+
+
+def parse_paste_sections(text, known_names):
+    """Splits pasted text into {file name: {row id: text}}.
+
+    A line that is not an "[ID]: text" line and equals one of known_names starts a
+    new file section. Lines before the first header are stored under None. When an
+    ID appears more than once in a section (the "both" formats), the last line wins.
+    """
+    sections = {}
+    current = sections.setdefault(None, {})
+
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+
+        # Non-greedy match for ID in case ID contains weird chars, though usually numeric.
+        match = LINE_RE.match(line)
+        if match:
+            # Revert the escaping done during copy
+            current[match.group(1)] = unescape_text(match.group(2))
+        elif line in known_names:
+            current = sections.setdefault(line, {})
+
+    if not sections[None]:
+        del sections[None]
+    return sections
+
+
+def format_file_lines(filename_no_ext, mode, data_translated, data_original):
+    """Yields the lines of one file block in the given copy mode."""
+    yield filename_no_ext
+    yield ""
+
+    field = text_field(data_translated) if data_translated else None
+    original_field = text_field(data_original) if data_original else None
+
+    if mode == "both" and data_translated and data_original:
+        # Create a map for original data for quick lookup
+        org_map = {row.get('$id'): row_text(row, original_field) for row in data_original['rows']}
+
+        for row in data_translated['rows']:
+            row_id = row.get('$id', '')
+            yield f"[{row_id}]: {escape_text(org_map.get(row_id, ''))}"
+            yield f"[{row_id}]: {escape_text(row_text(row, field))}"
+            yield ""  # Separator
+
+    elif mode == "both_sequential" and data_translated and data_original:
+        # Block 1: Original
+        for row in data_original['rows']:
+            yield f"[{row.get('$id', '')}]: {escape_text(row_text(row, original_field))}"
+
+        yield ""
+        yield ""
+
+        # Block 2: Translated
+        yield filename_no_ext
+        yield ""
+        for row in data_translated['rows']:
+            yield f"[{row.get('$id', '')}]: {escape_text(row_text(row, field))}"
+
+    elif mode == "original" and data_original:
+        for row in data_original['rows']:
+            yield f"[{row.get('$id', '')}]: {escape_text(row_text(row, original_field))}"
+
+    elif mode == "translated" and data_translated:
+        for row in data_translated['rows']:
+            yield f"[{row.get('$id', '')}]: {escape_text(row_text(row, field))}"
+
+
+def read_file_block(json_path, mode, base_dir, second_base_dir, game_version):
+    """Loads the files needed for one block and returns its text, or None when its original is missing."""
+    original_path = None
+    if mode != "translated":
+        original_path = resolve_original_path(json_path, base_dir, second_base_dir, game_version)
+        if not original_path:
+            return None
+
+    data_translated = read_json(json_path) if mode != "original" else None
+    data_original = read_json(original_path) if original_path else None
+    filename_no_ext = os.path.splitext(os.path.basename(json_path))[0]
+    return "\n".join(format_file_lines(filename_no_ext, mode, data_translated, data_original))
+
+
+def export_files(json_paths, out_path, mode, base_dir, second_base_dir, game_version,
+                 workers=4, progress=None, cancel=None):
+    """Streams the blocks of json_paths to out_path in the given copy mode.
+
+    Files are read and formatted by a pool of workers; blocks are written in the
+    order of json_paths as soon as they are ready, so only a few blocks are held in
+    memory at a time. progress(done, total) is called after every file and the
+    export stops early when the cancel event is set. The blocks go to a temporary
+    file that replaces out_path once every file is done, so a failed or cancelled
+    export leaves out_path as it was.
+
+    Returns (number of files written, list of files skipped because their original
+    is missing, {path: error} of files that could not be read, cancelled).
+    """
+    json_paths = list(json_paths)
+    written = 0
+    skipped = []
+    errors = {}
+    cancelled = False
+    temp_path = out_path + ".tmp"
+
+    with span("export", files=len(json_paths), mode=mode):
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor, open(temp_path, 'w', encoding='utf-8') as out:
+                pending = deque()
+                paths = iter(json_paths)
+
+                def submit_next():
+                    path = next(paths, None)
+                    if path is not None:
+                        pending.append((path, executor.submit(read_file_block, path, mode, base_dir,
+                                                              second_base_dir, game_version)))
+
+                # Keep a bounded window of files in flight
+                for _ in range(workers * 2):
+                    submit_next()
+
+                done = 0
+                while pending:
+                    if cancel is not None and cancel.is_set():
+                        for _, future in pending:
+                            future.cancel()
+                        cancelled = True
+                        break
+
+                    path, future = pending.popleft()
+                    submit_next()
+                    try:
+                        block = future.result()
+                    except Exception as e:  # One unreadable file must not end the export
+                        errors[path] = f"{type(e).__name__}: {e}"
+                    else:
+                        if block is None:
+                            skipped.append(path)
+                        else:
+                            if written:
+                                out.write("\n\n\n")
+                            out.write(block)
+                            written += 1
+
+                    done += 1
+                    if progress:
+                        progress(done, len(json_paths))
+            if not cancelled:
+                os.replace(temp_path, out_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    return written, skipped, errors, cancelled
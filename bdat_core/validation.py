@@ -0,0 +1,34 @@
+"""Line length validation."""
+from .instrument import timed
+from .text import strip_tags
+
+# Character limit per line, by table filename prefix
+LINE_LIMITS = (
+    (("bf",), 54),
+    (("campfev", "fev", "kizuna", "qst", "tlk"), 39),
+)
+
+
+def line_limit(filename):
+    """Returns the character limit per line for a file, or None if there is no limit."""
+    for prefixes, limit in LINE_LIMITS:
+        if filename.startswith(prefixes):
+            return limit
+    return None
+
+
+@timed("validate")
+def check_line_length(filename, text):
+    """Checks if any line in the text exceeds the character limit based on the filename.
+    Ignores characters within square brackets."""
+    if not text:
+        return False
+
+    limit = line_limit(filename)
+    if limit is None:
+        return False  # No limit defined for this filename
+
+    for line in text.split('\\n'):
+        if len(strip_tags(line)) > limit:
+            return True
+    return False
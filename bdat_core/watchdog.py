@@ -0,0 +1,99 @@
+"""Detects stalls of the UI thread and records what it was doing.
+
+The UI calls beat() from a periodic timer of its event loop. A monitor thread
+checks how late the next beat is; once that exceeds the threshold, the
+event loop is blocked, so the monitor samples the UI thread's Python stack and
+the names of its open instrumentation spans. When the next beat arrives the
+stall is closed with its total duration and added to a rolling log.
+"""
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from .instrument import count, thread_spans
+
+
+class StallWatchdog:
+    """Watches the heartbeat of one thread (the calling thread by default)."""
+
+    def __init__(self, interval=0.1, threshold=0.25, thread_id=None, max_records=100, app_files=()):
+        self.interval = interval  # Expected time between beats
+        self.threshold = threshold  # Lateness of a beat that counts as a stall
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.records = deque(maxlen=max_records)  # Finished stalls, oldest first
+        self.app_files = tuple(os.path.normcase(os.path.abspath(path)) for path in app_files)
+        self.max_latency = 0.0
+        self._last_beat = time.perf_counter()
+        self._current = None  # Stall being recorded: {"started", "operation", "stack"}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._last_beat = time.perf_counter()
+            self._thread = threading.Thread(target=self._monitor, name="stall-watchdog", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def beat(self):
+        """Called on the watched thread at every heartbeat. Returns how late the beat was.
+
+        The first beat after a stall moves it to the log.
+        """
+        now = time.perf_counter()
+        with self._lock:
+            latency = max(0.0, now - self._last_beat - self.interval)
+            self._last_beat = now
+            stall, self._current = self._current, None
+        self.max_latency = max(self.max_latency, latency)
+        if stall is not None:
+            stall["duration"] = round(latency, 3)
+            self.records.append(stall)
+            count("watchdog.stall")
+        return latency
+
+    def _monitor(self):
+        while not self._stop.wait(self.threshold / 4):
+            with self._lock:
+                blocked = time.perf_counter() - self._last_beat - self.interval
+                if blocked < self.threshold or self._current is not None:
+                    continue
+                self._current = self._sample()
+
+    def _sample(self):
+        """Captures the stack and the operation of the watched thread."""
+        frame = sys._current_frames().get(self.thread_id)
+        stack = traceback.extract_stack(frame) if frame is not None else []
+        return {
+            "started": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "operation": self._operation(stack),
+            "stack": [f"{os.path.basename(entry.filename)}:{entry.lineno} {entry.name}" for entry in stack],
+        }
+
+    def _operation(self, stack):
+        """Names the running operation: the open spans, else the outermost application function."""
+        spans = thread_spans(self.thread_id)
+        if spans:
+            return " > ".join(spans)
+        for entry in stack:
+            # Skip the event loop frames (main, mainloop, Tk callbacks) down to the first app function
+            if os.path.normcase(os.path.abspath(entry.filename)) in self.app_files and entry.name not in ("main", "<module>"):
+                return entry.name
+        return stack[-1].name if stack else "unknown"
+
+    def export(self, path):
+        """Writes the stall log as JSON."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"threshold": self.threshold, "max_latency": round(self.max_latency, 3),
+                       "stalls": list(self.records)}, f, indent=2)
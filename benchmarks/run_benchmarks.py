@@ -0,0 +1,353 @@
+"""Benchmark harness for the BDAT Translation Tool.
+
+Generates a synthetic project (see synth_project.py), loads the GUI module
+without entering its main loop and times the hot paths:
+
+    detect_game_version, populate_file_list, filter_folders, load_json,
+    populate_table, save_table_data/save_json and check_line_length
+
+It also measures the cold start: the import time of the headless bdat_core
+package and the time until the GUI shows the file list, against
+COLD_START_BUDGET.
+
+Results are written as JSON so that two runs can be compared:
+
+    python benchmarks/run_benchmarks.py --game x3 --output new.json --compare old.json
+
+The GUI needs an X display. On Linux without $DISPLAY the harness starts a
+private Xvfb server when one is installed, otherwise run it as:
+
+    xvfb-run -a python benchmarks/run_benchmarks.py
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import synth_project
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GUI_SCRIPT = os.path.join(REPO_DIR, "Xenoblade2-Translation-GUI.py")
+
+# Cold-start budget in seconds
+COLD_START_BUDGET = {
+    "core_import": 0.25,  # import bdat_core in a fresh interpreter
+    "gui_first_data": 3.0,  # process start until the file list is populated
+}
+
+
+class SilentMessagebox:
+    """Replaces tkinter.messagebox so modal dialogs don't block the benchmark."""
+
+    def __init__(self):
+        self.messages = []
+
+    def _record(self, kind, title, message=None, **kwargs):
+        self.messages.append((kind, title, message))
+
+    def showinfo(self, *args, **kwargs):
+        self._record("info", *args, **kwargs)
+
+    def showwarning(self, *args, **kwargs):
+        self._record("warning", *args, **kwargs)
+
+    def showerror(self, *args, **kwargs):
+        self._record("error", *args, **kwargs)
+
+    def askyesnocancel(self, *args, **kwargs):
+        self._record("ask", *args, **kwargs)
+        return False
+
+    def askyesno(self, *args, **kwargs):
+        self._record("ask", *args, **kwargs)
+        return False
+
+
+def start_virtual_display():
+    """Starts a private Xvfb server if no display is available. Returns the process or None."""
+    if sys.platform in ("win32", "darwin") or os.environ.get("DISPLAY"):
+        return None
+
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        sys.exit("No X display available and Xvfb is not installed.\n"
+                 "Run the benchmark under a virtual display, e.g. 'xvfb-run -a python benchmarks/run_benchmarks.py'.")
+
+    for number in range(99, 199):
+        if os.path.exists(f"/tmp/.X11-unix/X{number}") or os.path.exists(f"/tmp/.X{number}-lock"):
+            continue
+        process = subprocess.Popen([xvfb, f":{number}", "-screen", "0", "1600x1200x24", "-nolisten", "tcp"],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        # Wait for the server socket to appear
+        for _ in range(50):
+            if os.path.exists(f"/tmp/.X11-unix/X{number}"):
+                os.environ["DISPLAY"] = f":{number}"
+                return process
+            if process.poll() is not None:
+                break
+            time.sleep(0.1)
+        process.terminate()
+    sys.exit("Could not start Xvfb.")
+
+
+def load_gui_module():
+    """Imports the GUI script as a module. The main loop only starts when run as a script."""
+    spec = importlib.util.spec_from_file_location("xenoblade_translation_gui", GUI_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    module.messagebox = SilentMessagebox()
+    module.build_gui()
+    module.root.withdraw()
+    return module
+
+
+def measure_cold_start(project, repeat):
+    """Runs fresh interpreters to time the core import and the GUI start. Returns {name: stats}."""
+    results = {}
+
+    core_durations = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", "import time; t = time.perf_counter(); import bdat_core; print(time.perf_counter() - t)"],
+            cwd=REPO_DIR, capture_output=True, text=True, check=True).stdout
+        core_durations.append(float(output.strip()))
+    results["core_import"] = summarize(core_durations)
+
+    env = dict(os.environ, XB_STARTUP_PROBE="1", XB_BASE_DIR=project["translated_dir"],
+               XB_SECOND_DIR=project["original_dir"])
+    gui_durations = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, GUI_SCRIPT], cwd=REPO_DIR, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        for line in output.splitlines():
+            if line.startswith("STARTUP_PROBE "):
+                gui_durations.append(json.loads(line[len("STARTUP_PROBE "):])["first_data"])
+                break
+        else:
+            raise RuntimeError("The GUI did not report its startup timings")
+    results["gui_first_data"] = summarize(gui_durations)
+
+    for name, stats in results.items():
+        stats["budget"] = COLD_START_BUDGET[name]
+        stats["within_budget"] = stats["median"] <= COLD_START_BUDGET[name]
+    return results
+
+
+def measure(func, repeat, setup=None):
+    """Runs func `repeat` times and returns the list of wall-clock durations in seconds."""
+    durations = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def summarize(durations, items=None):
+    """Builds the statistics stored for one benchmark."""
+    result = {
+        "runs": len(durations),
+        "min": min(durations),
+        "median": statistics.median(durations),
+        "mean": statistics.mean(durations),
+        "max": max(durations),
+    }
+    if items:
+        result["items"] = items
+        result["per_item_median"] = result["median"] / items
+    return result
+
+
+def run_benchmarks(gui, project, args):
+    """Times every hot path against the generated project. Returns {name: stats}."""
+    results = {}
+    base_dir = project["translated_dir"]
+    json_files = project["json_files"]
+
+    gui.BASE_DIR = base_dir
+    gui.SECOND_BASE_DIR = project["original_dir"]
+    gui.FOLDER_STATUS = {}
+
+    print("detect_game_version ...")
+    results["detect_game_version"] = summarize(measure(lambda: gui.detect_game_version(base_dir), args.repeat))
+    gui.GAME_VERSION = gui.detect_game_version(base_dir)
+
+    print("populate_file_list ...")
+    results["populate_file_list"] = summarize(measure(gui.populate_file_list, args.repeat), len(json_files))
+
+    # Search for a table prefix so that every folder has matching and non-matching children
+    print("filter_folders ...")
+
+    def filter_once():
+        gui.search_var.set("fev")
+        gui.filter_folders()
+        gui.search_var.set("")
+        gui.filter_folders()
+
+    results["filter_folders"] = summarize(measure(filter_once, args.repeat), len(json_files))
+
+    print("load_json ...")
+    sample = json_files[:args.sample_files]
+    results["load_json"] = summarize(measure(lambda: [gui.load_json(path) for path in sample], args.repeat), len(sample))
+
+    # Table population is by far the slowest path, so it runs on a single file
+    target = json_files[0]
+    print("populate_table ...")
+    gui.load_table_data(target)
+    results["populate_table"] = summarize(
+        measure(lambda: gui.populate_table(gui.TREE, gui.CURRENT_ORIGINAL_JSON_DATA, gui.CURRENT_JSON_DATA), args.repeat),
+        args.rows)
+
+    print("save_table_data ...")
+    results["save_table_data"] = summarize(measure(gui.save_table_data, args.repeat), args.rows)
+
+    print("save_json ...")
+    data, state = gui.load_document(target)
+    saved = {"state": state}
+
+    def save_once():
+        # Alternate the text of one row so that every run writes the file
+        row = data["rows"][0]
+        row["edited_text"] = "" if row.get("edited_text") == "benchmark" else "benchmark"
+        saved["state"] = gui.save_json(target, data, saved["state"])[2]
+
+    results["save_json"] = summarize(measure(save_once, args.repeat), args.rows)
+
+    print("check_line_length ...")
+    texts = []
+    for path in sample:
+        data = gui.load_json(path)
+        filename = os.path.basename(path)
+        field = gui.text_field(data)
+        for row in data["rows"]:
+            texts.append((filename, gui.escape_text(gui.row_text(row, field))))
+    results["check_line_length"] = summarize(
+        measure(lambda: [gui.check_line_length(filename, text) for filename, text in texts], args.repeat),
+        len(texts))
+
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous, current, threshold):
+    """Prints a median-to-median comparison. Returns the names of regressed benchmarks."""
+    regressions = []
+    print(f"\n{'benchmark':<22}{'previous':>12}{'current':>12}{'change':>10}")
+    for name, stats in current["results"].items():
+        old = previous.get("results", {}).get(name)
+        if not old:
+            print(f"{name:<22}{'-':>12}{stats['median'] * 1000:>10.2f}ms{'new':>10}")
+            continue
+        change = (stats["median"] - old["median"]) / old["median"] * 100 if old["median"] else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  <-- slower"
+            regressions.append(name)
+        print(f"{name:<22}{old['median'] * 1000:>10.2f}ms{stats['median'] * 1000:>10.2f}ms{change:>+9.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the BDAT Translation Tool hot paths.")
+    parser.add_argument("--game", choices=sorted(synth_project.GAMES), default="x2")
+    parser.add_argument("--folders", type=int, default=20, help="Number of BDAT folders")
+    parser.add_argument("--files", type=int, default=10, help="JSON files per BDAT folder")
+    parser.add_argument("--rows", type=int, default=200, help="Rows per JSON file")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark")
+    parser.add_argument("--sample-files", type=int, default=50, help="Files used by load_json and check_line_length")
+    parser.add_argument("--keep-project", metavar="DIR", help="Generate the project in DIR and keep it")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", metavar="FILE", help="Compare against a previous results file")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--skip-cold-start", action="store_true", help="Don't measure the cold start")
+    parser.add_argument("--enforce-budget", action="store_true", help="Exit with an error if the cold start is over budget")
+    args = parser.parse_args()
+
+    display = start_virtual_display()
+    temp_dir = None
+    try:
+        if args.keep_project:
+            project_dir = args.keep_project
+        else:
+            temp_dir = tempfile.mkdtemp(prefix="bdat_bench_")
+            project_dir = temp_dir
+
+        print(f"Generating {args.game} project: {args.folders} folders x {args.files} files x {args.rows} rows")
+        project = synth_project.generate_project(project_dir, args.game, args.folders, args.files, args.rows, args.seed)
+
+        results = {}
+        if not args.skip_cold_start:
+            print("cold start ...")
+            results.update(measure_cold_start(project, args.repeat))
+
+        gui = load_gui_module()
+        try:
+            results.update(run_benchmarks(gui, project, args))
+        finally:
+            gui.root.destroy()
+
+        report = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": {
+                "game": args.game, "folders": args.folders, "files": args.files,
+                "rows": args.rows, "seed": args.seed, "repeat": args.repeat,
+            },
+            "results": results,
+        }
+
+        print(f"\n{'benchmark':<22}{'median':>12}{'min':>12}{'per item':>12}")
+        for name, stats in results.items():
+            per_item = f"{stats['per_item_median'] * 1e6:.1f}us" if "per_item_median" in stats else "-"
+            budget = ""
+            if "budget" in stats:
+                budget = f"  budget {stats['budget'] * 1000:.0f}ms {'ok' if stats['within_budget'] else 'EXCEEDED'}"
+            print(f"{name:<22}{stats['median'] * 1000:>10.2f}ms{stats['min'] * 1000:>10.2f}ms{per_item:>12}{budget}")
+
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print(f"\nResults written to {args.output}")
+
+        if args.compare:
+            with open(args.compare, "r", encoding="utf-8") as f:
+                previous = json.load(f)
+            if previous.get("parameters") != report["parameters"]:
+                print("\nWarning: the compared run used different parameters.")
+            regressions = compare(previous, report, args.threshold)
+            if regressions and args.fail_on_regression:
+                sys.exit(1)
+
+        over_budget = [name for name, stats in results.items() if stats.get("within_budget") is False]
+        if over_budget and args.enforce_budget:
+            sys.exit(f"Cold start over budget: {', '.join(over_budget)}")
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        if display:
+            display.terminate()
+
+
+if __name__ == "__main__":
+    main()
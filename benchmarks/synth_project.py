@@ -0,0 +1,159 @@
+"""Generates synthetic BDAT project trees for benchmarking.
+
+The generated layout mirrors what the BDAT Batch Extract/Unpack tool produces:
+
+    Xenoblade 2 / X:  <base>/<bdat>/<bdat>.bschema
+                      <base>/<bdat>/<bdat>/<table>.json
+    Xenoblade 3:      <base>/game|evt/<bdat>/<bdat>.bschema
+                      <base>/game|evt/<bdat>/<bdat>/<table>.json
+
+Two parallel trees are written: "translated" (used as the Base Directory) and
+"original" (used as the Second Directory).
+"""
+import argparse
+import json
+import os
+import random
+
+# Table name prefixes; the first ones have a line length limit in check_line_length
+TABLE_PREFIXES = ["bf", "fev", "qst", "tlk", "kizuna", "campfev", "menu", "btl"]
+
+WORDS = [
+    "Rex", "Pyra", "Mythra", "Nia", "Tora", "Poppi", "Morag", "Zeke", "Titan",
+    "Blade", "Driver", "Core", "Crystal", "Elysium", "Alrest", "Gormott",
+    "Uraya", "Mor", "Ardain", "Tantal", "Leftheria", "Indol", "the", "a", "to",
+    "and", "of", "we", "must", "go", "now", "over", "there", "quickly", "wait",
+    "look", "what", "is", "that", "thing", "salvage", "cloud", "sea", "power",
+]
+
+TAGS = ["[ML:Feeling ]", "[ML:Dash ]", "[ML:Icon icon=btn_a ]", "[XENO:wait wait=key ]"]
+
+GAMES = {
+    "x2": {"version": {"Legacy": "Switch"}, "text_field": "name", "label": False},
+    "x3": {"version": "Modern", "text_field": "<DBAF43F0>", "label": True},
+    "x": {"version": "Modern", "text_field": "name", "label": True},
+}
+
+
+def make_text(rng, max_line=60):
+    """Builds a random message with optional control tags and \\n line breaks."""
+    lines = []
+    for _ in range(rng.choice([1, 1, 1, 2, 2, 3])):
+        words = []
+        target = rng.randint(12, max_line)
+        while len(" ".join(words)) < target:
+            words.append(rng.choice(WORDS))
+        line = " ".join(words)
+        if rng.random() < 0.3:
+            line = rng.choice(TAGS) + line
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def make_rows(rng, game, rows, translated):
+    """Builds the row list for one table."""
+    spec = GAMES[game]
+    result = []
+    for row_id in range(1, rows + 1):
+        text = make_text(rng)
+        row = {"$id": row_id}
+        if spec["label"]:
+            row["label"] = f"msg_{row_id:05d}"
+        else:
+            row["style"] = rng.randint(0, 3)
+        row[spec["text_field"]] = text
+        result.append(row)
+
+    if translated:
+        # Roughly half of the rows get a different (translated) text
+        for row in result:
+            if rng.random() < 0.5:
+                row[spec["text_field"]] = make_text(rng)
+    return result
+
+
+def make_schema(game):
+    """Builds the column schema that bdat-rs writes at the top of each table."""
+    spec = GAMES[game]
+    columns = [{"name": "label", "type": 13}] if spec["label"] else [{"name": "style", "type": 1}]
+    columns.append({"name": spec["text_field"], "type": 7})
+    return columns
+
+
+def write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def bdat_folders(game, folders):
+    """Returns (parent, bdat_name) pairs for the requested number of BDAT folders."""
+    result = []
+    for i in range(folders):
+        name = f"bdat_{i:03d}_ms"
+        if game == "x3":
+            result.append(("game" if i % 2 == 0 else "evt", name))
+        else:
+            result.append(("", name))
+    return result
+
+
+def generate_project(out_dir, game="x2", folders=10, files=5, rows=200, seed=0):
+    """Generates translated and original trees under out_dir.
+
+    Returns a dict with the paths of both trees and the list of translated JSON files.
+    """
+    if game not in GAMES:
+        raise ValueError(f"Unknown game '{game}', expected one of {sorted(GAMES)}")
+
+    spec = GAMES[game]
+    translated_dir = os.path.join(out_dir, "translated")
+    original_dir = os.path.join(out_dir, "original")
+    json_files = []
+
+    for tree_dir, translated in ((original_dir, False), (translated_dir, True)):
+        for folder_index, (parent, bdat) in enumerate(bdat_folders(game, folders)):
+            bdat_path = os.path.join(tree_dir, parent, bdat)
+            inner_path = os.path.join(bdat_path, bdat)
+            os.makedirs(inner_path, exist_ok=True)
+
+            tables = [f"{TABLE_PREFIXES[(folder_index + i) % len(TABLE_PREFIXES)]}{i:03d}_ms" for i in range(files)]
+            write_json(os.path.join(bdat_path, f"{bdat}.bschema"), {
+                "file_name": f"{bdat}.bdat",
+                "version": spec["version"],
+                "tables": tables,
+            })
+
+            for table in tables:
+                # Same seed in both trees so that $id values and untranslated rows line up
+                table_rng = random.Random(f"{seed}/{parent}/{bdat}/{table}")
+                data = {"schema": make_schema(game), "rows": make_rows(table_rng, game, rows, translated)}
+                json_path = os.path.join(inner_path, f"{table}.json")
+                write_json(json_path, data)
+                if translated:
+                    json_files.append(json_path)
+
+    return {
+        "translated_dir": translated_dir,
+        "original_dir": original_dir,
+        "json_files": json_files,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic BDAT project tree.")
+    parser.add_argument("out_dir", help="Directory to create the project in")
+    parser.add_argument("--game", choices=sorted(GAMES), default="x2")
+    parser.add_argument("--folders", type=int, default=10, help="Number of BDAT folders")
+    parser.add_argument("--files", type=int, default=5, help="JSON files per BDAT folder")
+    parser.add_argument("--rows", type=int, default=200, help="Rows per JSON file")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    project = generate_project(args.out_dir, args.game, args.folders, args.files, args.rows, args.seed)
+    print(f"Translated: {project['translated_dir']}")
+    print(f"Original:   {project['original_dir']}")
+    print(f"JSON files: {len(project['json_files'])}")
+
+
+if __name__ == "__main__":
+    main()
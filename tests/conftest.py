@@ -0,0 +1,37 @@
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from synth_project import generate_project  # noqa: E402
+
+from bdat_core import detect_game_version  # noqa: E402
+
+
+def read_table(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_table(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def make_table(rows, field="name"):
+    """Builds a small table with {row id: text} rows."""
+    return {"schema": [{"name": "style", "type": 1}, {"name": field, "type": 7}],
+            "rows": [{"$id": row_id, "style": 0, field: text} for row_id, text in rows.items()]}
+
+
+@pytest.fixture
+def project(tmp_path):
+    """A small synthetic Xenoblade 3 project with translated and original trees."""
+    info = generate_project(str(tmp_path), game="x3", folders=2, files=3, rows=20)
+    info["game_version"] = detect_game_version(info["translated_dir"])
+    return info
@@ -0,0 +1,52 @@
+import json
+import os
+
+from bdat_core import build_changed_files
+
+from conftest import read_table, write_table
+
+
+def rel(project, path):
+    return os.path.relpath(path, project["translated_dir"]).replace('\\', '/')
+
+
+def changed_list(out_dir):
+    with open(os.path.join(out_dir, "changed_files.txt"), 'r', encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+def test_first_build_copies_everything(project, tmp_path):
+    out_dir = str(tmp_path / "out")
+    copied, removed = build_changed_files(project["translated_dir"], out_dir, project["game_version"])
+    assert {rel(project, path) for path in project["json_files"]} <= set(copied)
+    assert any(path.endswith(".bschema") for path in copied)
+    assert removed == [] and changed_list(out_dir) == copied
+    with open(os.path.join(out_dir, ".bdat_manifest.json"), 'r', encoding='utf-8') as f:
+        assert set(json.load(f)) == set(copied)
+
+
+def test_rebuild_only_copies_changed_files(project, tmp_path):
+    out_dir = str(tmp_path / "out")
+    build_changed_files(project["translated_dir"], out_dir, project["game_version"])
+    assert build_changed_files(project["translated_dir"], out_dir, project["game_version"]) == ([], [])
+    assert changed_list(out_dir) == []  # Never a stale list
+
+    edited, touched = project["json_files"][:2]
+    data = read_table(edited)
+    data["rows"][0]["<DBAF43F0>"] = "Edited"
+    write_table(edited, data)
+    os.utime(touched, ns=(0, os.stat(touched).st_mtime_ns + 10 ** 9))  # Newer, same content
+    copied, _ = build_changed_files(project["translated_dir"], out_dir, project["game_version"])
+    assert copied == [rel(project, edited)]
+    assert read_table(os.path.join(out_dir, *copied[0].split('/')))["rows"][0]["<DBAF43F0>"] == "Edited"
+
+
+def test_removed_and_missing_outputs(project, tmp_path):
+    out_dir = str(tmp_path / "out")
+    copied, _ = build_changed_files(project["translated_dir"], out_dir, project["game_version"])
+    gone, deleted_output = project["json_files"][:2]
+    os.remove(gone)
+    os.remove(os.path.join(out_dir, *rel(project, deleted_output).split('/')))
+    copied, removed = build_changed_files(project["translated_dir"], out_dir, project["game_version"])
+    assert removed == [rel(project, gone)]
+    assert copied == [rel(project, deleted_output)]  # Copied again although unchanged
@@ -0,0 +1,76 @@
+import shutil
+import threading
+
+from bdat_core import carry_forward, load_review_list, review_key, text_field
+from bdat_core.carry import carry_rows
+
+from conftest import make_table, read_table, write_table
+
+
+def test_carry_rows():
+    old = make_table({1: "Hello", 2: "Bye", 3: "Same", 4: "Moved"})
+    new = make_table({1: "Hello!", 2: "Bye!", 3: "Same", 5: "Moved", 6: "New"})
+    translated = make_table({1: "Bonjour", 2: "Bye", 3: "Pareil", 4: "Déplacé"})
+
+    rows, counts, review = carry_rows(new, old, translated)
+    assert {row["$id"]: row["name"] for row in rows} == {1: "Bonjour", 2: "Bye!", 3: "Pareil", 5: "Déplacé", 6: "New"}
+    assert counts == {"kept": 1, "updated": 1, "moved": 1, "changed": 1, "new": 1, "removed": 1}
+    assert review == [1, 6]
+
+
+def new_originals(project, tmp_path):
+    """Copies the originals and adds a new row to every table, so every file has a row to review."""
+    new_dir = str(tmp_path / "new")
+    shutil.copytree(project["original_dir"], new_dir)
+    for path in project["json_files"]:
+        new_path = path.replace(project["translated_dir"], new_dir)
+        data = read_table(new_path)
+        data["rows"].append({"$id": 999, "label": "", text_field(data): "A new line"})
+        write_table(new_path, data)
+    return new_dir
+
+
+def test_carry_forward_apply(project, tmp_path):
+    new_dir = new_originals(project, tmp_path)
+    base_dir = project["translated_dir"]
+    totals, review, cancelled, errors = carry_forward(base_dir, project["original_dir"], new_dir,
+                                                     project["game_version"], apply=True)
+    assert not cancelled and not errors
+    assert totals["new"] == len(project["json_files"])
+    review_list = load_review_list(base_dir)
+    for path in project["json_files"]:
+        assert 999 in review[path]
+        assert 999 in review_list[review_key(path, base_dir)]
+
+
+def test_cancel_keeps_review_ids_of_written_files(project, tmp_path):
+    new_dir = new_originals(project, tmp_path)
+    base_dir = project["translated_dir"]
+    before = {path: read_table(path) for path in project["json_files"]}
+    cancel = threading.Event()
+
+    totals, review, cancelled, _ = carry_forward(base_dir, project["original_dir"], new_dir, project["game_version"],
+                                                 apply=True, progress=lambda done, total: cancel.set(), cancel=cancel)
+    assert cancelled
+    written = [path for path in project["json_files"] if read_table(path) != before[path]]
+    assert written
+    review_list = load_review_list(base_dir)
+    for path in written:
+        assert 999 in review[path]
+        assert 999 in review_list[review_key(path, base_dir)]
+
+
+def test_unreadable_file_is_skipped_and_reported(project, tmp_path):
+    new_dir = new_originals(project, tmp_path)
+    base_dir = project["translated_dir"]
+    broken = project["json_files"][0]
+    with open(broken, 'w', encoding='utf-8') as f:
+        f.write("{ not json")
+
+    totals, review, cancelled, errors = carry_forward(base_dir, project["original_dir"], new_dir,
+                                                     project["game_version"], apply=True)
+    assert list(errors) == [broken]
+    assert totals["failed"] == 1
+    review_list = load_review_list(base_dir)
+    for path in project["json_files"][1:]:
+        assert 999 in review_list[review_key(path, base_dir)]
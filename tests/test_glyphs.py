@@ -0,0 +1,45 @@
+import json
+
+from bdat_core import GlyphTable, check_project_widths, find_glyph_table, load_glyph_table
+
+from conftest import make_table, write_table
+
+TABLE = {
+    "font": "test",
+    "default_advance": 20,
+    "ranges": [[32, 126, 10]],
+    "advances": {"W": 15, "i": 4, "\U0001F600": 30},
+    "budgets": {"c": 500, "campfev": 100, "tlk": 50},
+}
+
+
+def test_glyph_lookups():
+    table = GlyphTable(TABLE)
+    assert table.line_width("ab") == 20
+    assert table.line_width("Wi") == 19
+    assert table.line_width("é") == 20  # Not listed, default advance
+    assert table.line_width("a\U0001F600\U0001F601") == 10 + 30 + 20  # Outside the BMP
+    assert table.line_widths("[ML:Feeling ]aaaa\\nWWW") == [40, 45]
+
+
+def test_budgets_by_longest_prefix():
+    table = GlyphTable(TABLE)
+    assert table.budget_for("campfev001_ms.json") == 100
+    assert table.budget_for("cmn_ms.json") == 500
+    assert table.budget_for("menu_ms.json") is None
+    assert not table.check_line_width("tlk000_ms.json", "aaaaa")
+    assert table.check_line_width("tlk000_ms.json", "short\\naaaaaa")
+    assert not table.check_line_width("menu_ms.json", "a" * 1000)
+
+
+def test_find_load_and_check_project(tmp_path):
+    table_path = tmp_path / "Xenoblade3.json"
+    table_path.write_text(json.dumps(TABLE), encoding='utf-8')
+    assert find_glyph_table("Xenoblade3", [None, str(tmp_path / "missing"), str(tmp_path)]) == str(table_path)
+    assert find_glyph_table("Xenoblade2", [str(tmp_path)]) is None
+    assert load_glyph_table(str(table_path)) is load_glyph_table(str(table_path))
+
+    tlk, menu = tmp_path / "tlk000_ms.json", tmp_path / "menu_ms.json"
+    write_table(tlk, make_table({1: "aaaaa", 2: "aaaaaa", 3: "[ML:Feeling ]aaaa"}))
+    write_table(menu, make_table({1: "a" * 1000}))
+    assert check_project_widths([str(tlk), str(menu)], str(table_path)) == {str(tlk): [2]}
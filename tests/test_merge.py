@@ -0,0 +1,74 @@
+from bdat_core import load_document, save_document, save_row_texts, text_field
+
+from conftest import make_table, read_table, write_table
+
+
+def texts(path):
+    data = read_table(path)
+    field = text_field(data)
+    return {row["$id"]: row[field] for row in data["rows"]}
+
+
+def edit(data, row_id, text):
+    for row in data["rows"]:
+        if row["$id"] == row_id:
+            row[text_field(data)] = text
+
+
+def test_save_unchanged_and_written(tmp_path):
+    path = tmp_path / "t.json"
+    write_table(path, make_table({1: "a", 2: "b"}))
+    data, state = load_document(str(path))
+    status, _, state = save_document(state, data)
+    assert status in ("unchanged", "written")
+
+    edit(data, 1, "mine")
+    status, _, state = save_document(state, data)
+    assert status == "written"
+    assert texts(path) == {1: "mine", 2: "b"}
+
+
+def test_merge_keeps_rows_changed_on_disk(tmp_path):
+    path = tmp_path / "t.json"
+    write_table(path, make_table({1: "a", 2: "b"}))
+    data, state = load_document(str(path))
+    write_table(path, make_table({1: "a", 2: "disk"}))
+
+    edit(data, 1, "mine")
+    status, _, _ = save_document(state, data)
+    assert status == "merged"
+    assert texts(path) == {1: "mine", 2: "disk"}
+
+
+def test_conflict_cancel_and_resolve(tmp_path):
+    path = tmp_path / "t.json"
+    write_table(path, make_table({1: "a", 2: "b"}))
+    data, state = load_document(str(path))
+    write_table(path, make_table({1: "disk", 2: "b"}))
+    edit(data, 1, "mine")
+
+    status, _, _ = save_document(state, data)
+    assert status == "cancelled"
+    assert texts(path) == {1: "disk", 2: "b"}
+
+    seen = []
+
+    def resolve(conflicts):
+        seen.extend(conflicts)
+        return {row_id: mine for row_id, _, _, mine in conflicts}
+
+    status, _, _ = save_document(state, data, resolve)
+    assert status == "merged"
+    assert seen == [(1, "a", "disk", "mine")]
+    assert texts(path) == {1: "mine", 2: "b"}
+
+
+def test_save_row_texts_keeps_disk_edits(tmp_path):
+    path = tmp_path / "t.json"
+    write_table(path, make_table({1: "a", 2: "b", 3: "c"}))
+    data, state = load_document(str(path))
+    write_table(path, make_table({1: "human", 2: "b", 3: "c"}))
+
+    saved = save_row_texts(state, data, {"1": "draft 1", "2": "draft 2", "9": "unknown row"})
+    assert saved == {"2"}
+    assert texts(path) == {1: "human", 2: "draft 2", 3: "c"}
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from bdat_core import load_review_list, prefill_files, review_key, text_field
+from bdat_core import mt
+from bdat_core.mt import protect_tags, restore_tags, translate_texts
+
+from conftest import read_table, write_table
+
+
+def fake_server(fail=()):
+    """Answers like bdat_core.mt_standin; batches containing a text of fail raise."""
+    calls = []
+
+    def post_json(url, payload, timeout):
+        calls.append(payload["texts"])
+        if any(text in fail for text in payload["texts"]):
+            raise OSError("Simulated failure")
+        return {"translations": [f"{text} (MT)" for text in payload["texts"]]}
+
+    post_json.calls = calls
+    return post_json
+
+
+def test_protect_and_restore_tags():
+    source = "[ML:Feeling ]Hello [ML:Icon icon=btn_a ] world"
+    protected, tags = protect_tags(source)
+    assert protected == "⟦0⟧Hello ⟦1⟧ world"
+    assert restore_tags("⟦0⟧Bonjour ⟦1⟧ monde", tags, source) == "[ML:Feeling ]Bonjour [ML:Icon icon=btn_a ] monde"
+    assert restore_tags("⟦1⟧ monde ⟦0⟧Bonjour", tags, source) is not None
+
+
+@pytest.mark.parametrize("draft", [
+    "⟦0⟧Bonjour monde",  # Lost placeholder
+    "⟦0⟧Bonjour ⟦1⟧ ⟦1⟧ monde",  # Duplicated placeholder
+    "⟦0⟧Bonjour ⟦1⟧ ⟦2⟧ monde",  # Unknown placeholder
+    "[MT] ⟦0⟧Bonjour ⟦1⟧ monde",  # Tag added by the model
+])
+def test_restore_tags_rejects_bad_drafts(draft):
+    source = "[ML:Feeling ]Hello [ML:Icon icon=btn_a ] world"
+    _, tags = protect_tags(source)
+    assert restore_tags(draft, tags, source) is None
+
+
+def test_translate_texts_keeps_successful_batches(monkeypatch):
+    monkeypatch.setattr(mt, "_post_json", fake_server(fail={"t5"}))
+    texts = [f"t{i}" for i in range(8)]
+    translations, errors = asyncio.run(translate_texts("http://mt", texts, batch_size=2, retries=0))
+    assert translations == ["t0 (MT)", "t1 (MT)", "t2 (MT)", "t3 (MT)", None, None, "t6 (MT)", "t7 (MT)"]
+    assert len(errors) == 1 and isinstance(errors[0], OSError)
+
+
+def untranslated_rows(project):
+    """Returns {path: [row ids]} of the rows prefill_files will fill."""
+    found = mt.collect_untranslated(project["json_files"], project["translated_dir"], project["original_dir"],
+                                    project["game_version"])
+    return {path: list(texts) for path, (texts, _, _) in found.items()}
+
+
+def test_prefill_files_writes_drafts_and_review_list(project, monkeypatch):
+    monkeypatch.setattr(mt, "_post_json", fake_server())
+    base_dir = project["translated_dir"]
+    rows = untranslated_rows(project)
+    assert rows
+
+    stats = prefill_files(project["json_files"], base_dir, project["original_dir"], project["game_version"],
+                          "http://mt")
+    assert stats["rows"] == sum(len(ids) for ids in rows.values())
+    assert stats["failed"] == 0
+    review_list = load_review_list(base_dir)
+    for path, ids in rows.items():
+        data = read_table(path)
+        field = text_field(data)
+        texts = {str(row["$id"]): row[field] for row in data["rows"]}
+        assert all(texts[row_id].endswith(" (MT)") for row_id in ids)
+        assert set(ids) <= set(map(str, review_list[review_key(path, base_dir)]))
+
+
+def test_prefill_files_keeps_rows_edited_meanwhile(project, monkeypatch):
+    base_dir = project["translated_dir"]
+    rows = untranslated_rows(project)
+    path = next(iter(rows))
+    edited_id = rows[path][0]
+    server = fake_server()
+
+    def edit_then_translate(url, payload, timeout):
+        # The translator edits a row while the requests are in flight
+        if not server.calls:
+            data = read_table(path)
+            field = text_field(data)
+            for row in data["rows"]:
+                if str(row["$id"]) == edited_id:
+                    row[field] = "Edited by hand"
+            write_table(path, data)
+        return server(url, payload, timeout)
+
+    monkeypatch.setattr(mt, "_post_json", edit_then_translate)
+    stats = prefill_files(project["json_files"], base_dir, project["original_dir"], project["game_version"],
+                          "http://mt", batch_size=1000)
+    assert stats["rows"] == sum(len(ids) for ids in rows.values()) - 1
+    data = read_table(path)
+    field = text_field(data)
+    texts = {str(row["$id"]): row[field] for row in data["rows"]}
+    assert texts[edited_id] == "Edited by hand"
+    assert edited_id not in map(str, load_review_list(base_dir).get(review_key(path, base_dir), []))
+
+
+def test_prefill_files_reports_failed_batches(project, monkeypatch):
+    found = mt.collect_untranslated(project["json_files"], project["translated_dir"], project["original_dir"],
+                                    project["game_version"])
+    sources = [text for texts, _, _ in found.values() for text in texts.values()]
+    failing = sources[0]
+
+    async def no_sleep(delay):
+        pass
+
+    monkeypatch.setattr(mt.asyncio, "sleep", no_sleep)
+    monkeypatch.setattr(mt, "_post_json", fake_server(fail={protect_tags(failing)[0]}))
+    stats = prefill_files(project["json_files"], project["translated_dir"], project["original_dir"],
+                          project["game_version"], "http://mt", batch_size=1)
+    assert stats["failed"] == 1
+    assert "Simulated failure" in stats["error"]
+    assert stats["rows"] == len(sources) - sources.count(failing)
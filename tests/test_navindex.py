@@ -0,0 +1,44 @@
+from bdat_core import NavIndex, build_nav_index, scan_rows
+
+from conftest import make_table, read_table, write_table
+
+
+def test_scan_rows():
+    data = make_table({1: "Bonjour", 2: "", 3: "Same", 4: "x" * 40, 5: ""})
+    found = scan_rows("tlk000_ms.json", data, {1: "Hello", 2: "Bye", 3: "Same", 4: "Long"})
+    assert found["untranslated"] == [(1, 2), (2, 3), (4, 5)]
+    assert found["over_limit"] == [(3, 4)]
+    assert found["compared"] == 4
+
+
+def test_find_wraps_around_files():
+    index = NavIndex(["a.json", "b.json", "c.json"])
+    index.set_file("a.json", 5, {"untranslated": [(3, 13)], "over_limit": []})
+    index.set_file("c.json", 5, {"untranslated": [(0, 30), (4, 34)], "over_limit": []})
+    assert index.find("untranslated") == ("a.json", 3, 13)
+    assert index.find("untranslated", "a.json", 3) == ("c.json", 0, 30)
+    assert index.find("untranslated", "b.json", 2) == ("c.json", 0, 30)
+    assert index.find("untranslated", "c.json", 4) == ("a.json", 3, 13)
+    assert index.find("untranslated", "c.json", 0, backwards=True) == ("a.json", 3, 13)
+    assert index.find("untranslated", "a.json", 3, backwards=True) == ("c.json", 4, 34)
+    assert index.find("over_limit") is None
+    assert index.total("untranslated") == 3
+
+    # Updating a file only replaces its own entries
+    index.set_file("c.json", 5, {"untranslated": [(2, 32)], "over_limit": [(1, 31)]})
+    assert index.total("untranslated") == 2
+    assert index.find("untranslated", "a.json", 3) == ("c.json", 2, 32)
+    assert index.stats("c.json") == {"rows": 5, "compared": 0, "untranslated": 1, "over_limit": 1}
+    assert index.stats("d.json") is None
+
+
+def test_build_nav_index(project):
+    path = project["json_files"][0]
+    data = read_table(path)
+    data["rows"][0]["<DBAF43F0>"] = ""
+    write_table(path, data)
+
+    index = build_nav_index(project["translated_dir"], project["original_dir"], project["game_version"])
+    assert sorted(index.files) == sorted(project["json_files"])
+    assert index.find("untranslated", path) == (path, 0, data["rows"][0]["$id"])
+    assert index.stats(path)["rows"] == index.stats(path)["compared"] == len(data["rows"])
@@ -0,0 +1,58 @@
+import os
+
+from bdat_core import (file_status_key, iter_bdat_folders, iter_project_files, list_json_files,
+                       resolve_original_path)
+
+
+def test_project_listing(project):
+    base_dir, game_version = project["translated_dir"], project["game_version"]
+    os.makedirs(os.path.join(base_dir, "game", ".bdat_tool"), exist_ok=True)  # Caches are not BDAT folders
+    folders = sorted(iter_bdat_folders(base_dir, game_version))
+    assert len(folders) == 2
+    assert all(name == f"{os.path.basename(os.path.dirname(path))}/{folder}" for name, path, folder in folders)
+
+    files = [path for _, folder_path, _ in folders for _, path in list_json_files(folder_path)]
+    assert sorted(files) == sorted(project["json_files"])
+    assert sorted(iter_project_files(base_dir, game_version)) == sorted(project["json_files"])
+    assert all(name == os.path.basename(path) for _, folder_path, _ in folders
+               for name, path in list_json_files(folder_path))
+
+
+def test_folder_without_tables(tmp_path):
+    (tmp_path / "bdat_000").mkdir()
+    (tmp_path / "bdat_000" / "bdat_000.bschema").write_text("", encoding='utf-8')
+    assert list_json_files(str(tmp_path / "bdat_000")) == []
+
+
+def test_resolve_original_path(project):
+    base_dir, original_dir = project["translated_dir"], project["original_dir"]
+    path = project["json_files"][0]
+    original = resolve_original_path(path, base_dir, original_dir, project["game_version"])
+    assert original == os.path.join(original_dir, os.path.relpath(path, base_dir))
+    assert resolve_original_path(path, base_dir, None, project["game_version"]) is None
+
+    # Xenoblade 3 tables may have moved between game/ and evt/
+    top_folder, rest = os.path.relpath(original, original_dir).split(os.sep, 1)
+    moved = os.path.join(original_dir, "evt" if top_folder == "game" else "game", rest)
+    os.makedirs(os.path.dirname(moved), exist_ok=True)
+    os.replace(original, moved)
+    assert resolve_original_path(path, base_dir, original_dir, project["game_version"]) == moved
+    os.remove(moved)
+    assert resolve_original_path(path, base_dir, original_dir, project["game_version"]) is None
+
+
+def test_file_status_key():
+    base_dir = os.path.join(os.sep, "project")
+    path = os.path.join(base_dir, "bdat_000", "bdat_000", "tlk000_ms.json")
+    assert file_status_key(path, base_dir) == "bdat_000/tlk000_ms.json"
+
+
+def test_status_keys_share_the_folder_part(project):
+    """The file tree resolves the folder part of the keys once per folder and appends the file names."""
+    base_dir = project["translated_dir"]
+    for _, folder_path, _ in iter_bdat_folders(base_dir, project["game_version"]):
+        files = list_json_files(folder_path)
+        keys = [file_status_key(path, base_dir) for _, path in files]
+        prefix = keys[0][:-len(files[0][0])]
+        assert keys == [prefix + name for name, _ in files]
+        assert len(set(keys)) == len(keys)
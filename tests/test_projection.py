@@ -0,0 +1,71 @@
+import os
+from array import array
+
+from bdat_core import OriginalProjection, ProjectionCache
+
+from conftest import make_table, write_table
+
+
+def test_texts_are_matched_by_id():
+    # The original has a row the translation doesn't have yet; the rows after it must not shift
+    projection = OriginalProjection("original.json", make_table({1: "Hello", 2: "New", 3: "Bye"})["rows"], "name")
+    assert projection.texts_by_id() == {1: "Hello", 2: "New", 3: "Bye"}
+    assert projection.texts_by_id().get(3) == "Bye"
+    assert projection.texts_by_id().get(4, "") == ""
+
+
+def test_get_many_loads_every_reference(tmp_path):
+    paths = []
+    for language, texts in (("fr", {1: "Bonjour"}), ("de", {1: "Hallo", 2: "Tschüss"})):
+        path = tmp_path / language / "tlk000_ms.json"
+        path.parent.mkdir()
+        write_table(path, make_table(texts))
+        paths.append(str(path))
+    missing = str(tmp_path / "es" / "tlk000_ms.json")
+
+    cache = ProjectionCache(budget_bytes=1 << 20)
+    results = cache.get_many(paths + [missing])
+    assert results[paths[0]].texts_by_id() == {1: "Bonjour"}
+    assert results[paths[1]].texts_by_id() == {1: "Hallo", 2: "Tschüss"}
+    assert isinstance(results[missing], OSError)
+    # Loaded files are served from the cache afterwards
+    assert cache.get(paths[1]) is results[paths[1]]
+
+
+def test_projection_is_compact():
+    rows = [{"$id": row_id, "label": "msg", "name": "Same text", "style": 0} for row_id in range(3)]
+    projection = OriginalProjection("original.json", rows, "name")
+    assert isinstance(projection.ids, array)
+    assert projection.texts[0] is projection.texts[2]  # Interned
+    assert projection.labels == ["msg"] * 3
+    assert OriginalProjection("original.json", [{"$id": "a"}, {"$id": 2}], "name").ids == ["a", 2]
+    assert OriginalProjection("original.json", [{"$id": 1}], "name").labels is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"t{i}.json"
+        write_table(path, make_table({row_id: f"Text {row_id}" * 20 for row_id in range(50)}))
+        paths.append(str(path))
+    size = OriginalProjection.load(paths[0]).nbytes
+
+    cache = ProjectionCache(budget_bytes=size * 2)
+    first = cache.get(paths[0])
+    cache.get(paths[1])
+    assert cache.get(paths[0]) is first  # Now the most recent
+    cache.get(paths[2])
+    assert list(cache.entries) == [paths[0], paths[2]]
+    assert cache.total_bytes == sum(projection.nbytes for projection in cache.entries.values())
+    assert {path for path, _, _ in cache.memory_report()} == {paths[0], paths[2]}
+
+
+def test_cache_reloads_modified_files(tmp_path):
+    path = tmp_path / "t.json"
+    write_table(path, make_table({1: "Old"}))
+    cache = ProjectionCache(budget_bytes=1 << 20)
+    assert cache.get(str(path)).texts_by_id() == {1: "Old"}
+    write_table(path, make_table({1: "New"}))
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10 ** 9))
+    assert cache.get(str(path)).texts_by_id() == {1: "New"}
+    assert len(cache.entries) == 1
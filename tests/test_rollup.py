@@ -0,0 +1,53 @@
+from bdat_core import NavIndex, StatusRollup, derived_file_status, scan_file
+
+from conftest import make_table, write_table
+
+
+def stats(rows, compared, untranslated, over_limit=0):
+    return {"rows": rows, "compared": compared, "untranslated": untranslated, "over_limit": over_limit}
+
+
+def test_derived_file_status():
+    assert derived_file_status(stats(10, 10, 0)) == "green"
+    assert derived_file_status(stats(10, 10, 4)) == "orange"
+    assert derived_file_status(stats(10, 10, 10)) is None
+    assert derived_file_status(stats(10, 10, 0, over_limit=1)) == "orange"
+    # Rows without an original are only known to be untranslated when empty
+    assert derived_file_status(stats(10, 0, 0)) is None
+    assert derived_file_status(stats(10, 6, 0)) == "orange"
+
+
+def test_scan_file_without_original_is_not_complete(tmp_path):
+    path = tmp_path / "bdat" / "bdat" / "tlk000_ms.json"
+    path.parent.mkdir(parents=True)
+    write_table(path, make_table({1: "Hello", 2: "Bye"}))
+
+    index = NavIndex([str(path)])
+    index.set_file(str(path), *scan_file(str(path), None))
+    assert index.stats(str(path))["compared"] == 0
+    assert derived_file_status(index.stats(str(path))) is None
+
+
+def test_rollup_folder_status():
+    folder = "/project/bdat_000"
+    files = {f"{folder}/bdat_000/t{i}.json": stats(4, 4, 0) for i in range(3)}
+    rollup = StatusRollup.from_stats(files)
+    assert rollup.folder_status(folder) == "green"
+
+    first = next(iter(files))
+    assert rollup.set_file(first, stats(4, 4, 4)) == (None, "orange")
+    assert rollup.set_file(first, stats(4, 4, 4), manual="green") == ("green", "green")
+
+
+def test_folder_mark_does_not_freeze_files():
+    folder = "/project/bdat_000"
+    path = f"{folder}/bdat_000/t0.json"
+    rollup = StatusRollup.from_stats({path: stats(4, 4, 4)})
+    rollup.set_folder_mark(folder, "green")
+    assert rollup.folder_status(folder) == "green"
+    # Files keep their derived status under a marked folder
+    assert rollup.get_file(path) is None
+    assert rollup.set_file(path, stats(4, 4, 2)) == ("orange", "green")
+
+    rollup.set_folder_mark(folder, None)
+    assert rollup.folder_status(folder) == "orange"
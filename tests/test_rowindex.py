@@ -0,0 +1,23 @@
+from bdat_core import RowIndex
+
+
+def rows():
+    return [{"$id": 1, "label": "<DBAF43F0>"}, {"$id": 10, "label": "msg_intro"},
+            {"$id": 11, "label": "MSG_INTRO"}, {"$id": 100, "label": "msg_end"}]
+
+
+def test_exact_matches_come_first():
+    index = RowIndex(rows())
+    assert index.find("10") == [1, 3]
+    assert index.find("msg_intro") == [1, 2]
+    assert index.find("  MSG_END ") == [3]
+
+
+def test_prefix_and_hashed_labels():
+    index = RowIndex(rows())
+    assert index.find("1") == [0, 1, 2, 3]
+    assert index.find("msg") == [1, 2, 3]
+    assert index.find("msg", limit=2) == [1, 2]
+    assert index.find("dbaf43f0") == [0]
+    assert index.find("missing") == []
+    assert index.find("") == []
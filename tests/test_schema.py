@@ -0,0 +1,24 @@
+import pytest
+
+from bdat_core import row_text, table_columns, text_field
+
+from conftest import make_table
+
+
+@pytest.mark.parametrize("field", ["<DBAF43F0>", "name", "msg"])
+def test_text_field_of_each_game(field):
+    data = make_table({1: "Hello"}, field=field)
+    assert text_field(data) == field
+    assert row_text(data["rows"][0], text_field(data)) == "Hello"
+
+
+def test_text_field_prefers_the_known_columns():
+    data = {"schema": [{"name": "name", "type": 7}, {"name": "comment", "type": 7}], "rows": []}
+    assert text_field(data) == "name"
+
+
+def test_columns_without_a_schema():
+    data = {"rows": [{"$id": 1, "style": 0, "caption": "Hi", "edited_text": "Salut"}]}
+    assert table_columns(data) == ("style", "caption")
+    assert text_field(data) == "caption"
+    assert text_field({"rows": []}) is None
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import os
+import socket
+
+import pytest
+
+from bdat_core import load_review_list, text_field
+from bdat_core import server as server_module
+from bdat_core.client import ProjectClient, ServerError
+from bdat_core.server import Connection, ProjectServer, ServerThread
+
+from conftest import read_table, write_table
+
+
+@pytest.fixture
+def hosted(project):
+    """A project server on a free local port, stopped after the test."""
+    thread = ServerThread(project["translated_dir"], project["game_version"], port=0, password="secret")
+    port = thread.start_and_wait()
+    yield port
+    thread.stop()
+
+
+def first_row(path):
+    data = read_table(path)
+    return str(data["rows"][0]["$id"]), text_field(data)
+
+
+def test_password_is_required(hosted):
+    with pytest.raises(ServerError):
+        ProjectClient("127.0.0.1", hosted, "stranger")
+    with pytest.raises(ServerError):
+        ProjectClient("127.0.0.1", hosted, "stranger", password="wrong")
+
+    client = ProjectClient("127.0.0.1", hosted, "translator", password="secret")
+    try:
+        assert client.request("list_files")
+    finally:
+        client.close()
+
+
+def test_edits_reach_other_clients_and_disk(project, hosted):
+    first = ProjectClient("127.0.0.1", hosted, "first", password="secret")
+    second = ProjectClient("127.0.0.1", hosted, "second", password="secret")
+    try:
+        rel_path = first.request("list_files")[0]
+        path = os.path.join(project["translated_dir"], *rel_path.split('/'))
+        row_id, field = first_row(path)
+
+        assert first.request("lock", path=rel_path, row=row_id)
+        with pytest.raises(ServerError):
+            second.request("lock", path=rel_path, row=row_id)
+        assert first.request("edit", path=rel_path, texts={row_id: "Edited"})["applied"] == [row_id]
+        assert first.request("flush") == [rel_path]
+        assert read_table(path)["rows"][0][field] == "Edited"
+        events = [event for event in second.poll_events() if event["event"] == "rows"]
+        assert events and events[-1]["texts"] == {row_id: "Edited"}
+    finally:
+        first.close()
+        second.close()
+
+
+def test_bad_requests_are_answered(project, hosted):
+    with socket.create_connection(("127.0.0.1", hosted), timeout=10) as sock:
+        reader = sock.makefile('rb')
+        sock.sendall(b'[1, 2]\n')
+        assert json.loads(reader.readline()) == {"id": None, "error": "Messages must be JSON objects"}
+        # The connection stays usable
+        sock.sendall(b'{"id": 1, "op": "hello", "password": "secret"}\n')
+        assert "result" in json.loads(reader.readline())
+
+    client = ProjectClient("127.0.0.1", hosted, "translator", password="secret")
+    try:
+        rel_path = client.request("list_files")[0]
+        row_id, _ = first_row(os.path.join(project["translated_dir"], *rel_path.split('/')))
+        with pytest.raises(ServerError):
+            client.request("edit", path=rel_path, texts={row_id: 42})
+        with pytest.raises(ServerError):
+            client.request("edit", path=rel_path, texts=["Edited"])
+        assert client.request("edit", path=rel_path, texts={row_id: "Edited"})["applied"] == [row_id]
+    finally:
+        client.close()
+
+
+def run_server(project, test):
+    """Runs test(server, connection) on an unstarted ProjectServer."""
+    async def main():
+        server = ProjectServer(project["translated_dir"], project["game_version"], flush_delay=60)
+        try:
+            await test(server, Connection(1, None))
+        finally:
+            await server.stop()
+    asyncio.run(main())
+
+
+def test_flush_reports_conflicts(project):
+    base_dir = project["translated_dir"]
+    path = project["json_files"][0]
+    rel_path = os.path.relpath(path, base_dir).replace('\\', '/')
+    row_id, field = first_row(path)
+
+    async def test(server, connection):
+        sent = []
+        server.broadcast = lambda message, exclude=None: sent.append(message)
+        await server.op_edit(connection, {"path": rel_path, "texts": {row_id: "Mine"}})
+        data = read_table(path)
+        data["rows"][0][field] = "Theirs"
+        write_table(path, data)
+
+        assert await server.flush() == [rel_path]
+        assert read_table(path)["rows"][0][field] == "Mine"
+        assert row_id in load_review_list(base_dir)[rel_path]
+        assert {"event": "conflicts", "path": rel_path, "rows": {row_id: "Theirs"}, "by": None} in sent
+
+    run_server(project, test)
+
+
+def test_flush_goes_on_after_a_failing_file(project, monkeypatch):
+    base_dir = project["translated_dir"]
+    paths = project["json_files"][:2]
+    rel_paths = sorted(os.path.relpath(path, base_dir).replace('\\', '/') for path in paths)
+    save_document = server_module.save_document
+
+    def failing_save(state, data, resolve_conflicts=None):
+        if state.path.replace('\\', '/').endswith(rel_paths[0]):
+            raise ValueError("Simulated failure")
+        return save_document(state, data, resolve_conflicts)
+
+    async def test(server, connection):
+        for rel_path in rel_paths:
+            path = os.path.join(base_dir, *rel_path.split('/'))
+            row_id, _ = first_row(path)
+            await server.op_edit(connection, {"path": rel_path, "texts": {row_id: "Edited"}})
+
+        monkeypatch.setattr(server_module, "save_document", failing_save)
+        assert await server.flush() == [rel_paths[1]]
+        assert server.dirty == {rel_paths[0]}
+        # Tried again later, waiting longer after each failure
+        assert server.flush_handle is not None and server.failed_flushes == 1
+        assert await server.flush() == []
+        assert server.failed_flushes == 2
+
+        monkeypatch.setattr(server_module, "save_document", save_document)
+        assert await server.flush() == [rel_paths[0]]
+        assert server.dirty == set()
+        assert server.flush_handle is None and server.failed_flushes == 0
+
+    run_server(project, test)
@@ -0,0 +1,57 @@
+import os
+import threading
+
+from bdat_core import SnapshotStore, snapshot_paths_under
+
+from conftest import read_table, write_table
+
+
+def test_concurrent_put_object_stores_once(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    content = b"same content" * 1000
+    errors = []
+    barrier = threading.Barrier(8)
+
+    def put():
+        barrier.wait()
+        try:
+            store.put_object(content)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=put) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    content_hash = store.put_object(content)
+    assert store.get_object(content_hash) == content
+    object_dir = os.path.dirname(store.object_path(content_hash))
+    assert not [name for name in os.listdir(object_dir) if name.endswith(".tmp")]
+
+
+def test_snapshot_diff_and_restore(project):
+    base_dir, game_version = project["translated_dir"], project["game_version"]
+    store = SnapshotStore(base_dir)
+    snapshot, created = store.take_snapshot(game_version, label="before")
+    assert created
+    assert store.take_snapshot(game_version) == (snapshot, False)
+
+    path = project["json_files"][0]
+    rel_path = store.rel_path(path)
+    original = read_table(path)
+    data = read_table(path)
+    data["rows"][0]["<DBAF43F0>"] = "changed"
+    write_table(path, data)
+
+    assert store.diff(snapshot, game_version)["changed"] == [rel_path]
+    [(row_id, old_text, new_text)] = store.diff_rows(snapshot, rel_path)
+    assert (row_id, new_text) == (data["rows"][0]["$id"], "changed")
+
+    folder = os.path.dirname(os.path.dirname(path))
+    assert rel_path in snapshot_paths_under(snapshot, base_dir, folder)
+    assert store.restore(snapshot, [rel_path]) == [rel_path]
+    assert read_table(path) == original
+    assert store.restore(snapshot, [rel_path]) == []
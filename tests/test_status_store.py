@@ -0,0 +1,30 @@
+import sqlite3
+
+from bdat_core import StatusStore
+
+
+def test_statuses_survive_reopening(tmp_path):
+    store = StatusStore.open(str(tmp_path))
+    store.set("bdat_000_ms/tlk000_ms.json", "green")
+    store.set("bdat_000_ms", "orange")
+    store.flush()
+    store.close()
+
+    store = StatusStore.open(str(tmp_path))
+    assert store.load() == {"bdat_000_ms/tlk000_ms.json": "green", "bdat_000_ms": "orange"}
+    store.set("bdat_000_ms", None)
+    store.flush()
+    assert store.load() == {"bdat_000_ms/tlk000_ms.json": "green"}
+    store.close()
+
+
+def test_rollback_journal(tmp_path):
+    """WAL doesn't work on network shares; databases left in WAL mode are switched back."""
+    db_path = str(tmp_path / "status.sqlite3")
+    connection = sqlite3.connect(db_path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.close()
+
+    store = StatusStore(db_path)
+    assert store.connection.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    store.close()
@@ -0,0 +1,32 @@
+from bdat_core import row_view_keys, view_order
+
+
+def keys():
+    return [
+        row_view_keys(3, "B", "Hello", "Bonjour", ()),
+        row_view_keys(1, "a", "Bye", "", ()),
+        row_view_keys("x1", None, "Yes", "Yes", ("review",)),
+        row_view_keys(2, "c", "Hi", "Salut tout le monde", ("red", "review")),
+    ]
+
+
+def test_row_view_keys():
+    assert row_view_keys(3, "B", "Hello", "Bonjour", ["red"]) == ((0, 3, ""), "b", 5, 7, False, ("red",))
+    assert row_view_keys("x1", None, "Yes", "Yes", ())[:2] == ((1, 0, "x1"), "")
+    assert row_view_keys(1, "", "Bye", "", ())[4]  # Empty
+    assert row_view_keys(1, "", "Yes", "Yes", ())[4]  # Same as the original
+
+
+def test_sort_by_column():
+    assert view_order(keys()) == [0, 1, 2, 3]
+    assert view_order(keys(), "ID") == [1, 3, 0, 2]  # Numeric ids before text ids
+    assert view_order(keys(), "ID", descending=True) == [2, 0, 3, 1]
+    assert view_order(keys(), "LABEL") == [2, 1, 0, 3]
+    assert view_order(keys(), "TRANSLATED TEXT", descending=True) == [3, 0, 2, 1]
+
+
+def test_filter_rows():
+    assert view_order(keys(), row_filter="untranslated") == [1, 2]
+    assert view_order(keys(), row_filter="over_limit") == [3]
+    assert view_order(keys(), row_filter="review") == [2, 3]
+    assert view_order(keys(), "ORIGINAL TEXT", row_filter="review") == [3, 2]
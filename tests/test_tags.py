@@ -0,0 +1,15 @@
+from bdat_core import compare_tags, extract_tags
+
+
+def test_extract_tags():
+    assert extract_tags("[ML:Feeling ]Hi [ML:Feeling ] there") == {"[ML:Feeling ]": 2}
+    assert extract_tags("") == {}
+
+
+def test_compare_tags():
+    original = "[ML:Feeling ]Hello [ML:Icon icon=btn_a ]"
+    assert compare_tags(original, "[ML:Icon icon=btn_a ] Bonjour [ML:Feeling ]") == []
+    assert compare_tags(original, "Bonjour [ML:Icon icon=btn_a ]") == [("missing", "[ML:Feeling ]")]
+    assert compare_tags(original, "[ML:Feeling ]Bonjour [ML:Icon icon=btn_b ]") == [
+        ("altered", "[ML:Icon icon=btn_a ] -> [ML:Icon icon=btn_b ]")]
+    assert compare_tags("Hello", "[MT] Bonjour") == [("extra", "[MT]")]
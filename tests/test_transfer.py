@@ -0,0 +1,79 @@
+import os
+import threading
+
+from bdat_core import export_files, format_file_lines, parse_paste_sections, text_field
+
+from conftest import make_table, read_table
+
+
+def export(project, out_path, mode="translated", **kwargs):
+    return export_files(project["json_files"], str(out_path), mode, project["translated_dir"],
+                        project["original_dir"], project["game_version"], **kwargs)
+
+
+def test_export_writes_every_file_in_order(project, tmp_path):
+    out_path = tmp_path / "export.txt"
+    written, skipped, errors, cancelled = export(project, out_path, mode="both")
+    assert (written, skipped, errors, cancelled) == (len(project["json_files"]), [], {}, False)
+    names = [os.path.splitext(os.path.basename(path))[0] for path in project["json_files"]]
+    headers = [line for line in out_path.read_text(encoding='utf-8').splitlines() if line in names]
+    assert headers == names
+    assert not os.path.exists(str(out_path) + ".tmp")
+
+
+def test_unreadable_file_is_skipped_and_reported(project, tmp_path):
+    broken = project["json_files"][1]
+    with open(broken, 'w', encoding='utf-8') as f:
+        f.write('{"rows": [')
+    out_path = tmp_path / "export.txt"
+    written, skipped, errors, cancelled = export(project, out_path)
+    assert written == len(project["json_files"]) - 1
+    assert list(errors) == [broken] and not cancelled
+    assert os.path.splitext(os.path.basename(broken))[0] not in out_path.read_text(encoding='utf-8').splitlines()
+
+
+def test_cancelled_export_keeps_the_previous_file(project, tmp_path):
+    out_path = tmp_path / "export.txt"
+    out_path.write_text("previous export", encoding='utf-8')
+    cancel = threading.Event()
+    cancel.set()
+    _, _, _, cancelled = export(project, out_path, cancel=cancel)
+    assert cancelled
+    assert out_path.read_text(encoding='utf-8') == "previous export"
+    assert not os.path.exists(str(out_path) + ".tmp")
+
+
+def test_parse_paste_sections():
+    text = ("[1]: Stray line\n"
+            "tlk000_ms\n\n[1]: Hello\\nthere\n[2]: Bye\n\n"
+            "qst001_ms\n\n[5]: Original\n[5]: Translated\n"
+            "not a file name\n")
+    assert parse_paste_sections(text, {"tlk000_ms", "qst001_ms"}) == {
+        None: {"1": "Stray line"},
+        "tlk000_ms": {"1": "Hello\nthere", "2": "Bye"},
+        "qst001_ms": {"5": "Translated"},  # The last line of an ID wins
+    }
+    assert parse_paste_sections("tlk000_ms\n[1]: Hi", {"tlk000_ms"}) == {"tlk000_ms": {"1": "Hi"}}
+
+
+def test_format_file_lines_modes():
+    translated = make_table({1: "Bonjour", 2: "Salut\ntoi"})
+    original = make_table({1: "Hello", 2: "Hi\nyou"}, field="<DBAF43F0>")
+    assert list(format_file_lines("tlk", "translated", translated, None)) == [
+        "tlk", "", "[1]: Bonjour", "[2]: Salut\\ntoi"]
+    assert list(format_file_lines("tlk", "original", None, original)) == ["tlk", "", "[1]: Hello", "[2]: Hi\\nyou"]
+    assert list(format_file_lines("tlk", "both", translated, original)) == [
+        "tlk", "", "[1]: Hello", "[1]: Bonjour", "", "[2]: Hi\\nyou", "[2]: Salut\\ntoi", ""]
+    assert list(format_file_lines("tlk", "both_sequential", translated, original)) == [
+        "tlk", "", "[1]: Hello", "[2]: Hi\\nyou", "", "", "tlk", "", "[1]: Bonjour", "[2]: Salut\\ntoi"]
+
+
+def test_exported_block_pastes_back(project, tmp_path):
+    path = project["json_files"][0]
+    out_path = tmp_path / "export.txt"
+    export_files([path], str(out_path), "translated", project["translated_dir"], None, project["game_version"])
+    name = os.path.splitext(os.path.basename(path))[0]
+    data = read_table(path)
+    field = text_field(data)
+    assert parse_paste_sections(out_path.read_text(encoding='utf-8'), {name}) == {
+        name: {str(row["$id"]): row[field] for row in data["rows"]}}
@@ -0,0 +1,25 @@
+from bdat_core import check_line_length, escape_text, line_limit, strip_tags, unescape_text
+
+
+def test_line_limit_by_prefix():
+    assert line_limit("bf000_ms.json") == 54
+    assert line_limit("tlk012_ms.json") == 39
+    assert line_limit("campfev001_ms.json") == 39
+    assert line_limit("menu_ms.json") is None
+
+
+def test_check_line_length_counts_each_line_without_tags():
+    assert not check_line_length("tlk000_ms.json", "x" * 39)
+    assert check_line_length("tlk000_ms.json", "x" * 40)
+    assert not check_line_length("tlk000_ms.json", "[ML:Feeling ]" + "x" * 39 + "\\n" + "y" * 39)
+    assert check_line_length("tlk000_ms.json", "short\\n" + "y" * 40)
+    assert not check_line_length("menu_ms.json", "x" * 500)
+    assert not check_line_length("tlk000_ms.json", "")
+
+
+def test_escaping_round_trips():
+    text = "Line one\nLine\ttwo\r"
+    assert escape_text(text) == "Line one\\nLine\\ttwo\\r"
+    assert unescape_text(escape_text(text)) == text
+    assert escape_text(None) == ""
+    assert strip_tags("[ML:Feeling ]Hi [XENO:wait wait=key ]there") == "Hi there"
@@ -0,0 +1,50 @@
+import json
+import time
+
+import pytest
+
+from bdat_core import StallWatchdog, instrument
+
+
+@pytest.fixture
+def watchdog():
+    watchdog = StallWatchdog(interval=0.01, threshold=0.1, app_files=[__file__])
+    watchdog.start()
+    yield watchdog
+    watchdog.stop()
+
+
+def block_ui(seconds):
+    time.sleep(seconds)
+
+
+def test_stall_is_recorded_with_the_app_function(watchdog):
+    watchdog.beat()
+    assert not watchdog.records
+    block_ui(0.4)
+    assert watchdog.beat() >= 0.3
+    [stall] = watchdog.records
+    assert stall["operation"] == "test_stall_is_recorded_with_the_app_function"  # The outermost one
+    assert stall["duration"] >= 0.3
+    assert any(entry.endswith(" block_ui") for entry in stall["stack"])
+
+
+def test_stall_names_the_open_spans(watchdog, monkeypatch):
+    monkeypatch.setattr(instrument, "ENABLED", True)
+    watchdog.beat()
+    with instrument.span("save"), instrument.span("disk.write"):
+        block_ui(0.4)
+    watchdog.beat()
+    assert watchdog.records[-1]["operation"] == "save > disk.write"
+
+
+def test_regular_beats_are_no_stall(watchdog, tmp_path):
+    for _ in range(20):
+        time.sleep(0.01)
+        watchdog.beat()
+    assert not watchdog.records
+
+    path = tmp_path / "stalls.json"
+    watchdog.export(str(path))
+    report = json.loads(path.read_text(encoding='utf-8'))
+    assert report["threshold"] == 0.1 and report["stalls"] == []